@@ -6,18 +6,26 @@ from flask_jwt_extended import JWTManager
 import os
 from flask_cors import CORS
 from flask_marshmallow import Marshmallow
+from flask_migrate import Migrate
 from marshmallow import ValidationError
 from werkzeug.exceptions import HTTPException
+from utils.cache import Cache
+from utils.json_provider import FastJSONProvider
+from utils.compression import Compress
 
-# Initialize DB and Marshmallow
+# Initialize DB, Marshmallow, migrations, the read-through cache and response compression
 db = SQLAlchemy()
 ma = Marshmallow()
+migrate = Migrate()
+cache = Cache()
+compress = Compress()
 
 # Application Factory
 def create_app():
 
-    # Flask app setup
+    # Flask app setup, responses are encoded by the orjson backed provider
     app = Flask(__name__)
+    app.json = FastJSONProvider(app)
 
     # Load in environment variables and enable CORS
     load_dotenv()
@@ -28,6 +36,25 @@ def create_app():
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     db.init_app(app)
     ma.init_app(app)
+    migrate.init_app(app, db)
+
+    # Read-through cache for products and clients, in-process ("memory") or shared ("redis")
+    app.config['CACHE_BACKEND'] = os.environ.get('CACHE_BACKEND', 'memory')
+    app.config['CACHE_REDIS_URL'] = os.environ.get('CACHE_REDIS_URL')
+    app.config['CACHE_KEY_PREFIX'] = os.environ.get('CACHE_KEY_PREFIX', 'acms:')
+    app.config['CACHE_MAX_ENTRIES'] = int(os.environ.get('CACHE_MAX_ENTRIES', 1024))
+    app.config['CACHE_REPORT_MAX_ENTRIES'] = int(os.environ.get('CACHE_REPORT_MAX_ENTRIES', 32))
+    app.config['CACHE_TTL_SECONDS'] = float(os.environ.get('CACHE_TTL_SECONDS', 300))
+    cache.init_app(app)
+
+    # Negotiated gzip/deflate/brotli compression of responses above COMPRESS_MIN_SIZE bytes
+    app.config['COMPRESS_MIN_SIZE'] = int(os.environ.get('COMPRESS_MIN_SIZE', 1024))
+    app.config['COMPRESS_LEVEL'] = int(os.environ.get('COMPRESS_LEVEL', 6))
+    app.config['COMPRESS_BROTLI_QUALITY'] = int(os.environ.get('COMPRESS_BROTLI_QUALITY', 5))
+    compress.init_app(app)
+
+    # Worker processes of invoice runs started through the API, 0 bills them in the request
+    app.config['INVOICE_WORKERS'] = int(os.environ.get('INVOICE_WORKERS', os.cpu_count() or 1))
 
     # JWT Manager setup
     app.config['JWT_SECRET_KEY'] = os.environ.get('JWT_SECRET_KEY')
@@ -64,10 +91,24 @@ def create_app():
     # subscription_tier
     from blueprints.subscription_tier import subscription_tier_bp
     app.register_blueprint(subscription_tier_bp, url_prefix='/')
+    # usage
+    from blueprints.usage import usage_bp
+    app.register_blueprint(usage_bp, url_prefix='/')
+    # invoice
+    from blueprints.invoice import invoice_bp
+    app.register_blueprint(invoice_bp, url_prefix='/')
+    # report
+    from blueprints.report import report_bp
+    app.register_blueprint(report_bp, url_prefix='/')
+    # export
+    from blueprints.export import export_bp
+    app.register_blueprint(export_bp, url_prefix='/')
+    # import
+    from blueprints.imports import import_bp
+    app.register_blueprint(import_bp, url_prefix='/')
+    # metrics
+    from blueprints.metrics import metrics_bp
+    app.register_blueprint(metrics_bp, url_prefix='/')
 
-    # Create database tables if not exist
-    with app.app_context():
-        
-        db.create_all()
-    
+    # Database schema is managed by migrations, run `flask --app run db upgrade`
     return app
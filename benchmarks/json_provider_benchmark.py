@@ -0,0 +1,70 @@
+'''
+Compare Flask's default JSON provider with FastJSONProvider on a large response body.
+
+    python -m benchmarks.json_provider_benchmark --rows 20000
+
+Encodes a page of tier-like rows with UUID, datetime and Decimal values through both providers,
+best of --runs. The default provider writes datetimes as HTTP dates, so the documents differ there;
+tests/unit/json_provider_test.py checks the outputs match otherwise.
+'''
+import argparse
+import time
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+
+def sample_rows(count):
+    start = datetime(2025, 1, 1, 12, 30, 15, 123456)
+    return [
+        {
+            "id": uuid.uuid4(),
+            "subscription_id": uuid.uuid4(),
+            "min_calls": i * 1000,
+            "max_calls": (i + 1) * 1000,
+            "base_price": Decimal("5000.00"),
+            "price_per_tier": Decimal("10.25"),
+            "is_archived": False,
+            "created_at": start + timedelta(seconds=i),
+            "start_date": None,
+        }
+        for i in range(count)
+    ]
+
+
+def best_of(runs, func):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    from flask import Flask
+    from flask.json.provider import DefaultJSONProvider
+    from utils.json_provider import FastJSONProvider
+
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    default = DefaultJSONProvider(app)
+    body = {"success": True, "message": "OK", "data": {"rows": sample_rows(args.rows)}, "errors": None, "meta": None}
+
+    with app.app_context():
+        slow = best_of(args.runs, lambda: default.response(body))
+        fast = best_of(args.runs, lambda: app.json.response(body))
+
+    print(f"{args.rows} rows, best of {args.runs}")
+    print(f"default      {slow * 1000:8.1f}ms")
+    print(f"fast         {fast * 1000:8.1f}ms")
+    print(f"speedup      {slow / fast:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
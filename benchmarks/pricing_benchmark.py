@@ -0,0 +1,72 @@
+'''
+Compare pricing usage records one by one through TierLadder with the vectorized LadderTable.
+
+    python -m benchmarks.pricing_benchmark --subscriptions 1000 --records 200000
+
+Builds --subscriptions random tier ladders (seeded by --seed) under every strategy, prices --records
+random usage records both ways, best of --runs, and checks both give the same cents.
+'''
+import argparse
+import random
+import time
+import uuid
+from decimal import Decimal
+from types import SimpleNamespace
+
+
+def random_table(rng, subscriptions):
+    from utils.pricing import LadderTable, TierLadder, STRATEGIES
+
+    ladders = {}
+    for i in range(subscriptions):
+        bounds = sorted(rng.sample(range(1, 100_000), rng.randint(0, 5)))
+        edges = [0] + bounds + [bounds[-1] * 2 if bounds else 1000]
+        tiers = [
+            SimpleNamespace(
+                min_calls=edges[j], max_calls=edges[j + 1],
+                base_price=Decimal(rng.randint(0, 100_000)) / 100, price_per_tier=Decimal(rng.randint(0, 500)) / 100,
+            )
+            for j in range(len(edges) - 1)
+        ] if i % 50 else []
+        ladders[uuid.UUID(int=rng.getrandbits(128))] = TierLadder(STRATEGIES[i % 4], tiers)
+    return LadderTable(ladders)
+
+
+def best_of(runs, func):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--subscriptions", type=int, default=1_000)
+    parser.add_argument("--records", type=int, default=200_000)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    import numpy as np
+
+    rng = random.Random(args.seed)
+    table = random_table(rng, args.subscriptions)
+    ids = list(table.ladders)
+    ids = [rng.choice(ids) for _ in range(args.records)]
+    calls = [rng.randint(0, 300_000) for _ in range(args.records)]
+    calls_array = np.array(calls)
+
+    slow, looped = best_of(args.runs, lambda: [table.ladders[id].price_cents(c) for id, c in zip(ids, calls)])
+    fast, vectorized = best_of(args.runs, lambda: table.price_cents(ids, calls_array))
+
+    assert vectorized.tolist() == looped, "vectorized prices differ from the ladders"
+    print(f"{args.records} records over {args.subscriptions} subscriptions, best of {args.runs}")
+    print(f"per record   {slow * 1000:8.1f}ms")
+    print(f"vectorized   {fast * 1000:8.1f}ms")
+    print(f"speedup      {slow / fast:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+'''
+Compare the marshmallow dump of ORM objects with the compiled serializer on GET /subscriptions.
+
+    python -m benchmarks.serializer_benchmark --rows 100000
+
+Seeds an in-memory SQLite database (or --database-url) with subscriptions and their tiers,
+then serializes every subscription both ways in batches of STREAM_BATCH_SIZE, as the
+NDJSON stream does, and checks both produce byte-identical JSON.
+'''
+import argparse
+import hashlib
+import os
+import time
+import uuid
+from datetime import datetime, timedelta
+from itertools import islice
+
+
+def seed(db, rows, tiers_per_subscription):
+    from models import Client, Contract, Product, Subscription, SubscriptionTier, User
+
+    now = datetime(2025, 1, 1)
+    user = User(email=f"bench-{uuid.uuid4().hex}@example.com", full_name="Benchmark")
+    user.set_password("benchmark")
+    db.session.add(user)
+    db.session.flush()
+    audit = {"created_by": user.id, "updated_by": user.id}
+
+    client = Client(company_name=f"Bench {uuid.uuid4().hex}", email="bench@example.com", phone_number="555", address="Bench St", **audit)
+    product = Product(api_name=f"Bench API {uuid.uuid4().hex}", description="Benchmark", **audit)
+    db.session.add_all([client, product])
+    db.session.flush()
+    contract = Contract(client_id=client.id, contract_name="Bench", **audit)
+    db.session.add(contract)
+    db.session.flush()
+
+    subscriptions, tiers = [], []
+    for i in range(rows):
+        id = uuid.uuid4()
+        created = now + timedelta(seconds=i)
+        subscriptions.append({
+            "id": id, "contract_id": contract.id, "product_id": product.id, "pricing_type": "Variable",
+            "strategy": ("Pick", "Fill", "Flat", "Fixed")[i % 4], "is_archived": False,
+            "created_at": created, "updated_at": created, **audit,
+        })
+        for t in range(tiers_per_subscription):
+            tiers.append({
+                "id": uuid.uuid4(), "subscription_id": id, "min_calls": t * 1000, "max_calls": (t + 1) * 1000 - 1,
+                "base_price": 100 + t, "price_per_tier": 1.5, "start_date": now, "end_date": now + timedelta(days=365),
+                "is_archived": False, "created_at": created, "updated_at": created, **audit,
+            })
+    db.session.execute(Subscription.__table__.insert(), subscriptions)
+    if tiers:
+        db.session.execute(SubscriptionTier.__table__.insert(), tiers)
+    db.session.commit()
+
+
+def batches(query, batch_size):
+    rows = iter(query.yield_per(batch_size))
+    while batch := list(islice(rows, batch_size)):
+        yield batch
+
+
+def timed(label, run):
+    start = time.perf_counter()
+    output = run()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<12} {elapsed:8.2f}s")
+    return output, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--tiers", type=int, default=1, help="tiers per subscription")
+    parser.add_argument("--database-url", default="sqlite://")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("JWT_SECRET_KEY", "benchmark")
+
+    from app import create_app, db
+    from models import Subscription
+    from schemas.compiled import compiled_serializer
+    from schemas.subscription_schema import subscriptions_read_schema, subscription_read_options
+    from utils.response import STREAM_BATCH_SIZE
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        seed(db, args.rows, args.tiers)
+        print(f"{args.rows} subscriptions, {args.rows * args.tiers} tiers, batches of {STREAM_BATCH_SIZE}")
+
+        query = db.session.query(Subscription).order_by(Subscription.created_at, Subscription.id)
+
+        def marshmallow_path():
+            digest = hashlib.sha256()
+            for batch in batches(query.options(*subscription_read_options()), STREAM_BATCH_SIZE):
+                digest.update(app.json.dumps(subscriptions_read_schema.dump(batch)).encode())
+            return digest.hexdigest()
+
+        serializer = compiled_serializer(subscriptions_read_schema)
+
+        def compiled_path():
+            digest = hashlib.sha256()
+            for batch in batches(serializer.select(query), STREAM_BATCH_SIZE):
+                digest.update(app.json.dumps(serializer.dump(batch)).encode())
+            return digest.hexdigest()
+
+        expected, slow = timed("marshmallow", marshmallow_path)
+        db.session.expunge_all()
+        actual, fast = timed("compiled", compiled_path)
+
+        assert actual == expected, "compiled output differs from the schema"
+        print(f"speedup      {slow / fast:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+'''
+Measure usage ingestion throughput through PUT /usage-batches/<id>.
+
+    python -m benchmarks.usage_ingest_benchmark --events 500000
+
+Seeds an in-memory SQLite database (or --database-url) with --subscriptions subscriptions, then
+sends NDJSON and CSV batches of --events events each and reports events per second end to end:
+request parsing, validation, the subscription check and the writes (COPY on Postgres).
+'''
+import argparse
+import os
+import time
+import uuid
+from datetime import datetime, timedelta
+
+
+def bodies(subscription_ids, events):
+    start = datetime(2026, 1, 1)
+    rows = [
+        (str(subscription_ids[i % len(subscription_ids)]), (start + timedelta(seconds=i)).isoformat(), i % 100)
+        for i in range(events)
+    ]
+    ndjson = "\n".join(f'{{"subscription_id":"{id}","timestamp":"{at}","calls":{calls}}}' for id, at, calls in rows)
+    csv = "subscription_id,timestamp,calls\n" + "\n".join(f"{id},{at},{calls}" for id, at, calls in rows)
+    return {"application/x-ndjson": ndjson.encode(), "text/csv": csv.encode()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=500_000, help="events per batch")
+    parser.add_argument("--subscriptions", type=int, default=1_000)
+    parser.add_argument("--database-url", default="sqlite://")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("JWT_SECRET_KEY", "benchmark")
+
+    from flask_jwt_extended import create_access_token
+    from app import create_app, db
+    from models import Subscription, User
+    from benchmarks.serializer_benchmark import seed
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        seed(db, args.subscriptions, 0)
+        ids = [id for (id,) in db.session.query(Subscription.id)]
+        headers = {"Authorization": f"Bearer {create_access_token(identity=str(db.session.query(User.id).scalar()))}"}
+        db.session.remove()
+
+    client = app.test_client()
+    for mimetype, body in bodies(ids, args.events).items():
+        start = time.perf_counter()
+        res = client.put(f"/usage-batches/{uuid.uuid4()}", headers={**headers, "Content-Type": mimetype}, data=body)
+        elapsed = time.perf_counter() - start
+        assert res.status_code == 201, res.get_data(as_text=True)
+        print(f"{mimetype:<20} {args.events} events {elapsed:8.2f}s {args.events / elapsed:10.0f} events/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,15 +2,31 @@ from flask import Blueprint, request
 from app import db
 from models import Subscription, SubscriptionTier 
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from schemas.subscription_schema import subscription_read_schema, subscriptions_read_schema, subscription_write_schema
+from schemas.subscription_schema import subscription_read_schema, subscriptions_read_schema, subscription_write_schema, subscription_read_options, subscription_read_dependents
 from schemas.subscription_tier_schema import subscription_tiers_read_schema
 from marshmallow import ValidationError
 from uuid import UUID
-from utils.response import ok, created, bad_request, not_found, server_error
+from datetime import datetime, timezone
+from utils.response import ok, created, bad_request, not_found, server_error, wants_stream, stream, not_modified
+from utils.conditional import collection_validators, resource_validators
+from utils.pagination import paginate, PaginationError
+from utils.fields import parse_fields, FieldsError
+from schemas.compiled import compiled_serializer
+from schemas.tier_index import find_tier, invalidate_tier_index
+from utils.bulk import batch_payload, bulk_insert, dump_created, archive_ids, archive, BatchError, wants_cascade
+from sqlalchemy.exc import IntegrityError
+from utils.filters import apply_filters, apply_as_of, parse_sort, FilterError
 
 # Initialize subscription Blueprint
 subscription_bp = Blueprint('subscription', __name__)
 
+# Filters and sort columns accepted by GET /subscriptions
+SUBSCRIPTION_FILTERS = ("contract_id", "product_id", "is_archived", "pricing_type", "strategy")
+SUBSCRIPTION_SORTS = ("created_at", "updated_at")
+
+# Relationships archived along with a subscription when ?cascade=true
+SUBSCRIPTION_ARCHIVE_CASCADE = (Subscription.tiers,)
+
 # Subscription Endpoints
 @subscription_bp.route('/subscriptions', methods=['POST', 'GET'])
 @jwt_required()
@@ -43,34 +59,121 @@ def Subscriptions():
 
     elif request.method == 'GET':
         try:
-            subscriptions = db.session.query(Subscription).all()
+            fields = parse_fields(subscriptions_read_schema)
+            sort = parse_sort(SUBSCRIPTION_SORTS)
+            base = apply_filters(db.session.query(Subscription), Subscription, SUBSCRIPTION_FILTERS)
+            base = apply_as_of(base, Subscription)
+            validators = collection_validators(base, Subscription, subscription_read_dependents)
+            if validators.not_modified():
+                return not_modified(validators)
+
+            serializer = compiled_serializer(subscriptions_read_schema, fields)
+            query = serializer.select(base, sort)
+            if wants_stream():
+                return validators.apply(stream(query, Subscription, serializer, sort))
+
+            subscriptions, meta = paginate(query, Subscription, sort)
         
-            return ok(data={"subscriptions": subscriptions_read_schema.dump(subscriptions)}, message="Subscriptions fetched successfully")
+            return validators.apply(ok(data={"subscriptions": serializer.dump(subscriptions)}, message="Subscriptions fetched successfully", meta=meta))
+
+        except PaginationError as pe:
+            return bad_request(message="Invalid pagination parameters", errors=str(pe))
 
+        except FieldsError as fe:
+            return bad_request(message="Invalid fields parameter", errors=str(fe))
+
+        except FilterError as fle:
+            return bad_request(message="Invalid filter parameters", errors=str(fle))
 
         except Exception as e:
             return server_error(message="Error fetching subscriptions", errors=str(e))
 
 
+@subscription_bp.route('/subscriptions:batch', methods=['POST'])
+@jwt_required()
+def Subscriptions_batch():
+    '''
+    Post: Create an array of subscriptions in one transaction. Errors are reported by array index and nothing is created.
+    '''
+    current_user_id = get_jwt_identity()
+
+    try:
+        data = batch_payload()
+        validated = subscription_write_schema.load(data, many=True)
+
+        ids = bulk_insert(Subscription, validated, current_user_id)
+        db.session.commit()
+
+        serializer = compiled_serializer(subscriptions_read_schema)
+        return created(data={"subscriptions": dump_created(serializer, Subscription, ids)}, message="Subscriptions created successfully")
+
+    except BatchError as be:
+        return bad_request(message="Invalid batch", errors=str(be))
+
+    except ValidationError as ve:
+        db.session.rollback()
+        return bad_request(message="Validation Error", errors=ve.messages)
+
+    except IntegrityError as ie:
+        db.session.rollback()
+        return bad_request(message="Batch conflicts with existing data", errors=str(ie.orig))
+
+    except Exception as e:
+        db.session.rollback()
+        return server_error(message="Error creating subscriptions", errors=str(e))
+
+
+@subscription_bp.route('/subscriptions:archive', methods=['POST'])
+@jwt_required()
+def Subscriptions_archive():
+    '''
+    Post: Archive an array of subscriptions by id with set-based updates (?cascade=true also archives everything below them)
+    '''
+    current_user_id = get_jwt_identity()
+
+    try:
+        ids = archive_ids(Subscription)
+        cascade = wants_cascade()
+        archived = archive(Subscription, ids, current_user_id, SUBSCRIPTION_ARCHIVE_CASCADE if cascade else ())
+        db.session.commit()
+        if cascade:
+            invalidate_tier_index(*ids)
+
+        return ok(data={"archived": archived}, message="Subscriptions archived successfully")
+
+    except BatchError as be:
+        return bad_request(message="Invalid batch", errors=str(be))
+
+    except ValidationError as ve:
+        return bad_request(message="Validation Error", errors=ve.messages)
+
+    except Exception as e:
+        db.session.rollback()
+        return server_error(message="Error archiving subscriptions", errors=str(e))
+
+
 @subscription_bp.route('/subscriptions/<id>', methods=['GET','PUT','PATCH','DELETE'])
 @jwt_required()
 def Subscription_id(id):
     ''' 
     Get: Get details of specific Subscription
     Put: Update details of subscription with given ID
-    Delete: Archive a subscription with given ID
+    Delete: Archive a subscription with given ID (?cascade=true also archives its tiers)
     '''
     current_user_id = get_jwt_identity()
 
     if request.method == 'GET':
         try:
             id_obj = UUID(id) if isinstance(id, str) else id
-            subscription = db.session.get(Subscription, id_obj)
-            
-            if not subscription:
+            validators = resource_validators(Subscription, id_obj, subscription_read_dependents)
+            if not validators:
                 return not_found(message="Subscription not found")
+            if validators.not_modified():
+                return not_modified(validators)
+
+            subscription = db.session.get(Subscription, id_obj, options=subscription_read_options())
 
-            return ok(data={"subscription": subscription_read_schema.dump(subscription)}, message="Subscription fetched successfully")
+            return validators.apply(ok(data={"subscription": subscription_read_schema.dump(subscription)}, message="Subscription fetched successfully"))
         
 
         except Exception as e:
@@ -118,7 +221,12 @@ def Subscription_id(id):
 
             subscription.is_archived = True
             subscription.updated_by = current_user_id
+            cascade = wants_cascade()
+            if cascade:
+                archive(Subscription, [id_obj], current_user_id, SUBSCRIPTION_ARCHIVE_CASCADE)
             db.session.commit()
+            if cascade:
+                invalidate_tier_index(id_obj)
 
             return ok(data={"subscription": subscription_read_schema.dump(subscription)}, message="Subscription has been archived successfully")    
 
@@ -141,14 +249,49 @@ def Subscription_Tiers_id(id):
             if not subscription:
                 return not_found(message="Subscription not found") 
 
-            tiers_objs = db.session.query(SubscriptionTier).filter(SubscriptionTier.subscription_id==id_obj).all()
-            tiers = subscription_tiers_read_schema.dump(tiers_objs)
+            serializer = compiled_serializer(subscription_tiers_read_schema)
+            tiers_objs, meta = paginate(serializer.select(db.session.query(SubscriptionTier).filter(SubscriptionTier.subscription_id==id_obj)), SubscriptionTier)
+            tiers = serializer.dump(tiers_objs)
 
-            return ok(data={"tiers": tiers}, message="Subscription tiers fetched successfully")
+            return ok(data={"tiers": tiers}, message="Subscription tiers fetched successfully", meta=meta)
+
+        except PaginationError as pe:
+            return bad_request(message="Invalid pagination parameters", errors=str(pe))
 
         except Exception as e:
             return server_error(message="Error fetching subscription tiers", errors=str(e))
 
 
+@subscription_bp.route('/subscriptions/<id>/tiers/lookup', methods=['GET'])
+@jwt_required()
+def Subscription_Tier_lookup(id):
+    '''
+    Get: The tier of a subscription covering ?calls= at ?at= (an ISO-8601 timestamp, now by default)
+    '''
+    try:
+        id_obj = UUID(id) if isinstance(id, str) else id
+        if "calls" not in request.args:
+            raise ValueError("calls is required")
+        calls = int(request.args["calls"])
+        if calls < 0:
+            raise ValueError("calls must not be negative")
+        at = datetime.fromisoformat(request.args["at"]) if "at" in request.args else datetime.now(timezone.utc)
+        if at.tzinfo is not None:
+            # tier dates are stored as naive UTC
+            at = at.astimezone(timezone.utc).replace(tzinfo=None)
+
+        tier = find_tier(id_obj, calls, at)
+        if tier is None:
+            return not_found(message="No tier covers that call count at that time")
+
+        return ok(data={"subscription_tier": tier}, message="Subscription tier found")
+
+    except ValueError as ve:
+        return bad_request(message="Invalid lookup parameters", errors=str(ve))
+
+    except Exception as e:
+        return server_error(message="Error looking up subscription tier", errors=str(e))
+
+
 
 
@@ -1,15 +1,56 @@
 from flask import Blueprint, request
 from app import db
-from models import SubscriptionTier 
+from models import SubscriptionTier, Subscription
+from models.subscription_tier import TIER_OVERLAP_CONSTRAINT
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from schemas.subscription_tier_schema import subscription_tier_read_schema, subscription_tiers_read_schema, subscription_tier_write_schema
-from schemas.subscription_schema import subscription_read_schema
+from schemas.subscription_schema import subscription_read_schema, subscription_read_options
 from marshmallow import ValidationError
 from uuid import UUID
-from utils.response import ok, created, bad_request, not_found, server_error
+from utils.response import ok, created, bad_request, not_found, server_error, wants_stream, stream, not_modified
+from utils.conditional import collection_validators, resource_validators
+from utils.pagination import paginate, PaginationError
+from utils.fields import parse_fields, FieldsError
+from schemas.compiled import compiled_serializer
+from schemas.tier_index import invalidate_tier_index, invalidate_tier_indexes
+from utils.bulk import batch_payload, bulk_insert, dump_created, archive_ids, archive, BatchError
+from sqlalchemy.exc import IntegrityError, DataError
+from datetime import timezone
+from utils.filters import apply_filters, apply_as_of, parse_sort, FilterError
 
 subscription_tier_bp = Blueprint('subscription_tier', __name__)
 
+# Filters and sort columns accepted by GET /subscription-tiers
+SUBSCRIPTION_TIER_FILTERS = ("subscription_id", "is_archived")
+SUBSCRIPTION_TIER_SORTS = ("created_at", "updated_at")
+
+# Reported when the database rejects a tier overlapping a live sibling
+OVERLAP_ERROR = {"error": "Tier overlaps another live tier of the subscription in calls and dates"}
+
+
+def _naive_utc(value):
+    return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo is not None else value
+
+
+def range_errors(tier):
+    '''
+    The errors of a tier whose call range or dates are inverted once a partial update is applied,
+    the checks the write schema can only make when both sides are sent
+    '''
+    if tier.min_calls >= tier.max_calls:
+        return {"min_calls": "min_calls must be < max_calls"}
+    if _naive_utc(tier.start_date) >= _naive_utc(tier.end_date):
+        return {"error": "start_date must be before end_date."}
+    return None
+
+
+def is_overlap(error):
+    '''
+    True when an IntegrityError comes from the tier overlap constraint (Postgres) or trigger (SQLite)
+    '''
+    return TIER_OVERLAP_CONSTRAINT in str(error.orig)
+
+
 @subscription_tier_bp.route('/subscription-tiers', methods=['POST', 'GET'])
 @jwt_required()
 def Subscription_tier():
@@ -24,26 +65,119 @@ def Subscription_tier():
 
             db.session.add(new_tier)
             db.session.commit()
+            invalidate_tier_index(new_tier.subscription_id)
 
             return created(data={"subscription_tier": subscription_tier_read_schema.dump(new_tier)}, message="Subscription tier created successfully")
         except ValidationError as ve:
             return bad_request(message="Validation Error", errors=ve.messages)
 
+        except IntegrityError as ie:
+            db.session.rollback()
+            if is_overlap(ie):
+                return bad_request(message="Validation Error", errors=OVERLAP_ERROR)
+            return server_error(message="Error creating subscription tier", errors=str(ie))
+
         except Exception as e:
             db.session.rollback()
             return server_error(message="Error creating subscription tier", errors=str(e))
     
     elif request.method == 'GET':
         try:
-            tiers = db.session.query(SubscriptionTier).all()
+            fields = parse_fields(subscription_tiers_read_schema)
+            sort = parse_sort(SUBSCRIPTION_TIER_SORTS)
+            base = apply_filters(db.session.query(SubscriptionTier), SubscriptionTier, SUBSCRIPTION_TIER_FILTERS)
+            base = apply_as_of(base, SubscriptionTier)
+            validators = collection_validators(base, SubscriptionTier)
+            if validators.not_modified():
+                return not_modified(validators)
+
+            serializer = compiled_serializer(subscription_tiers_read_schema, fields)
+            query = serializer.select(base, sort)
+            if wants_stream():
+                return validators.apply(stream(query, SubscriptionTier, serializer, sort))
+
+            tiers, meta = paginate(query, SubscriptionTier, sort)
             
-            return ok(data={"subscription_tiers": subscription_tiers_read_schema.dump(tiers)}, message="Subscription tiers retrieved successfully")
+            return validators.apply(ok(data={"subscription_tiers": serializer.dump(tiers)}, message="Subscription tiers retrieved successfully", meta=meta))
+
+        except PaginationError as pe:
+            return bad_request(message="Invalid pagination parameters", errors=str(pe))
+
+        except FieldsError as fe:
+            return bad_request(message="Invalid fields parameter", errors=str(fe))
+
+        except FilterError as fle:
+            return bad_request(message="Invalid filter parameters", errors=str(fle))
 
         except Exception as e:
             db.session.rollback()
             return server_error(message="Error fetching subscription tiers", errors=str(e))
 
 
+@subscription_tier_bp.route('/subscription-tiers:batch', methods=['POST'])
+@jwt_required()
+def Subscription_tiers_batch():
+    '''
+    Post: Create an array of subscription tiers in one transaction. Errors are reported by array index and nothing is created.
+    '''
+    current_user_id = get_jwt_identity()
+
+    try:
+        data = batch_payload()
+        validated = subscription_tier_write_schema.load(data, many=True)
+
+        ids = bulk_insert(SubscriptionTier, validated, current_user_id)
+        db.session.commit()
+        invalidate_tier_index(*[tier["subscription_id"] for tier in validated])
+
+        serializer = compiled_serializer(subscription_tiers_read_schema)
+        return created(data={"subscription_tiers": dump_created(serializer, SubscriptionTier, ids)}, message="Subscription tiers created successfully")
+
+    except BatchError as be:
+        return bad_request(message="Invalid batch", errors=str(be))
+
+    except ValidationError as ve:
+        db.session.rollback()
+        return bad_request(message="Validation Error", errors=ve.messages)
+
+    except IntegrityError as ie:
+        db.session.rollback()
+        if is_overlap(ie):
+            return bad_request(message="Validation Error", errors=OVERLAP_ERROR)
+        return bad_request(message="Batch conflicts with existing data", errors=str(ie.orig))
+
+    except Exception as e:
+        db.session.rollback()
+        return server_error(message="Error creating subscription tiers", errors=str(e))
+
+
+@subscription_tier_bp.route('/subscription-tiers:archive', methods=['POST'])
+@jwt_required()
+def Subscription_tiers_archive():
+    '''
+    Post: Archive an array of subscription tiers by id with set-based updates
+    '''
+    current_user_id = get_jwt_identity()
+
+    try:
+        ids = archive_ids(SubscriptionTier)
+        archived = archive(SubscriptionTier, ids, current_user_id)
+        db.session.commit()
+        invalidate_tier_indexes()
+
+        return ok(data={"archived": archived}, message="Subscription tiers archived successfully")
+
+    except BatchError as be:
+        return bad_request(message="Invalid batch", errors=str(be))
+
+    except ValidationError as ve:
+        return bad_request(message="Validation Error", errors=ve.messages)
+
+    except Exception as e:
+        db.session.rollback()
+        return server_error(message="Error archiving subscription tiers", errors=str(e))
+
+
 @subscription_tier_bp.route('/subscription-tiers/<id>', methods=['GET','PUT','PATCH','DELETE'])
 @jwt_required()
 def Subscription_tier_id(id):
@@ -52,12 +186,15 @@ def Subscription_tier_id(id):
     if request.method == 'GET':
         try:
             id_obj = UUID(id) if isinstance(id, str) else id
-            tier = db.session.get(SubscriptionTier, id_obj)
-            
-            if not tier:
+            validators = resource_validators(SubscriptionTier, id_obj)
+            if not validators:
                 return not_found(message="Subscription tier not found")
+            if validators.not_modified():
+                return not_modified(validators)
+
+            tier = db.session.get(SubscriptionTier, id_obj)
 
-            return ok(data={"subscription_tier": subscription_tier_read_schema.dump(tier)}, message="Subscription tier retrieved successfully")
+            return validators.apply(ok(data={"subscription_tier": subscription_tier_read_schema.dump(tier)}, message="Subscription tier retrieved successfully"))
         
         except Exception as e:
             db.session.rollback()
@@ -76,16 +213,33 @@ def Subscription_tier_id(id):
 
             validated = subscription_tier_write_schema.load(data, partial=True)
 
+            # the tier may move to another subscription, whose index changes too
+            previous_subscription_id = tier.subscription_id
             for key, value in validated.items():
                 setattr(tier, key, value)
+            errors = range_errors(tier)
+            if errors:
+                raise ValidationError(errors)
             tier.updated_by = current_user_id
 
             db.session.commit()
+            invalidate_tier_index(previous_subscription_id, tier.subscription_id)
             return ok(message="Subscription tier updated successfully")
 
         except ValidationError as ve:
             db.session.rollback()
             return bad_request(message="Validation Error", errors=ve.messages)
+
+        except IntegrityError as ie:
+            db.session.rollback()
+            if is_overlap(ie):
+                return bad_request(message="Validation Error", errors=OVERLAP_ERROR)
+            return server_error(message="Error updating subscription tier", errors=str(ie))
+
+        except DataError as de:
+            # a value the database cannot store, e.g. an empty range on Postgres
+            db.session.rollback()
+            return bad_request(message="Validation Error", errors=str(de.orig))
         
         except Exception as e:
             db.session.rollback()
@@ -106,6 +260,7 @@ def Subscription_tier_id(id):
             tier.updated_by = current_user_id
 
             db.session.commit()
+            invalidate_tier_index(tier.subscription_id)
             return ok(message="Subscription tier archived successfully")
 
         except Exception as e:
@@ -127,7 +282,7 @@ def Subscription_tier_Subscriptions_id(id):
         if not tier:
             return not_found(message="Subscription tier not found")
 
-        subscription = getattr(tier, 'subscription', None)
+        subscription = db.session.get(Subscription, tier.subscription_id, options=subscription_read_options())
         if not subscription:
             return not_found(message="No subscription found for this tier")
 
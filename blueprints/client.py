@@ -1,17 +1,32 @@
 from flask import Blueprint, request
 from app import db
-from models import Client
-import validators
+from models import Client, Contract, Subscription
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from schemas.client_schema import client_read_schema, clients_read_schema, client_write_schema
 from schemas.contract_schema import contracts_read_schema
 from marshmallow import ValidationError
 from uuid import UUID
-from utils.response import ok, created, bad_request, not_found, server_error
+from utils.response import ok, created, bad_request, not_found, server_error, wants_stream, stream, not_modified
+from utils.conditional import collection_validators, resource_validators
+from utils.pagination import paginate, PaginationError
+from utils.fields import parse_fields, FieldsError
+from schemas.compiled import compiled_serializer
+from schemas.tier_index import invalidate_tier_indexes
+from utils.bulk import batch_payload, bulk_insert, dump_created, archive_ids, archive, BatchError, wants_cascade
+from sqlalchemy.exc import IntegrityError
+from utils.filters import apply_filters, parse_sort, FilterError
+from schemas.cache import cached_dump, invalidate
 
 # Initialize client Blueprint
 client_bp = Blueprint('client', __name__)
 
+# Filters and sort columns accepted by GET /clients
+CLIENT_FILTERS = ("is_archived",)
+CLIENT_SORTS = ("created_at", "updated_at", "company_name")
+
+# Relationships archived along with a client when ?cascade=true
+CLIENT_ARCHIVE_CASCADE = (Client.contracts, Contract.subscriptions, Subscription.tiers)
+
 # Client Endpoints
 @client_bp.route('/clients', methods=['POST','GET'])
 @jwt_required()
@@ -46,33 +61,120 @@ def Clients():
 
     elif request.method == 'GET':
         try:
-            clients = db.session.query(Client).all()
+            fields = parse_fields(clients_read_schema)
+            sort = parse_sort(CLIENT_SORTS)
+            base = apply_filters(db.session.query(Client), Client, CLIENT_FILTERS)
+            validators = collection_validators(base, Client)
+            if validators.not_modified():
+                return not_modified(validators)
+
+            serializer = compiled_serializer(clients_read_schema, fields)
+            query = serializer.select(base, sort)
+            if wants_stream():
+                return validators.apply(stream(query, Client, serializer, sort))
+
+            clients, meta = paginate(query, Client, sort)
             
-            return ok(data={"clients": clients_read_schema.dump(clients)}, message="Clients retrieved successfully")
+            return validators.apply(ok(data={"clients": serializer.dump(clients)}, message="Clients retrieved successfully", meta=meta))
+
+        except PaginationError as pe:
+            return bad_request(message="Invalid pagination parameters", errors=str(pe))
+
+        except FieldsError as fe:
+            return bad_request(message="Invalid fields parameter", errors=str(fe))
+
+        except FilterError as fle:
+            return bad_request(message="Invalid filter parameters", errors=str(fle))
 
         except Exception as e:
             return server_error(message="Error retrieving clients", errors=str(e))
 
 
+@client_bp.route('/clients:batch', methods=['POST'])
+@jwt_required()
+def Clients_batch():
+    '''
+    Post: Create an array of clients in one transaction. Errors are reported by array index and nothing is created.
+    '''
+    current_user_id = get_jwt_identity()
+
+    try:
+        data = batch_payload()
+        validated = client_write_schema.load(data, many=True)
+
+        ids = bulk_insert(Client, validated, current_user_id)
+        db.session.commit()
+
+        serializer = compiled_serializer(clients_read_schema)
+        return created(data={"clients": dump_created(serializer, Client, ids)}, message="Clients created successfully")
+
+    except BatchError as be:
+        return bad_request(message="Invalid batch", errors=str(be))
+
+    except ValidationError as ve:
+        db.session.rollback()
+        return bad_request(message="Validation Error", errors=ve.messages)
+
+    except IntegrityError as ie:
+        db.session.rollback()
+        return bad_request(message="Batch conflicts with existing data", errors=str(ie.orig))
+
+    except Exception as e:
+        db.session.rollback()
+        return server_error(message="Error creating clients", errors=str(e))
+
+
+@client_bp.route('/clients:archive', methods=['POST'])
+@jwt_required()
+def Clients_archive():
+    '''
+    Post: Archive an array of clients by id with set-based updates (?cascade=true also archives everything below them)
+    '''
+    current_user_id = get_jwt_identity()
+
+    try:
+        ids = archive_ids(Client)
+        cascade = wants_cascade()
+        archived = archive(Client, ids, current_user_id, CLIENT_ARCHIVE_CASCADE if cascade else ())
+        db.session.commit()
+        if cascade:
+            invalidate_tier_indexes()
+        for id in ids:
+            invalidate(Client, id)
+
+        return ok(data={"archived": archived}, message="Clients archived successfully")
+
+    except BatchError as be:
+        return bad_request(message="Invalid batch", errors=str(be))
+
+    except ValidationError as ve:
+        return bad_request(message="Validation Error", errors=ve.messages)
+
+    except Exception as e:
+        db.session.rollback()
+        return server_error(message="Error archiving clients", errors=str(e))
+
+
 @client_bp.route('/clients/<id>', methods=['GET', 'PUT','PATCH', 'DELETE'])
 @jwt_required()
 def Client_id(id):
     '''
     GET: Get existing client from DB using client ID
     PUT: Update existing client in DB using client ID
-    DELETE: Archive existing client from DB using client ID
+    DELETE: Archive existing client from DB using client ID (?cascade=true also archives its contracts, subscriptions and tiers)
     '''
     current_user_id = get_jwt_identity()
 
     if request.method == 'GET':
         try:
             id_obj = UUID(id) if isinstance(id, str) else id
-            client = db.session.get(Client, id_obj)
-            
-            if not client:
+            validators = resource_validators(Client, id_obj)
+            if not validators:
                 return not_found(message="Client not found")
-            
-            return ok(data={"client": client_read_schema.dump(client)}, message="Client retrieved successfully")
+            if validators.not_modified():
+                return not_modified(validators)
+
+            return validators.apply(ok(data={"client": cached_dump(Client, id_obj, validators.last_modified)}, message="Client retrieved successfully"))
         
         except Exception as e:
             db.session.rollback()
@@ -96,6 +198,7 @@ def Client_id(id):
             client.updated_by = current_user_id
 
             db.session.commit()
+            invalidate(Client, client.id)
 
             return ok(data={"client": client_read_schema.dump(client)}, message="Client updated successfully")
         
@@ -119,8 +222,14 @@ def Client_id(id):
             
             client.is_archived = True
             client.updated_by = current_user_id
+            cascade = wants_cascade()
+            if cascade:
+                archive(Client, [id_obj], current_user_id, CLIENT_ARCHIVE_CASCADE)
 
             db.session.commit()
+            if cascade:
+                invalidate_tier_indexes()
+            invalidate(Client, client.id)
             return ok(data={"client": client_read_schema.dump(client)}, message="Client archived successfully")
 
         except Exception as e:
@@ -142,8 +251,12 @@ def Client_Contracts_id(id):
             if not client:
                 return not_found(message="Client not found")
 
-            contracts = client.contracts
-            return ok(data={"contracts": contracts_read_schema.dump(contracts)}, message="Contracts retrieved successfully")
+            serializer = compiled_serializer(contracts_read_schema)
+            contracts, meta = paginate(serializer.select(db.session.query(Contract).filter(Contract.client_id==id_obj)), Contract)
+            return ok(data={"contracts": serializer.dump(contracts)}, message="Contracts retrieved successfully", meta=meta)
+
+        except PaginationError as pe:
+            return bad_request(message="Invalid pagination parameters", errors=str(pe))
 
         except Exception as e:
             db.session.rollback()
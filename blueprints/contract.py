@@ -1,18 +1,33 @@
 from flask import Blueprint, request, jsonify
 from app import db
-from models import Contract, User
+from models import Contract, User, Subscription, Product
+from sqlalchemy import exists
 from datetime import datetime
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from schemas.contract_schema import contract_read_schema, contracts_read_schema, contract_write_schema
+from schemas.contract_schema import contract_read_schema, contracts_read_schema, contract_write_schema, contract_read_options, contract_read_dependents
 from schemas.product_schema import product_read_schema, products_read_schema
 from marshmallow import ValidationError
 from uuid import UUID
-from utils.response import ok, created, bad_request, not_found, server_error
+from utils.response import ok, created, bad_request, not_found, server_error, wants_stream, stream, not_modified
+from utils.conditional import collection_validators, resource_validators
+from utils.pagination import paginate, PaginationError
+from utils.fields import parse_fields, sparse_schema, load_only_options, FieldsError
+from schemas.compiled import compiled_serializer
+from schemas.tier_index import invalidate_tier_indexes
+from utils.bulk import archive_ids, archive, BatchError, wants_cascade
+from utils.filters import apply_filters, apply_as_of, parse_sort, FilterError
 
 
 # Initialize contract Blueprint
 contract_bp = Blueprint('contract', __name__)
 
+# Filters and sort columns accepted by GET /contracts
+CONTRACT_FILTERS = ("client_id", "is_archived")
+CONTRACT_SORTS = ("created_at", "updated_at")
+
+# Relationships archived along with a contract when ?cascade=true
+CONTRACT_ARCHIVE_CASCADE = (Contract.subscriptions, Subscription.tiers)
+
 @contract_bp.route('/contracts', methods=['POST','GET'])
 @jwt_required()
 def Contracts():
@@ -46,32 +61,90 @@ def Contracts():
 
     elif request.method == 'GET':
         try:
-            contracts = db.session.query(Contract).all()
+            fields = parse_fields(contracts_read_schema)
+            sort = parse_sort(CONTRACT_SORTS)
+            base = apply_filters(db.session.query(Contract), Contract, CONTRACT_FILTERS)
+            base = apply_as_of(base, Contract)
+            validators = collection_validators(base, Contract, contract_read_dependents)
+            if validators.not_modified():
+                return not_modified(validators)
+
+            serializer = compiled_serializer(contracts_read_schema, fields)
+            query = serializer.select(base, sort)
+            if wants_stream():
+                return validators.apply(stream(query, Contract, serializer, sort))
+
+            contracts, meta = paginate(query, Contract, sort)
             
-            return ok(data={"contracts": contracts_read_schema.dump(contracts)}, message="Contracts fetched successfully")
+            return validators.apply(ok(data={"contracts": serializer.dump(contracts)}, message="Contracts fetched successfully", meta=meta))
+
+        except PaginationError as pe:
+            return bad_request(message="Invalid pagination parameters", errors=str(pe))
+
+        except FieldsError as fe:
+            return bad_request(message="Invalid fields parameter", errors=str(fe))
+
+        except FilterError as fle:
+            return bad_request(message="Invalid filter parameters", errors=str(fle))
 
         except Exception as e:
             db.session.rollback()
             return server_error(message="Error fetching contracts", errors=str(e))
 
 
+@contract_bp.route('/contracts:archive', methods=['POST'])
+@jwt_required()
+def Contracts_archive():
+    '''
+    Post: Archive an array of contracts by id with set-based updates (?cascade=true also archives everything below them)
+    '''
+    current_user_id = get_jwt_identity()
+
+    try:
+        ids = archive_ids(Contract)
+        cascade = wants_cascade()
+        archived = archive(Contract, ids, current_user_id, CONTRACT_ARCHIVE_CASCADE if cascade else ())
+        db.session.commit()
+        if cascade:
+            invalidate_tier_indexes()
+
+        return ok(data={"archived": archived}, message="Contracts archived successfully")
+
+    except BatchError as be:
+        return bad_request(message="Invalid batch", errors=str(be))
+
+    except ValidationError as ve:
+        return bad_request(message="Validation Error", errors=ve.messages)
+
+    except Exception as e:
+        db.session.rollback()
+        return server_error(message="Error archiving contracts", errors=str(e))
+
+
 @contract_bp.route('/contracts/<id>', methods=['GET', 'PUT','PATCH', 'DELETE'])
 @jwt_required()
 def Contract_id(id):
     ''' 
     Get: Get details of specific Contract
     Put/PATCH: Update details of contract with given ID
-    Delete: Archive a contract with given ID
+    Delete: Archive a contract with given ID (?cascade=true also archives its subscriptions and tiers)
     '''
     if request.method == 'GET':
         try:
+            fields = parse_fields(contract_read_schema)
             id_obj = UUID(id) if isinstance(id, str) else id
-            contract = db.session.get(Contract, id_obj)
-            
-            if not contract:
+            validators = resource_validators(Contract, id_obj, contract_read_dependents)
+            if not validators:
                 return not_found(message="Contract not found")
+            if validators.not_modified():
+                return not_modified(validators)
+
+            contract = db.session.get(Contract, id_obj, options=[*contract_read_options(fields), *load_only_options(Contract, fields)])
 
-            return ok(data={"contract": contract_read_schema.dump(contract)}, message="Contract fetched successfully")
+            return validators.apply(ok(data={"contract": sparse_schema(contract_read_schema, fields).dump(contract)}, message="Contract fetched successfully"))
+
+        except FieldsError as fe:
+            return bad_request(message="Invalid fields parameter", errors=str(fe))
 
         except Exception as e:
             db.session.rollback()
@@ -117,8 +190,13 @@ def Contract_id(id):
 
             contract.is_archived = True
             contract.updated_by = get_jwt_identity()
+            cascade = wants_cascade()
+            if cascade:
+                archive(Contract, [id_obj], get_jwt_identity(), CONTRACT_ARCHIVE_CASCADE)
 
             db.session.commit()
+            if cascade:
+                invalidate_tier_indexes()
             return ok(message="Contract has been archived successfully")
 
         except Exception as e:
@@ -142,20 +220,15 @@ def Contract_Product_id(id):
         if not contract:
             return not_found(message="Contract not found")
 
-        
-        unique_products = {}
-        for subscription in contract.subscriptions:
-            
-            product = subscription.product
-            
-
-            if getattr(product, "is_archived", False):
-                continue 
+        # live products with at least one live subscription on this contract
+        linked = exists().where(Subscription.product_id == Product.id, Subscription.contract_id == id_obj, Subscription.is_archived == False)
+        serializer = compiled_serializer(products_read_schema)
+        products, meta = paginate(serializer.select(db.session.query(Product).filter(Product.is_archived == False, linked)), Product)
 
-            unique_products[str(product.id)] = product
+        return ok(data={"products": serializer.dump(products)}, message="Products fetched successfully", meta=meta)
 
-        products_list = products_read_schema.dump(list(unique_products.values()))
-        return ok(data={"products": products_list}, message="Products fetched successfully")
+    except PaginationError as pe:
+        return bad_request(message="Invalid pagination parameters", errors=str(pe))
 
     except Exception as e:
         db.session.rollback()
@@ -0,0 +1,49 @@
+import click
+from flask import Blueprint, request, Response, stream_with_context
+from flask_jwt_extended import jwt_required
+from utils.response import bad_request, server_error
+from utils.export import export_batches, export_writer, export_formats, ExportError, EXPORT_BATCH_SIZE
+
+# Initialize export Blueprint, its commands run as `flask --app run exports <command>`
+export_bp = Blueprint('export', __name__, cli_group='exports')
+
+
+@export_bp.route('/exports/contracts', methods=['GET'])
+@jwt_required()
+def Export_contracts():
+    '''
+    Get: Every contract with its client, subscriptions, products and tiers as one flat row per tier,
+         streamed as ?format=csv (default) or parquet, live rows only unless ?include_archived=true
+    '''
+    try:
+        format = request.args.get("format", "csv")
+        write, mimetype = export_writer(format)
+        include_archived = request.args.get("include_archived") in ("1", "true")
+        chunks = write(export_batches(include_archived))
+
+        return Response(
+            stream_with_context(chunks), mimetype=mimetype,
+            headers={"Content-Disposition": f"attachment; filename=contracts.{format}"},
+        )
+
+    except ExportError as ee:
+        return bad_request(message="Invalid export parameters", errors=str(ee))
+
+    except Exception as e:
+        return server_error(message="Error exporting contracts", errors=str(e))
+
+
+@export_bp.cli.command('contracts')
+@click.option('--output', required=True, type=click.Path(dir_okay=False, writable=True), help="file to write")
+@click.option('--format', 'format', type=click.Choice(export_formats()), default="csv", show_default=True)
+@click.option('--include-archived', is_flag=True, help="also export archived contracts, subscriptions and tiers")
+@click.option('--batch-size', default=EXPORT_BATCH_SIZE, show_default=True, help="rows fetched and written at a time")
+def Export_contracts_command(output, format, include_archived, batch_size):
+    '''
+    Write every contract with its client, subscriptions, products and tiers to a CSV or Parquet file, one row per tier
+    '''
+    write, _ = export_writer(format)
+    with open(output, "wb") as file:
+        for chunk in write(export_batches(include_archived, batch_size)):
+            file.write(chunk.encode() if isinstance(chunk, str) else chunk)
+    click.echo(f"contracts exported to {output}")
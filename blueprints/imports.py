@@ -0,0 +1,71 @@
+import io
+import click
+from flask import Blueprint, request
+from app import db
+from models import User
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from schemas.tier_index import invalidate_tier_indexes
+from utils.response import ok, bad_request, server_error
+from utils.usage import CSV_MIMETYPE
+from utils.importing import import_spec, import_rows, read_rows, BulkImportError, IMPORTS, IMPORT_CHUNK_SIZE
+
+# Initialize import Blueprint, its commands run as `flask --app run imports <command>`
+import_bp = Blueprint('import', __name__, cli_group='imports')
+
+
+@import_bp.route('/imports/<entity>', methods=['POST'])
+@jwt_required()
+def Import_rows(entity):
+    '''
+    Post: Bulk import clients, products or tiers from a CSV body (text/csv) with a header line. Valid rows are
+          loaded chunk by chunk; rejected rows come back as CSV with their line number and errors.
+    '''
+    current_user_id = get_jwt_identity()
+
+    try:
+        spec = import_spec(entity)
+        if request.mimetype != CSV_MIMETYPE:
+            raise BulkImportError(f"Imports are sent as {CSV_MIMETYPE}")
+        rejected = io.StringIO()
+        try:
+            counts = import_rows(spec, read_rows(spec, request.stream), current_user_id, rejected)
+        finally:
+            # chunks are committed one by one, those before a failing chunk are stored too
+            if entity == "tiers":
+                invalidate_tier_indexes()
+
+        return ok(data={"import": counts, "rejected": rejected.getvalue() if counts["rejected"] else None}, message="Import finished")
+
+    except BulkImportError as be:
+        return bad_request(message="Invalid import", errors=str(be))
+
+    except Exception as e:
+        db.session.rollback()
+        return server_error(message="Error importing rows, the chunks before the failing one were imported", errors=str(e))
+
+
+@import_bp.cli.command('load')
+@click.argument('entity', type=click.Choice(list(IMPORTS)))
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--user', 'email', required=True, help="email of the user recorded as creator of the rows")
+@click.option('--rejected', 'rejected_path', type=click.Path(dir_okay=False, writable=True), help="file for the rejected rows, <path>.rejected.csv by default")
+@click.option('--chunk-size', default=IMPORT_CHUNK_SIZE, show_default=True, help="rows checked and committed at a time")
+def Load_rows(entity, path, email, rejected_path, chunk_size):
+    '''
+    Bulk import clients, products or tiers from a CSV file with a header line, rejected rows go to a CSV file with their errors
+    '''
+    user = db.session.query(User).filter(User.email == email).one_or_none()
+    if user is None:
+        raise click.ClickException(f"No user with email {email}")
+    spec = import_spec(entity)
+    rejected_path = rejected_path or f"{path}.rejected.csv"
+    with open(path, "rb") as file, open(rejected_path, "w", encoding="utf-8", newline="") as rejected:
+        try:
+            counts = import_rows(spec, read_rows(spec, file), user.id, rejected, chunk_size)
+        except BulkImportError as be:
+            raise click.ClickException(str(be))
+        finally:
+            # running workers drop their tier indexes through the invalidation broadcast
+            if entity == "tiers":
+                invalidate_tier_indexes()
+    click.echo(f"{counts['imported']} of {counts['rows']} rows imported, {counts['rejected']} rejected (see {rejected_path})")
@@ -0,0 +1,141 @@
+import click
+from flask import Blueprint, request, current_app
+from app import db
+from models import InvoiceRun, Invoice
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from schemas.invoice_schema import invoice_run_read_schema, invoice_run_write_schema, invoices_read_schema
+from marshmallow import ValidationError
+from uuid import UUID
+from sqlalchemy.orm import selectinload
+from utils.response import ok, created, bad_request, not_found, server_error
+from utils.pagination import paginate, PaginationError
+from utils.invoicing import start_run, run_invoices, run_in_background, run_progress, DEFAULT_CHUNK_SIZE
+
+# Initialize invoice Blueprint, its commands run as `flask --app run invoices <command>`
+invoice_bp = Blueprint('invoice', __name__, cli_group='invoices')
+
+
+def run_data(run):
+    return {"invoice_run": {**invoice_run_read_schema.dump(run), **run_progress(run)}}
+
+
+def bill(run):
+    '''
+    Bill the pending chunks of a run: on a background thread with a pool of INVOICE_WORKERS processes,
+    or before responding when INVOICE_WORKERS is 0
+    '''
+    workers = current_app.config['INVOICE_WORKERS']
+    if workers == 0:
+        run_invoices(run.id, 0)
+    else:
+        run_in_background(current_app._get_current_object(), run.id, workers)
+
+
+@invoice_bp.route('/invoice-runs', methods=['POST'])
+@jwt_required()
+def Invoice_runs():
+    '''
+    Post: Start generating the invoices of every live contract for a billing period [period_start, period_end)
+    '''
+    current_user_id = get_jwt_identity()
+
+    try:
+        validated = invoice_run_write_schema.load(request.get_json())
+        run = start_run(validated["period_start"], validated["period_end"], current_user_id, validated["chunk_size"])
+        db.session.commit()
+        bill(run)
+
+        return created(data=run_data(run), message="Invoice run started successfully")
+
+    except ValidationError as ve:
+        db.session.rollback()
+        return bad_request(message="Validation Error", errors=ve.messages)
+
+    except Exception as e:
+        db.session.rollback()
+        return server_error(message="Error starting invoice run", errors=str(e))
+
+
+@invoice_bp.route('/invoice-runs/<id>', methods=['GET'])
+@jwt_required()
+def Invoice_run_id(id):
+    '''
+    Get: An invoice run with its progress: chunks in total and billed, invoices written
+    '''
+    try:
+        id_obj = UUID(id) if isinstance(id, str) else id
+        run = db.session.get(InvoiceRun, id_obj)
+        if not run:
+            return not_found(message="Invoice run not found")
+
+        return ok(data=run_data(run), message="Invoice run retrieved successfully")
+
+    except Exception as e:
+        return server_error(message="Error retrieving invoice run", errors=str(e))
+
+
+@invoice_bp.route('/invoice-runs/<id>:resume', methods=['POST'])
+@jwt_required()
+def Invoice_run_resume(id):
+    '''
+    Post: Bill the chunks of an interrupted invoice run that were not billed yet
+    '''
+    try:
+        id_obj = UUID(id) if isinstance(id, str) else id
+        run = db.session.get(InvoiceRun, id_obj)
+        if not run:
+            return not_found(message="Invoice run not found")
+        bill(run)
+
+        return ok(data=run_data(run), message="Invoice run resumed successfully")
+
+    except Exception as e:
+        db.session.rollback()
+        return server_error(message="Error resuming invoice run", errors=str(e))
+
+
+@invoice_bp.route('/invoice-runs/<id>/invoices', methods=['GET'])
+@jwt_required()
+def Invoice_run_invoices(id):
+    '''
+    Get: The invoices of a run with their lines, paginated
+    '''
+    try:
+        id_obj = UUID(id) if isinstance(id, str) else id
+        query = db.session.query(Invoice).filter(Invoice.run_id == id_obj).options(selectinload(Invoice.lines))
+        invoices, meta = paginate(query, Invoice)
+
+        return ok(data={"invoices": invoices_read_schema.dump(invoices)}, message="Invoices fetched successfully", meta=meta)
+
+    except PaginationError as pe:
+        return bad_request(message="Invalid pagination parameters", errors=str(pe))
+
+    except Exception as e:
+        return server_error(message="Error fetching invoices", errors=str(e))
+
+
+@invoice_bp.cli.command('generate')
+@click.option('--start', required=True, type=click.DateTime(formats=["%Y-%m-%d"]), help="first day of the billing period")
+@click.option('--end', required=True, type=click.DateTime(formats=["%Y-%m-%d"]), help="day after the billing period")
+@click.option('--chunk-size', default=DEFAULT_CHUNK_SIZE, show_default=True, help="contracts per chunk")
+@click.option('--workers', type=int, default=None, help="worker processes, one per core by default; 0 bills in this process")
+def Generate_invoices(start, end, chunk_size, workers):
+    '''
+    Generate the invoices of every live contract for the billing period [start, end)
+    '''
+    run = start_run(start.date(), end.date(), chunk_size=chunk_size)
+    db.session.commit()
+    click.echo(f"invoice run {run.id}")
+    written = run_invoices(run.id, workers)
+    click.echo(f"{written} invoices written")
+
+
+@invoice_bp.cli.command('resume')
+@click.argument('run_id', type=click.UUID)
+@click.option('--workers', type=int, default=None, help="worker processes, one per core by default; 0 bills in this process")
+def Resume_invoices(run_id, workers):
+    '''
+    Bill the chunks of an invoice run that were not billed yet
+    '''
+    written = run_invoices(run_id, workers)
+    click.echo(f"{written} invoices written")
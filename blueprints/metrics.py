@@ -0,0 +1,15 @@
+from flask import Blueprint
+from app import cache
+from flask_jwt_extended import jwt_required
+from utils.response import ok
+
+# Initialize metrics Blueprint
+metrics_bp = Blueprint('metrics', __name__)
+
+@metrics_bp.route('/metrics/cache', methods=['GET'])
+@jwt_required()
+def Cache_metrics():
+    '''
+    Get: Size and hit/miss/eviction counters of the product/client read-through cache
+    '''
+    return ok(data={"cache": cache.stats()}, message="Cache metrics retrieved successfully")
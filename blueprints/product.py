@@ -1,16 +1,29 @@
 from flask import Blueprint, request, jsonify
 from app import db
-from models import Product, Contract
+from models import Product, Contract, Subscription
 from flask_jwt_extended import jwt_required, get_jwt_identity   
+from sqlalchemy import exists
 from schemas.product_schema import product_read_schema, products_read_schema, product_write_schema
 from schemas.contract_schema import contracts_read_schema
 from marshmallow import ValidationError
 from uuid import UUID
-from utils.response import ok, created, bad_request, not_found, server_error
+from utils.response import ok, created, bad_request, not_found, server_error, wants_stream, stream, not_modified
+from utils.conditional import collection_validators, resource_validators
+from utils.pagination import paginate, PaginationError
+from utils.fields import parse_fields, sparse_schema, load_only_options, FieldsError
+from schemas.compiled import compiled_serializer
+from utils.bulk import batch_payload, bulk_insert, dump_created, BatchError
+from sqlalchemy.exc import IntegrityError
+from utils.filters import apply_filters, parse_sort, FilterError
+from schemas.cache import cached_dump, invalidate
 
 # Initialize product Blueprint
 product_bp = Blueprint('product', __name__)
 
+# Filters and sort columns accepted by GET /products
+PRODUCT_FILTERS = ("is_archived",)
+PRODUCT_SORTS = ("created_at", "updated_at", "api_name")
+
 # Product Endpoints
 @product_bp.route('/products', methods=['POST', 'GET'])
 @jwt_required()
@@ -45,14 +58,69 @@ def Products():
 
     elif request.method == 'GET':
         try:
-            products = db.session.query(Product).all()
+            fields = parse_fields(products_read_schema)
+            sort = parse_sort(PRODUCT_SORTS)
+            base = apply_filters(db.session.query(Product), Product, PRODUCT_FILTERS)
+            validators = collection_validators(base, Product)
+            if validators.not_modified():
+                return not_modified(validators)
+
+            serializer = compiled_serializer(products_read_schema, fields)
+            query = serializer.select(base, sort)
+            if wants_stream():
+                return validators.apply(stream(query, Product, serializer, sort))
+
+            products, meta = paginate(query, Product, sort)
         
-            return ok(data={"products": products_read_schema.dump(products)}, message="Products retrieved successfully")
+            return validators.apply(ok(data={"products": serializer.dump(products)}, message="Products retrieved successfully", meta=meta))
+
+        except PaginationError as pe:
+            return bad_request(message="Invalid pagination parameters", errors=str(pe))
+
+        except FieldsError as fe:
+            return bad_request(message="Invalid fields parameter", errors=str(fe))
+
+        except FilterError as fle:
+            return bad_request(message="Invalid filter parameters", errors=str(fle))
 
         except Exception as e:
             return server_error(message="Error fetching products", errors=str(e))
 
 
+@product_bp.route('/products:batch', methods=['POST'])
+@jwt_required()
+def Products_batch():
+    '''
+    Post: Create an array of products in one transaction. Errors are reported by array index and nothing is created.
+    '''
+    current_user_id = get_jwt_identity()
+
+    try:
+        data = batch_payload()
+        validated = product_write_schema.load(data, many=True)
+
+        ids = bulk_insert(Product, validated, current_user_id)
+        db.session.commit()
+
+        serializer = compiled_serializer(products_read_schema)
+        return created(data={"products": dump_created(serializer, Product, ids)}, message="Products created successfully")
+
+    except BatchError as be:
+        return bad_request(message="Invalid batch", errors=str(be))
+
+    except ValidationError as ve:
+        db.session.rollback()
+        return bad_request(message="Validation Error", errors=ve.messages)
+
+    except IntegrityError as ie:
+        db.session.rollback()
+        return bad_request(message="Batch conflicts with existing data", errors=str(ie.orig))
+
+    except Exception as e:
+        db.session.rollback()
+        return server_error(message="Error creating products", errors=str(e))
+
+
 @product_bp.route('/products/<id>', methods=['GET','PUT', 'PATCH','DELETE'])
 @jwt_required()
 def Product_id(id):
@@ -64,14 +132,25 @@ def Product_id(id):
 
     if request.method == 'GET':
         try:
+            fields = parse_fields(product_read_schema)
             id_obj = UUID(id) if isinstance(id, str) else id
-            product = db.session.get(Product, id_obj)
-            
-            if not product:
+            validators = resource_validators(Product, id_obj)
+            if not validators:
                 return not_found(message="Product not found")
+            if validators.not_modified():
+                return not_modified(validators)
+
+            if fields is None:
+                data = cached_dump(Product, id_obj, validators.last_modified)
+            else:
+                product = db.session.get(Product, id_obj, options=load_only_options(Product, fields))
+                data = sparse_schema(product_read_schema, fields).dump(product)
 
-            return ok(data={"product": product_read_schema.dump(product)}, message="Product retrieved successfully")
+            return validators.apply(ok(data={"product": data}, message="Product retrieved successfully"))
         
+        except FieldsError as fe:
+            return bad_request(message="Invalid fields parameter", errors=str(fe))
+
         except Exception as e:
             return server_error(message="Error getting product", errors=str(e))
 
@@ -95,6 +174,7 @@ def Product_id(id):
                 setattr(product, key, value)
             product.updated_by = current_user_id
             db.session.commit()
+            invalidate(Product, product.id)
 
             return ok(data={"product": product_read_schema.dump(product)}, message="Product updated successfully")
 
@@ -120,6 +200,7 @@ def Product_id(id):
             product.updated_by = current_user_id
 
             db.session.commit()
+            invalidate(Product, product.id)
             return ok(data={"product": product_read_schema.dump(product)}, message="Product has been archived successfully")
 
         except Exception as e:
@@ -142,14 +223,16 @@ def Product_Contracts_id(id):
             if not product:
                 return not_found(message="Product not found")
            
-            contracts_map = {}
-            for subscription in product.subscriptions:
-                cont = subscription.contract
-                if cont and cont.id not in contracts_map:
-                    contracts_map[cont.id] = cont
-
-            contracts = list(contracts_map.values())
-            return ok(data={"contracts": contracts_read_schema.dump(contracts)}, message="Contracts retrieved successfully")
+            # live contracts with at least one live subscription to this product
+            linked = exists().where(Subscription.contract_id == Contract.id, Subscription.product_id == id_obj, Subscription.is_archived == False)
+            serializer = compiled_serializer(contracts_read_schema)
+            query = serializer.select(db.session.query(Contract).filter(Contract.is_archived == False, linked))
+            contracts, meta = paginate(query, Contract)
+
+            return ok(data={"contracts": serializer.dump(contracts)}, message="Contracts retrieved successfully", meta=meta)
+
+        except PaginationError as pe:
+            return bad_request(message="Invalid pagination parameters", errors=str(pe))
 
         except Exception as e:
             return server_error(message="Error getting contracts", errors=str(e))
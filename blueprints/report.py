@@ -0,0 +1,27 @@
+from flask import Blueprint
+from flask_jwt_extended import jwt_required
+from utils.response import ok, bad_request, server_error
+from utils.reports import report_params, revenue_report, ReportError
+
+# Initialize report Blueprint
+report_bp = Blueprint('report', __name__)
+
+
+@report_bp.route('/reports/revenue', methods=['GET'])
+@jwt_required()
+def Revenue_report():
+    '''
+    Get: Contract value per ?group_by=client|product|pricing_type of the tiers in effect in [?start=, ?end=),
+         live rows only unless ?include_archived=true. Computed in SQL and cached until the data changes.
+    '''
+    try:
+        group_by, start, end, include_archived = report_params()
+        rows = revenue_report(group_by, start, end, include_archived)
+
+        return ok(data={"revenue": rows}, message="Revenue report generated successfully")
+
+    except ReportError as re:
+        return bad_request(message="Invalid report parameters", errors=str(re))
+
+    except Exception as e:
+        return server_error(message="Error generating revenue report", errors=str(e))
@@ -0,0 +1,115 @@
+import click
+from datetime import date
+from flask import Blueprint, request
+from app import db
+from models import UsageBatch, UsageDaily, UsageMonthly
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from schemas.usage_schema import usage_batch_read_schema
+from marshmallow import ValidationError
+from uuid import UUID
+from sqlalchemy.exc import IntegrityError
+from utils.response import ok, created, bad_request, not_found, server_error
+from utils.usage import ingest, read_records, rebuild_rollups, UsageError
+
+# Initialize usage Blueprint, its commands run as `flask --app run usage <command>`
+usage_bp = Blueprint('usage', __name__)
+
+# Rollup tables and period columns behind ?granularity= of GET /subscriptions/<id>/usage
+USAGE_GRANULARITIES = {"day": (UsageDaily, UsageDaily.day), "month": (UsageMonthly, UsageMonthly.month)}
+
+
+@usage_bp.route('/usage-batches/<id>', methods=['PUT', 'GET'])
+@jwt_required()
+def Usage_batch(id):
+    '''
+    Put: Ingest a batch of usage events sent as NDJSON (application/x-ndjson) or CSV (text/csv) with
+         subscription_id, timestamp and calls per event. The batch id makes it idempotent: replaying
+         an ingested batch returns its acknowledgement without storing the events again.
+    Get: Acknowledgement of an ingested batch
+    '''
+    current_user_id = get_jwt_identity()
+
+    try:
+        id_obj = UUID(id) if isinstance(id, str) else id
+    except ValueError:
+        return bad_request(message="Invalid batch id", errors="Batch id must be a UUID")
+
+    if request.method == 'GET':
+        batch = db.session.get(UsageBatch, id_obj)
+        if not batch:
+            return not_found(message="Usage batch not found")
+        return ok(data={"usage_batch": usage_batch_read_schema.dump(batch)}, message="Usage batch retrieved successfully")
+
+    try:
+        batch = db.session.get(UsageBatch, id_obj)
+        if batch:
+            return ok(data={"usage_batch": usage_batch_read_schema.dump(batch)}, message="Usage batch already ingested")
+
+        records = read_records(request.mimetype, request.stream)
+        batch = ingest(id_obj, current_user_id, records)
+        db.session.commit()
+
+        return created(data={"usage_batch": usage_batch_read_schema.dump(batch)}, message="Usage batch ingested successfully")
+
+    except UsageError as ue:
+        db.session.rollback()
+        return bad_request(message="Invalid usage batch", errors=str(ue))
+
+    except ValidationError as ve:
+        db.session.rollback()
+        return bad_request(message="Validation Error", errors=ve.messages)
+
+    except IntegrityError as ie:
+        # the same batch id ingested concurrently: acknowledge the one that was stored
+        db.session.rollback()
+        batch = db.session.get(UsageBatch, id_obj)
+        if batch:
+            return ok(data={"usage_batch": usage_batch_read_schema.dump(batch)}, message="Usage batch already ingested")
+        return server_error(message="Error ingesting usage batch", errors=str(ie.orig))
+
+    except Exception as e:
+        db.session.rollback()
+        return server_error(message="Error ingesting usage batch", errors=str(e))
+
+
+@usage_bp.route('/subscriptions/<id>/usage', methods=['GET'])
+@jwt_required()
+def Subscription_usage(id):
+    '''
+    Get: Usage of a subscription per ?granularity=day (default) or month for the periods starting in [?start=, ?end=), read from the rollups
+    '''
+    try:
+        id_obj = UUID(id) if isinstance(id, str) else id
+        granularity = request.args.get("granularity", "day")
+        if granularity not in USAGE_GRANULARITIES:
+            raise ValueError(f"granularity must be one of {', '.join(USAGE_GRANULARITIES)}")
+        if "start" not in request.args or "end" not in request.args:
+            raise ValueError("start and end are required")
+        start, end = date.fromisoformat(request.args["start"]), date.fromisoformat(request.args["end"])
+
+        model, period = USAGE_GRANULARITIES[granularity]
+        rows = db.session.query(period, model.events, model.calls).filter(
+            model.subscription_id == id_obj, period >= start, period < end
+        ).order_by(period).all()
+        usage = [{"period": row[0].isoformat(), "events": row.events, "calls": row.calls} for row in rows]
+
+        return ok(data={"usage": usage, "calls": sum(row.calls for row in rows)}, message="Subscription usage retrieved successfully")
+
+    except ValueError as ve:
+        return bad_request(message="Invalid usage parameters", errors=str(ve))
+
+    except Exception as e:
+        return server_error(message="Error retrieving subscription usage", errors=str(e))
+
+
+@usage_bp.cli.command('rebuild-rollups')
+@click.option('--start', required=True, type=click.DateTime(formats=["%Y-%m-%d"]), help="first day to recompute")
+@click.option('--end', required=True, type=click.DateTime(formats=["%Y-%m-%d"]), help="day after the last one to recompute")
+@click.option('--subscription', 'subscription_ids', multiple=True, type=click.UUID, help="only these subscriptions (repeatable)")
+def Rebuild_rollups(start, end, subscription_ids):
+    '''
+    Recompute the daily and monthly usage rollups of the days in [start, end) from the stored usage events
+    '''
+    counts = rebuild_rollups(start.date(), end.date(), subscription_ids or None)
+    db.session.commit()
+    click.echo(", ".join(f"{table}: {rows} rows" for table, rows in counts.items()))
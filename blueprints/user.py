@@ -1,17 +1,25 @@
 from flask import Blueprint, request
 from app import db
 from models import User, Contract
-import validators
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from schemas.user_schema import user_read_schema, users_read_schema, user_write_schema
 from schemas.contract_schema import contracts_read_schema
 from marshmallow import ValidationError
 from uuid import UUID
-from utils.response import ok, created, bad_request, not_found, server_error
+from utils.response import ok, created, bad_request, not_found, server_error, wants_stream, stream, not_modified
+from utils.conditional import collection_validators, resource_validators
+from utils.pagination import paginate, PaginationError
+from utils.fields import parse_fields, FieldsError
+from schemas.compiled import compiled_serializer
+from utils.filters import apply_filters, parse_sort, FilterError
 
 # Initialize user Blueprint
 user_bp = Blueprint('user', __name__)
 
+# Filters and sort columns accepted by GET /users
+USER_FILTERS = ("is_archived",)
+USER_SORTS = ("created_at", "updated_at", "email")
+
 # User Endpoints
 
 @user_bp.route('/users-first', methods=['POST'])
@@ -85,9 +93,30 @@ def Users():
     
     elif request.method == 'GET':
         try:
-            users = User.query.all()
-            return ok(data={"users": users_read_schema.dump(users)}, message="Users retrieved successfully")
+            fields = parse_fields(users_read_schema)
+            sort = parse_sort(USER_SORTS)
+            base = apply_filters(User.query, User, USER_FILTERS)
+            validators = collection_validators(base, User)
+            if validators.not_modified():
+                return not_modified(validators)
+
+            serializer = compiled_serializer(users_read_schema, fields)
+            query = serializer.select(base, sort)
+            if wants_stream():
+                return validators.apply(stream(query, User, serializer, sort))
+
+            users, meta = paginate(query, User, sort)
+            return validators.apply(ok(data={"users": serializer.dump(users)}, message="Users retrieved successfully", meta=meta))
         
+        except PaginationError as pe:
+            return bad_request(message="Invalid pagination parameters", errors=str(pe))
+
+        except FieldsError as fe:
+            return bad_request(message="Invalid fields parameter", errors=str(fe))
+
+        except FilterError as fle:
+            return bad_request(message="Invalid filter parameters", errors=str(fle))
+
         except Exception as e:
             return bad_request(message="Error retrieving users", errors=str(e))
 
@@ -105,12 +134,15 @@ def User_id(id):
     if request.method == 'GET':
         try:
             id_obj = UUID(id) if isinstance(id, str) else id
-            user = db.session.get(User, id_obj)
-            
-            if not user:
+            validators = resource_validators(User, id_obj)
+            if not validators:
                 return not_found(message="User not found")
+            if validators.not_modified():
+                return not_modified(validators)
 
-            return ok(data={"user": user_read_schema.dump(user)}, message="User retrieved successfully")
+            user = db.session.get(User, id_obj)
+
+            return validators.apply(ok(data={"user": user_read_schema.dump(user)}, message="User retrieved successfully"))
 
         except Exception as e:
             db.session.rollback()
@@ -186,12 +218,16 @@ def User_Contracts_id(id):
             if not user:
                 return not_found(message="User not found")
 
-            contracts_objs = db.session.query(Contract).filter(Contract.created_by==id_obj).all()
+            serializer = compiled_serializer(contracts_read_schema)
+            contracts_objs, meta = paginate(serializer.select(db.session.query(Contract).filter(Contract.created_by==id_obj)), Contract)
            
-            contracts = contracts_read_schema.dump(contracts_objs)
+            contracts = serializer.dump(contracts_objs)
 
-            return ok(data={"contracts": contracts}, message="Contracts retrieved successfully")
+            return ok(data={"contracts": contracts}, message="Contracts retrieved successfully", meta=meta)
         
+        except PaginationError as pe:
+            return bad_request(message="Invalid pagination parameters", errors=str(pe))
+
         except Exception as e:
             return server_error(message="Error getting contracts", errors=str(e))
 
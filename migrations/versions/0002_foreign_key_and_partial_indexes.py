@@ -0,0 +1,96 @@
+"""foreign key and partial indexes
+
+Indexes every foreign key column (including created_by / updated_by), adds the
+(created_at, id) keyset pagination indexes and updated_at indexes, and partial
+indexes over non-archived rows for the hot parent -> child lookups.
+
+Databases created before migrations were introduced (with db.create_all())
+already match revision 0001; stamp them and upgrade:
+
+    flask --app run db stamp 0001
+    flask --app run db upgrade
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 10:33:16.721296
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_client_created_at_id', 'client', ['created_at', 'id'], unique=False)
+    op.create_index(op.f('ix_client_created_by'), 'client', ['created_by'], unique=False)
+    op.create_index(op.f('ix_client_updated_at'), 'client', ['updated_at'], unique=False)
+    op.create_index(op.f('ix_client_updated_by'), 'client', ['updated_by'], unique=False)
+    op.create_index(op.f('ix_contract_client_id'), 'contract', ['client_id'], unique=False)
+    op.create_index('ix_contract_client_id_live', 'contract', ['client_id'], unique=False, postgresql_where=sa.text('is_archived = false'), sqlite_where=sa.text('is_archived = 0'))
+    op.create_index('ix_contract_created_at_id', 'contract', ['created_at', 'id'], unique=False)
+    op.create_index(op.f('ix_contract_created_by'), 'contract', ['created_by'], unique=False)
+    op.create_index(op.f('ix_contract_updated_at'), 'contract', ['updated_at'], unique=False)
+    op.create_index(op.f('ix_contract_updated_by'), 'contract', ['updated_by'], unique=False)
+    op.create_index('ix_product_created_at_id', 'product', ['created_at', 'id'], unique=False)
+    op.create_index(op.f('ix_product_created_by'), 'product', ['created_by'], unique=False)
+    op.create_index(op.f('ix_product_updated_at'), 'product', ['updated_at'], unique=False)
+    op.create_index(op.f('ix_product_updated_by'), 'product', ['updated_by'], unique=False)
+    op.create_index(op.f('ix_subscription_contract_id'), 'subscription', ['contract_id'], unique=False)
+    op.create_index('ix_subscription_contract_id_live', 'subscription', ['contract_id'], unique=False, postgresql_where=sa.text('is_archived = false'), sqlite_where=sa.text('is_archived = 0'))
+    op.create_index('ix_subscription_created_at_id', 'subscription', ['created_at', 'id'], unique=False)
+    op.create_index(op.f('ix_subscription_created_by'), 'subscription', ['created_by'], unique=False)
+    op.create_index(op.f('ix_subscription_product_id'), 'subscription', ['product_id'], unique=False)
+    op.create_index('ix_subscription_product_id_live', 'subscription', ['product_id'], unique=False, postgresql_where=sa.text('is_archived = false'), sqlite_where=sa.text('is_archived = 0'))
+    op.create_index(op.f('ix_subscription_updated_at'), 'subscription', ['updated_at'], unique=False)
+    op.create_index(op.f('ix_subscription_updated_by'), 'subscription', ['updated_by'], unique=False)
+    op.create_index('ix_subscription_tier_created_at_id', 'subscription_tier', ['created_at', 'id'], unique=False)
+    op.create_index(op.f('ix_subscription_tier_created_by'), 'subscription_tier', ['created_by'], unique=False)
+    op.create_index(op.f('ix_subscription_tier_subscription_id'), 'subscription_tier', ['subscription_id'], unique=False)
+    op.create_index('ix_subscription_tier_subscription_id_live', 'subscription_tier', ['subscription_id'], unique=False, postgresql_where=sa.text('is_archived = false'), sqlite_where=sa.text('is_archived = 0'))
+    op.create_index(op.f('ix_subscription_tier_updated_at'), 'subscription_tier', ['updated_at'], unique=False)
+    op.create_index(op.f('ix_subscription_tier_updated_by'), 'subscription_tier', ['updated_by'], unique=False)
+    op.create_index('ix_user_created_at_id', 'user', ['created_at', 'id'], unique=False)
+    op.create_index(op.f('ix_user_created_by'), 'user', ['created_by'], unique=False)
+    op.create_index(op.f('ix_user_updated_at'), 'user', ['updated_at'], unique=False)
+    op.create_index(op.f('ix_user_updated_by'), 'user', ['updated_by'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_user_updated_by'), table_name='user')
+    op.drop_index(op.f('ix_user_updated_at'), table_name='user')
+    op.drop_index(op.f('ix_user_created_by'), table_name='user')
+    op.drop_index('ix_user_created_at_id', table_name='user')
+    op.drop_index(op.f('ix_subscription_tier_updated_by'), table_name='subscription_tier')
+    op.drop_index(op.f('ix_subscription_tier_updated_at'), table_name='subscription_tier')
+    op.drop_index('ix_subscription_tier_subscription_id_live', table_name='subscription_tier')
+    op.drop_index(op.f('ix_subscription_tier_subscription_id'), table_name='subscription_tier')
+    op.drop_index(op.f('ix_subscription_tier_created_by'), table_name='subscription_tier')
+    op.drop_index('ix_subscription_tier_created_at_id', table_name='subscription_tier')
+    op.drop_index(op.f('ix_subscription_updated_by'), table_name='subscription')
+    op.drop_index(op.f('ix_subscription_updated_at'), table_name='subscription')
+    op.drop_index('ix_subscription_product_id_live', table_name='subscription')
+    op.drop_index(op.f('ix_subscription_product_id'), table_name='subscription')
+    op.drop_index(op.f('ix_subscription_created_by'), table_name='subscription')
+    op.drop_index('ix_subscription_created_at_id', table_name='subscription')
+    op.drop_index('ix_subscription_contract_id_live', table_name='subscription')
+    op.drop_index(op.f('ix_subscription_contract_id'), table_name='subscription')
+    op.drop_index(op.f('ix_product_updated_by'), table_name='product')
+    op.drop_index(op.f('ix_product_updated_at'), table_name='product')
+    op.drop_index(op.f('ix_product_created_by'), table_name='product')
+    op.drop_index('ix_product_created_at_id', table_name='product')
+    op.drop_index(op.f('ix_contract_updated_by'), table_name='contract')
+    op.drop_index(op.f('ix_contract_updated_at'), table_name='contract')
+    op.drop_index(op.f('ix_contract_created_by'), table_name='contract')
+    op.drop_index('ix_contract_created_at_id', table_name='contract')
+    op.drop_index('ix_contract_client_id_live', table_name='contract')
+    op.drop_index(op.f('ix_contract_client_id'), table_name='contract')
+    op.drop_index(op.f('ix_client_updated_by'), table_name='client')
+    op.drop_index(op.f('ix_client_updated_at'), table_name='client')
+    op.drop_index(op.f('ix_client_created_by'), table_name='client')
+    op.drop_index('ix_client_created_at_id', table_name='client')
@@ -0,0 +1,27 @@
+"""subscription tier lookup index
+
+Adds a partial index over the live tiers of a subscription by call range and
+effective dates, backing tier lookups by (subscription, calls, timestamp).
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 12:40:05.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_subscription_tier_lookup', 'subscription_tier', ['subscription_id', 'min_calls', 'max_calls', 'start_date', 'end_date'], unique=False, postgresql_where=sa.text('is_archived = false'), sqlite_where=sa.text('is_archived = 0'))
+
+
+def downgrade():
+    op.drop_index('ix_subscription_tier_lookup', table_name='subscription_tier')
@@ -0,0 +1,69 @@
+"""subscription tier no overlap
+
+Keeps the live tiers of a subscription from overlapping in both call range and
+effective dates. Ranges are half open: [min_calls, max_calls) and
+[start_date, end_date).
+
+Postgres gets an exclusion constraint over int4range/tsrange, which needs the
+btree_gist extension for the subscription_id equality. SQLite gets insert and
+update triggers with the same check, answered through ix_subscription_tier_lookup.
+
+Existing overlapping live tiers must be archived or fixed before upgrading.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 13:22:47.506113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+SQLITE_OVERLAP_CHECK = """
+WHEN NEW.is_archived = 0 AND NEW.min_calls < NEW.max_calls
+BEGIN
+    SELECT RAISE(ABORT, 'ex_subscription_tier_no_overlap')
+    WHERE EXISTS (
+        SELECT 1 FROM subscription_tier AS sibling
+        WHERE sibling.subscription_id = NEW.subscription_id AND sibling.is_archived = 0 AND sibling.id != NEW.id
+          AND sibling.min_calls < NEW.max_calls AND NEW.min_calls < sibling.max_calls
+          AND sibling.start_date < NEW.end_date AND NEW.start_date < sibling.end_date
+    );
+END
+"""
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+        op.create_exclude_constraint(
+            'ex_subscription_tier_no_overlap',
+            'subscription_tier',
+            ('subscription_id', '='),
+            (sa.text('int4range(min_calls, max_calls)'), '&&'),
+            (sa.text('tsrange(start_date, end_date)'), '&&'),
+            using='gist',
+            where=sa.text('NOT is_archived'),
+        )
+    elif op.get_bind().dialect.name == 'sqlite':
+        op.execute('CREATE TRIGGER subscription_tier_no_overlap_insert BEFORE INSERT ON subscription_tier' + SQLITE_OVERLAP_CHECK)
+        op.execute(
+            'CREATE TRIGGER subscription_tier_no_overlap_update'
+            ' BEFORE UPDATE OF subscription_id, min_calls, max_calls, start_date, end_date, is_archived ON subscription_tier'
+            + SQLITE_OVERLAP_CHECK
+        )
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_constraint('ex_subscription_tier_no_overlap', 'subscription_tier', type_='exclude')
+    elif op.get_bind().dialect.name == 'sqlite':
+        op.execute('DROP TRIGGER subscription_tier_no_overlap_update')
+        op.execute('DROP TRIGGER subscription_tier_no_overlap_insert')
@@ -0,0 +1,51 @@
+"""usage events
+
+Adds the append-only usage_event table, indexed by subscription and time, and
+usage_batch, which records every ingested batch by the id its sender chose so
+a replayed batch is acknowledged instead of stored twice.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 14:05:31.640218
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('usage_batch',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('events', sa.Integer(), nullable=False),
+    sa.Column('calls', sa.BigInteger(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('created_by', sa.UUID(), nullable=False),
+    sa.ForeignKeyConstraint(['created_by'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('usage_event',
+    sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), autoincrement=True, nullable=False),
+    sa.Column('batch_id', sa.UUID(), nullable=False),
+    sa.Column('subscription_id', sa.UUID(), nullable=False),
+    sa.Column('occurred_at', sa.DateTime(), nullable=False),
+    sa.Column('calls', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['batch_id'], ['usage_batch.id'], ),
+    sa.ForeignKeyConstraint(['subscription_id'], ['subscription.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_usage_event_batch_id'), 'usage_event', ['batch_id'], unique=False)
+    op.create_index('ix_usage_event_subscription_id_occurred_at', 'usage_event', ['subscription_id', 'occurred_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_usage_event_subscription_id_occurred_at', table_name='usage_event')
+    op.drop_index(op.f('ix_usage_event_batch_id'), table_name='usage_event')
+    op.drop_table('usage_event')
+    op.drop_table('usage_batch')
@@ -0,0 +1,45 @@
+"""usage rollups
+
+Adds usage_daily and usage_monthly, the usage of every subscription per day
+and per month. Ingestion keeps them up to date; `flask --app run usage
+rebuild-rollups` recomputes them from usage_event for a window, e.g. to fill
+them in for events stored before this revision.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 14:48:12.907341
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('usage_daily',
+    sa.Column('subscription_id', sa.UUID(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('events', sa.Integer(), nullable=False),
+    sa.Column('calls', sa.BigInteger(), nullable=False),
+    sa.ForeignKeyConstraint(['subscription_id'], ['subscription.id'], ),
+    sa.PrimaryKeyConstraint('subscription_id', 'day')
+    )
+    op.create_table('usage_monthly',
+    sa.Column('subscription_id', sa.UUID(), nullable=False),
+    sa.Column('month', sa.Date(), nullable=False),
+    sa.Column('events', sa.Integer(), nullable=False),
+    sa.Column('calls', sa.BigInteger(), nullable=False),
+    sa.ForeignKeyConstraint(['subscription_id'], ['subscription.id'], ),
+    sa.PrimaryKeyConstraint('subscription_id', 'month')
+    )
+
+
+def downgrade():
+    op.drop_table('usage_monthly')
+    op.drop_table('usage_daily')
@@ -0,0 +1,84 @@
+"""invoices
+
+Adds invoice runs, split into chunks of contracts billed one transaction at a
+time so an interrupted run can be resumed, and the invoices (one per contract
+and run) with a line per subscription.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 15:31:54.220871
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('invoice_run',
+    sa.Column('period_start', sa.Date(), nullable=False),
+    sa.Column('period_end', sa.Date(), nullable=False),
+    sa.Column('chunk_size', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('created_by', sa.UUID(), nullable=True),
+    sa.Column('completed_at', sa.DateTime(), nullable=True),
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.ForeignKeyConstraint(['created_by'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('id')
+    )
+    op.create_table('invoice_chunk',
+    sa.Column('run_id', sa.UUID(), nullable=False),
+    sa.Column('number', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('first_contract_id', sa.UUID(), nullable=False),
+    sa.Column('last_contract_id', sa.UUID(), nullable=False),
+    sa.Column('invoices', sa.Integer(), nullable=False),
+    sa.Column('completed_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['run_id'], ['invoice_run.id'], ),
+    sa.PrimaryKeyConstraint('run_id', 'number')
+    )
+    op.create_table('invoice',
+    sa.Column('run_id', sa.UUID(), nullable=False),
+    sa.Column('contract_id', sa.UUID(), nullable=False),
+    sa.Column('client_id', sa.UUID(), nullable=False),
+    sa.Column('period_start', sa.Date(), nullable=False),
+    sa.Column('period_end', sa.Date(), nullable=False),
+    sa.Column('calls', sa.BigInteger(), nullable=False),
+    sa.Column('amount', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.ForeignKeyConstraint(['client_id'], ['client.id'], ),
+    sa.ForeignKeyConstraint(['contract_id'], ['contract.id'], ),
+    sa.ForeignKeyConstraint(['run_id'], ['invoice_run.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('id'),
+    sa.UniqueConstraint('run_id', 'contract_id', name='uq_invoice_run_id_contract_id')
+    )
+    op.create_index('ix_invoice_created_at_id', 'invoice', ['created_at', 'id'], unique=False)
+    op.create_index(op.f('ix_invoice_client_id'), 'invoice', ['client_id'], unique=False)
+    op.create_index(op.f('ix_invoice_contract_id'), 'invoice', ['contract_id'], unique=False)
+    op.create_table('invoice_line',
+    sa.Column('invoice_id', sa.UUID(), nullable=False),
+    sa.Column('subscription_id', sa.UUID(), nullable=False),
+    sa.Column('calls', sa.BigInteger(), nullable=False),
+    sa.Column('amount', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.ForeignKeyConstraint(['invoice_id'], ['invoice.id'], ),
+    sa.ForeignKeyConstraint(['subscription_id'], ['subscription.id'], ),
+    sa.PrimaryKeyConstraint('invoice_id', 'subscription_id')
+    )
+
+
+def downgrade():
+    op.drop_table('invoice_line')
+    op.drop_index(op.f('ix_invoice_contract_id'), table_name='invoice')
+    op.drop_index(op.f('ix_invoice_client_id'), table_name='invoice')
+    op.drop_index('ix_invoice_created_at_id', table_name='invoice')
+    op.drop_table('invoice')
+    op.drop_table('invoice_chunk')
+    op.drop_table('invoice_run')
@@ -0,0 +1,35 @@
+"""subscription tier active range index
+
+Indexes the tiers' effective dates for the point-in-time ?as_of= filter of the
+tier, subscription and contract lists. Postgres gets a GiST index over
+tsrange(start_date, end_date), used by the `@>` containment test; SQLite gets a
+btree over (start_date, end_date) for the two comparisons it runs instead.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 16:47:12.381904
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.create_index('ix_subscription_tier_active_range', 'subscription_tier', [sa.text('tsrange(start_date, end_date)')], unique=False, postgresql_using='gist')
+    elif op.get_bind().dialect.name == 'sqlite':
+        op.create_index('ix_subscription_tier_active_dates', 'subscription_tier', ['start_date', 'end_date'], unique=False)
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_index('ix_subscription_tier_active_range', table_name='subscription_tier')
+    elif op.get_bind().dialect.name == 'sqlite':
+        op.drop_index('ix_subscription_tier_active_dates', table_name='subscription_tier')
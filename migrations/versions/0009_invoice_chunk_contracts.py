@@ -0,0 +1,44 @@
+"""invoice chunk contracts
+
+Stores the contracts of every invoice chunk when its run starts, so a resumed
+run bills the contracts it started with rather than those in the chunk's id
+range at the time it resumes. Chunks of runs started before this revision are
+filled from their id ranges.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19 09:12:40.517283
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('invoice_chunk_contract',
+    sa.Column('run_id', sa.UUID(), nullable=False),
+    sa.Column('contract_id', sa.UUID(), nullable=False),
+    sa.Column('number', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['contract_id'], ['contract.id'], ),
+    sa.ForeignKeyConstraint(['run_id', 'number'], ['invoice_chunk.run_id', 'invoice_chunk.number'], ),
+    sa.PrimaryKeyConstraint('run_id', 'contract_id')
+    )
+    op.create_index('ix_invoice_chunk_contract_run_id_number', 'invoice_chunk_contract', ['run_id', 'number'], unique=False)
+    op.execute(
+        'INSERT INTO invoice_chunk_contract (run_id, contract_id, number)'
+        ' SELECT invoice_chunk.run_id, contract.id, invoice_chunk.number FROM invoice_chunk'
+        ' JOIN contract ON contract.id BETWEEN invoice_chunk.first_contract_id AND invoice_chunk.last_contract_id'
+        ' WHERE NOT contract.is_archived'
+    )
+
+
+def downgrade():
+    op.drop_index('ix_invoice_chunk_contract_run_id_number', table_name='invoice_chunk_contract')
+    op.drop_table('invoice_chunk_contract')
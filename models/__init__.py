@@ -4,6 +4,8 @@ from .product import Product
 from .contract import Contract
 from .subscription import Subscription
 from .subscription_tier import SubscriptionTier 
+from .usage import UsageBatch, UsageEvent, UsageDaily, UsageMonthly
+from .invoice import InvoiceRun, InvoiceChunk, InvoiceChunkContract, Invoice, InvoiceLine
 
 __all__ = [
     "Client",
@@ -13,4 +15,13 @@ __all__ = [
     "Subscription",
     "SubscriptionTier",
     "Subscription_tier",
+    "UsageBatch",
+    "UsageEvent",
+    "UsageDaily",
+    "UsageMonthly",
+    "InvoiceRun",
+    "InvoiceChunk",
+    "InvoiceChunkContract",
+    "Invoice",
+    "InvoiceLine",
 ]
\ No newline at end of file
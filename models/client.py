@@ -2,6 +2,8 @@ from app import db
 from models.mixins import IdMixin, AuditMixin, OperatorMixin
 
 class Client(IdMixin, AuditMixin, OperatorMixin, db.Model):
+    __table_args__ = (db.Index('ix_client_created_at_id', 'created_at', 'id'),)
+
     company_name = db.Column(db.String(60), unique=True, nullable=False)
     email = db.Column(db.String(254), unique=True, nullable=False)
     phone_number = db.Column(db.String(20), nullable=False)
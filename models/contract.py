@@ -1,10 +1,15 @@
 from app import db
-from models.mixins import IdMixin, AuditMixin, OperatorMixin
+from models.mixins import IdMixin, AuditMixin, OperatorMixin, live_index
 from sqlalchemy.dialects.postgresql import UUID
 
 
 class Contract(IdMixin, AuditMixin, OperatorMixin, db.Model):
-    client_id = db.Column(UUID(as_uuid=True), db.ForeignKey('client.id'), nullable=False)
+    __table_args__ = (
+        db.Index('ix_contract_created_at_id', 'created_at', 'id'),
+        live_index('ix_contract_client_id_live', 'client_id'),
+    )
+
+    client_id = db.Column(UUID(as_uuid=True), db.ForeignKey('client.id'), nullable=False, index=True)
     contract_name = db.Column(db.String(100), nullable=False)
 
     subscriptions = db.relationship('Subscription', backref='contract', lazy=True)
@@ -0,0 +1,101 @@
+from datetime import datetime, timezone
+from app import db
+from models.mixins import IdMixin
+from sqlalchemy.dialects.postgresql import UUID
+
+
+class InvoiceRun(IdMixin, db.Model):
+    '''
+    One invoice generation job for a billing period, split into chunks of contracts
+    '''
+    __tablename__ = "invoice_run"
+
+    period_start = db.Column(db.Date, nullable=False)
+    period_end = db.Column(db.Date, nullable=False)
+    chunk_size = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+    # None for runs started from the command line
+    created_by = db.Column(UUID(as_uuid=True), db.ForeignKey('user.id'), nullable=True)
+    completed_at = db.Column(db.DateTime, nullable=True)
+
+    chunks = db.relationship('InvoiceChunk', backref='run', lazy=True, order_by='InvoiceChunk.number')
+
+    def __repr__(self):
+        return f'Invoice_run: {self.id}, {self.period_start} - {self.period_end}'
+
+
+class InvoiceChunk(db.Model):
+    '''
+    The contracts of a run with ids in [first_contract_id, last_contract_id], listed in invoice_chunk_contract
+    when the run starts. A chunk is billed in one transaction that also sets completed_at, so a resumed run
+    bills exactly the chunks still pending, and each of them the contracts it was given.
+    '''
+    __tablename__ = "invoice_chunk"
+
+    run_id = db.Column(UUID(as_uuid=True), db.ForeignKey('invoice_run.id'), primary_key=True)
+    number = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    first_contract_id = db.Column(UUID(as_uuid=True), nullable=False)
+    last_contract_id = db.Column(UUID(as_uuid=True), nullable=False)
+    invoices = db.Column(db.Integer, nullable=False, default=0)
+    completed_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f'Invoice_chunk: {self.run_id} #{self.number}'
+
+
+class InvoiceChunkContract(db.Model):
+    '''
+    A contract billed by a chunk, stored when the run starts so contracts created or archived later do not change it
+    '''
+    __tablename__ = "invoice_chunk_contract"
+    __table_args__ = (
+        db.ForeignKeyConstraint(['run_id', 'number'], ['invoice_chunk.run_id', 'invoice_chunk.number']),
+        db.Index('ix_invoice_chunk_contract_run_id_number', 'run_id', 'number'),
+    )
+
+    run_id = db.Column(UUID(as_uuid=True), primary_key=True)
+    contract_id = db.Column(UUID(as_uuid=True), db.ForeignKey('contract.id'), primary_key=True)
+    number = db.Column(db.Integer, nullable=False)
+
+    def __repr__(self):
+        return f'Invoice_chunk_contract: {self.run_id} #{self.number}, contract_id: {self.contract_id}'
+
+
+class Invoice(IdMixin, db.Model):
+    '''
+    What a contract owes for the usage of its subscriptions in the period of a run
+    '''
+    __tablename__ = "invoice"
+    __table_args__ = (
+        db.UniqueConstraint('run_id', 'contract_id', name='uq_invoice_run_id_contract_id'),
+        db.Index('ix_invoice_created_at_id', 'created_at', 'id'),
+    )
+
+    run_id = db.Column(UUID(as_uuid=True), db.ForeignKey('invoice_run.id'), nullable=False)
+    contract_id = db.Column(UUID(as_uuid=True), db.ForeignKey('contract.id'), nullable=False, index=True)
+    client_id = db.Column(UUID(as_uuid=True), db.ForeignKey('client.id'), nullable=False, index=True)
+    period_start = db.Column(db.Date, nullable=False)
+    period_end = db.Column(db.Date, nullable=False)
+    calls = db.Column(db.BigInteger, nullable=False)
+    amount = db.Column(db.Numeric(12, 2), nullable=False)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+
+    lines = db.relationship('InvoiceLine', backref='invoice', lazy=True)
+
+    def __repr__(self):
+        return f'Invoice: {self.id}, contract_id: {self.contract_id}, amount: {self.amount}'
+
+
+class InvoiceLine(db.Model):
+    '''
+    The charge for one subscription on an invoice
+    '''
+    __tablename__ = "invoice_line"
+
+    invoice_id = db.Column(UUID(as_uuid=True), db.ForeignKey('invoice.id'), primary_key=True)
+    subscription_id = db.Column(UUID(as_uuid=True), db.ForeignKey('subscription.id'), primary_key=True)
+    calls = db.Column(db.BigInteger, nullable=False)
+    amount = db.Column(db.Numeric(12, 2), nullable=False)
+
+    def __repr__(self):
+        return f'Invoice_line: {self.invoice_id}, sub_id: {self.subscription_id}, amount: {self.amount}'
@@ -12,15 +12,20 @@ class AuditMixin:
     """Common audit columns: timestamps and soft-delete flag"""
     is_archived = db.Column(db.Boolean, default=False, nullable=False)
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
-    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc), nullable=False)
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc), nullable=False, index=True)
 
 class OperatorMixin:
     """Columns referring to the creator/updater user id"""
-    created_by = db.Column(UUID(as_uuid=True), db.ForeignKey('user.id'), nullable=False)
-    updated_by = db.Column(UUID(as_uuid=True), db.ForeignKey('user.id'), nullable=False)
+    created_by = db.Column(UUID(as_uuid=True), db.ForeignKey('user.id'), nullable=False, index=True)
+    updated_by = db.Column(UUID(as_uuid=True), db.ForeignKey('user.id'), nullable=False, index=True)
 
 
 class DurationMixin:
     """Columns for start and end dates"""
     start_date = db.Column(db.DateTime, nullable=False)
-    end_date = db.Column(db.DateTime, nullable=False)
\ No newline at end of file
+    end_date = db.Column(db.DateTime, nullable=False)
+
+
+def live_index(name, *columns):
+    """Partial index over the rows that are not archived"""
+    return db.Index(name, *columns, postgresql_where=db.text('is_archived = false'), sqlite_where=db.text('is_archived = 0'))
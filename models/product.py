@@ -2,6 +2,8 @@ from app import db
 from models.mixins import IdMixin, AuditMixin, OperatorMixin
 
 class Product(IdMixin, AuditMixin, OperatorMixin, db.Model):
+    __table_args__ = (db.Index('ix_product_created_at_id', 'created_at', 'id'),)
+
     api_name = db.Column(db.String(50), unique=True, nullable=False)
     description = db.Column(db.String(1000), nullable=False)
 
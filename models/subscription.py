@@ -1,13 +1,19 @@
 from app import db
-from models.mixins import IdMixin, AuditMixin, OperatorMixin
+from models.mixins import IdMixin, AuditMixin, OperatorMixin, live_index
 from sqlalchemy.dialects.postgresql import UUID
 
 class Subscription(IdMixin, AuditMixin, OperatorMixin, db.Model):
     '''
     Subscription types for products
     '''
-    contract_id = db.Column(UUID(as_uuid=True), db.ForeignKey('contract.id'), nullable=False)
-    product_id = db.Column(UUID(as_uuid=True), db.ForeignKey('product.id'), nullable=False)
+    __table_args__ = (
+        db.Index('ix_subscription_created_at_id', 'created_at', 'id'),
+        live_index('ix_subscription_contract_id_live', 'contract_id'),
+        live_index('ix_subscription_product_id_live', 'product_id'),
+    )
+
+    contract_id = db.Column(UUID(as_uuid=True), db.ForeignKey('contract.id'), nullable=False, index=True)
+    product_id = db.Column(UUID(as_uuid=True), db.ForeignKey('product.id'), nullable=False, index=True)
     
     pricing_type = db.Column(db.Enum("Fixed", "Variable", name="pricing_type_enum"),nullable=False) 
     
@@ -1,13 +1,36 @@
 from app import db
-from models.mixins import IdMixin, AuditMixin, OperatorMixin, DurationMixin
-from sqlalchemy.dialects.postgresql import UUID
+from models.mixins import IdMixin, AuditMixin, OperatorMixin, DurationMixin, live_index
+from sqlalchemy import DDL, event
+from sqlalchemy.dialects.postgresql import UUID, ExcludeConstraint
+
+# Name of the database rule keeping the live tiers of a subscription from overlapping
+TIER_OVERLAP_CONSTRAINT = "ex_subscription_tier_no_overlap"
 
 class SubscriptionTier(IdMixin, AuditMixin, OperatorMixin, DurationMixin, db.Model):
     '''
     tiers for subscriptions
     '''
     __tablename__ = "subscription_tier"
-    subscription_id = db.Column(UUID(as_uuid=True), db.ForeignKey('subscription.id'), nullable=False)
+    __table_args__ = (
+        db.Index('ix_subscription_tier_created_at_id', 'created_at', 'id'),
+        live_index('ix_subscription_tier_subscription_id_live', 'subscription_id'),
+        # range lookup: the live tier of a subscription covering a call count at a date
+        live_index('ix_subscription_tier_lookup', 'subscription_id', 'min_calls', 'max_calls', 'start_date', 'end_date'),
+        # point-in-time (?as_of=) lookups: a GiST index over the tiers' date ranges on Postgres, a btree over both dates on SQLite
+        db.Index('ix_subscription_tier_active_range', db.text('tsrange(start_date, end_date)'), postgresql_using='gist').ddl_if(dialect='postgresql'),
+        db.Index('ix_subscription_tier_active_dates', 'start_date', 'end_date').ddl_if(dialect='sqlite'),
+        # live tiers of a subscription may not share a call count at the same time (needs btree_gist)
+        ExcludeConstraint(
+            ('subscription_id', '='),
+            (db.text('int4range(min_calls, max_calls)'), '&&'),
+            (db.text('tsrange(start_date, end_date)'), '&&'),
+            name=TIER_OVERLAP_CONSTRAINT,
+            using='gist',
+            where=db.text('NOT is_archived'),
+        ).ddl_if(dialect='postgresql'),
+    )
+
+    subscription_id = db.Column(UUID(as_uuid=True), db.ForeignKey('subscription.id'), nullable=False, index=True)
     min_calls = db.Column(db.Integer, nullable=False)
     max_calls = db.Column(db.Integer, nullable=False)
     base_price = db.Column(db.Numeric(10, 2), nullable=True) 
@@ -15,3 +38,27 @@ class SubscriptionTier(IdMixin, AuditMixin, OperatorMixin, DurationMixin, db.Mod
     def __repr__(self):
         return f'Tier_id: {self.id}, sub_id:{self.subscription_id}, calls:{self.min_calls}-{self.max_calls}'
 
+
+# SQLite has no exclusion constraints: the same rule as triggers, which find overlapping
+# siblings through ix_subscription_tier_lookup. Ranges are half open, like int4range/tsrange.
+_SQLITE_OVERLAP_CHECK = f"""
+WHEN NEW.is_archived = 0 AND NEW.min_calls < NEW.max_calls
+BEGIN
+    SELECT RAISE(ABORT, '{TIER_OVERLAP_CONSTRAINT}')
+    WHERE EXISTS (
+        SELECT 1 FROM subscription_tier AS sibling
+        WHERE sibling.subscription_id = NEW.subscription_id AND sibling.is_archived = 0 AND sibling.id != NEW.id
+          AND sibling.min_calls < NEW.max_calls AND NEW.min_calls < sibling.max_calls
+          AND sibling.start_date < NEW.end_date AND NEW.start_date < sibling.end_date
+    );
+END
+"""
+SQLITE_OVERLAP_TRIGGERS = (
+    "CREATE TRIGGER subscription_tier_no_overlap_insert BEFORE INSERT ON subscription_tier" + _SQLITE_OVERLAP_CHECK,
+    "CREATE TRIGGER subscription_tier_no_overlap_update"
+    " BEFORE UPDATE OF subscription_id, min_calls, max_calls, start_date, end_date, is_archived ON subscription_tier"
+    + _SQLITE_OVERLAP_CHECK,
+)
+event.listen(SubscriptionTier.__table__, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS btree_gist").execute_if(dialect="postgresql"))
+for trigger in SQLITE_OVERLAP_TRIGGERS:
+    event.listen(SubscriptionTier.__table__, "after_create", DDL(trigger).execute_if(dialect="sqlite"))
@@ -0,0 +1,70 @@
+from datetime import datetime, timezone
+from app import db
+from sqlalchemy.dialects.postgresql import UUID
+
+
+class UsageBatch(db.Model):
+    '''
+    One ingested batch of usage events, keyed by the id the sender chose for it. Replaying a
+    batch id acknowledges the stored batch instead of ingesting its events again.
+    '''
+    __tablename__ = "usage_batch"
+
+    id = db.Column(UUID(as_uuid=True), primary_key=True)
+    events = db.Column(db.Integer, nullable=False, default=0)
+    calls = db.Column(db.BigInteger, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+    created_by = db.Column(UUID(as_uuid=True), db.ForeignKey('user.id'), nullable=False)
+
+    def __repr__(self):
+        return f'Usage_batch: {self.id}, events: {self.events}'
+
+
+class UsageEvent(db.Model):
+    '''
+    Append-only record of calls made under a subscription at a point in time; rows are never updated or archived
+    '''
+    __tablename__ = "usage_event"
+    __table_args__ = (
+        db.Index('ix_usage_event_subscription_id_occurred_at', 'subscription_id', 'occurred_at'),
+    )
+
+    # sequential key, SQLite only autoincrements INTEGER primary keys
+    id = db.Column(db.BigInteger().with_variant(db.Integer, 'sqlite'), primary_key=True, autoincrement=True)
+    batch_id = db.Column(UUID(as_uuid=True), db.ForeignKey('usage_batch.id'), nullable=False, index=True)
+    subscription_id = db.Column(UUID(as_uuid=True), db.ForeignKey('subscription.id'), nullable=False)
+    occurred_at = db.Column(db.DateTime, nullable=False)
+    calls = db.Column(db.Integer, nullable=False)
+
+    def __repr__(self):
+        return f'Usage_event: {self.id}, sub_id: {self.subscription_id}, calls: {self.calls} at {self.occurred_at}'
+
+
+class UsageDaily(db.Model):
+    '''
+    Usage of a subscription per day, kept up to date as batches are ingested
+    '''
+    __tablename__ = "usage_daily"
+
+    subscription_id = db.Column(UUID(as_uuid=True), db.ForeignKey('subscription.id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    events = db.Column(db.Integer, nullable=False)
+    calls = db.Column(db.BigInteger, nullable=False)
+
+    def __repr__(self):
+        return f'Usage_daily: sub_id: {self.subscription_id}, {self.day}: {self.calls} calls'
+
+
+class UsageMonthly(db.Model):
+    '''
+    Usage of a subscription per calendar month, keyed by the first day of the month
+    '''
+    __tablename__ = "usage_monthly"
+
+    subscription_id = db.Column(UUID(as_uuid=True), db.ForeignKey('subscription.id'), primary_key=True)
+    month = db.Column(db.Date, primary_key=True)
+    events = db.Column(db.Integer, nullable=False)
+    calls = db.Column(db.BigInteger, nullable=False)
+
+    def __repr__(self):
+        return f'Usage_monthly: sub_id: {self.subscription_id}, {self.month}: {self.calls} calls'
@@ -9,12 +9,14 @@ class User(IdMixin, AuditMixin, OperatorMixin, db.Model):
     '''
     Employees of business who have access to the system, they can create contracts
     '''
+    __table_args__ = (db.Index('ix_user_created_at_id', 'created_at', 'id'),)
+
     email = db.Column(db.String(120), unique=True, nullable=False)
     password_hash = db.Column(db.String(256), nullable=False)
     full_name = db.Column(db.String(100), nullable=False)
 
-    created_by = db.Column(UUID(as_uuid=True), db.ForeignKey('user.id'), nullable=True)
-    updated_by = db.Column(UUID(as_uuid=True), db.ForeignKey('user.id'), nullable=True)
+    created_by = db.Column(UUID(as_uuid=True), db.ForeignKey('user.id'), nullable=True, index=True)
+    updated_by = db.Column(UUID(as_uuid=True), db.ForeignKey('user.id'), nullable=True, index=True)
 
     def set_password(self, password):
         self.password_hash = generate_password_hash(password)
@@ -0,0 +1,53 @@
+from datetime import datetime, timezone
+from app import db, cache
+from models import Client, Product
+from schemas.client_schema import client_read_schema
+from schemas.product_schema import product_read_schema
+
+# Rarely changing parents served from the read-through cache, with the schema their cached dump comes from
+CACHED_SCHEMAS = {
+    Client: client_read_schema,
+    Product: product_read_schema,
+}
+
+
+def cache_key(model, id):
+    return f"{model.__tablename__}:{id}"
+
+
+def _dumped_at(data):
+    value = datetime.fromisoformat(data["updated_at"])
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def cached_dump(model, id, updated_at=None):
+    '''
+    Read schema dump of a Client/Product row, loaded through the cache. None if the row does not exist.
+    updated_at is the row's current version (aware UTC) when the caller read it: a cached dump of another
+    version, left behind by a write in another process without a shared cache, is reloaded.
+    '''
+    key = cache_key(model, id)
+    data = cache.get(key)
+    if data is not None and updated_at is not None and _dumped_at(data) != updated_at:
+        data = None
+    if data is None:
+        obj = db.session.get(model, id)
+        if obj is None:
+            return None
+        data = CACHED_SCHEMAS[model].dump(obj)
+        cache.set(key, data)
+    return data
+
+
+def prime(model, ids):
+    '''
+    Load every id not already cached with one IN query
+    '''
+    missing = [id for id in set(ids) if cache.get(cache_key(model, id)) is None]
+    if missing:
+        for obj in db.session.query(model).filter(model.id.in_(missing)):
+            cache.set(cache_key(model, obj.id), CACHED_SCHEMAS[model].dump(obj))
+
+
+def invalidate(model, id):
+    cache.delete(cache_key(model, id))
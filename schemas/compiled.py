@@ -0,0 +1,168 @@
+from decimal import Decimal
+from functools import lru_cache
+from marshmallow import fields as ma_fields
+from marshmallow.decorators import PRE_DUMP
+from sqlalchemy import inspect
+from app import db
+from utils.fields import REQUIRED_COLUMNS
+
+
+def _converter(field):
+    '''
+    Fast equivalent of field._serialize for the column types used by the Read schemas,
+    falling back to the field itself for anything else so the output stays identical.
+    None means the value is dumped as is.
+    '''
+    kind = type(field)
+    if kind in (ma_fields.Raw, ma_fields.Boolean):
+        return None
+    if kind in (ma_fields.UUID, ma_fields.String):
+        return str
+    if kind is ma_fields.Integer and not field.as_string:
+        return int
+    if kind is ma_fields.DateTime:
+        format_func = field.SERIALIZATION_FUNCS.get(field.format or field.DEFAULT_FORMAT)
+        if format_func:
+            return format_func
+    if kind is ma_fields.Decimal and not field.as_string and not field.allow_nan:
+        places, rounding = field.places, field.rounding
+        serialize = field._serialize
+        def convert(value):
+            if type(value) is not Decimal or not value.is_finite():
+                return serialize(value, None, None)
+            return value if places is None else value.quantize(places, rounding=rounding)
+        return convert
+    return lambda value: field._serialize(value, None, None)
+
+
+class CompiledSerializer:
+    '''
+    Dumps Core result rows (not ORM instances) to the same dicts a Read schema produces.
+    The field list, converters and nested relationships are derived once from the schema
+    and turned into one generated function per schema mapping a row tuple to a dict;
+    nested collections are loaded with one IN query per relationship and batch of rows.
+    '''
+    def __init__(self, schema):
+        self.schema = schema
+        self.model = schema.opts.model
+        mapper = inspect(self.model)
+        columns = {attr.key for attr in mapper.column_attrs}
+
+        needed = set(REQUIRED_COLUMNS)
+        self.fields = []
+        self.nested = []
+        for name, field in schema.dump_fields.items():
+            key = field.data_key or name
+            attr = field.attribute or name
+            if isinstance(field, ma_fields.Nested):
+                relationship = mapper.relationships[attr]
+                (local,) = relationship.local_columns
+                (remote,) = relationship.remote_side
+                parent_key = mapper.get_property_by_column(local).key
+                child = CompiledSerializer(field.schema)
+                child_key = inspect(child.model).get_property_by_column(remote).key
+                child.include(child_key)
+                needed.add(parent_key)
+                self.nested.append((key, child, parent_key, child_key, field.many))
+            elif attr in columns:
+                needed.add(attr)
+            elif "columns" in field.metadata:
+                # Method fields name the columns they read, e.g. product_id for the cached product
+                needed.update(field.metadata["columns"])
+            else:
+                needed.update(columns)
+            self.fields.append((key, name, attr, field))
+
+        self.column_keys = [attr.key for attr in mapper.column_attrs if attr.key in needed]
+        self.has_pre_dump = bool(schema._hooks[PRE_DUMP])
+        self._dump_row = None
+
+    def include(self, key):
+        '''
+        Also select column key, e.g. the foreign key nested rows are grouped by
+        '''
+        if key not in self.column_keys:
+            self.column_keys.append(key)
+            self._dump_row = None
+
+    def _compile(self):
+        '''
+        Generate `dump_row(row, nested)` building the whole dict in one literal, reading row values by position
+        '''
+        position = {key: i for i, key in enumerate(self.column_keys)}
+        nested = {key: (position[parent_key], many) for key, _, parent_key, _, many in self.nested}
+        table = self.model.__table__
+        namespace = {}
+        items = []
+        for i, (key, name, attr, field) in enumerate(self.fields):
+            if key in nested:
+                index, many = nested[key]
+                value = f"nested[{key!r}].get(row[{index}], [])"
+                items.append(f"{key!r}: {value}" if many else f"{key!r}: next(iter({value}), None)")
+            elif attr in position:
+                value = f"row[{position[attr]}]"
+                convert = _converter(field)
+                if convert is not None:
+                    namespace[f"convert_{i}"] = convert
+                    converted = f"convert_{i}({value})"
+                    value = converted if not table.c[attr].nullable else f"None if {value} is None else {converted}"
+                items.append(f"{key!r}: {value}")
+            else:
+                namespace[f"field_{i}"] = field
+                items.append(f"{key!r}: field_{i}.serialize({name!r}, row)")
+
+        source = "def dump_row(row, nested):\n    return {" + ", ".join(items) + "}\n"
+        exec(source, namespace)
+        return namespace["dump_row"]
+
+    def select(self, query, sort=None):
+        '''
+        Swap the ORM entity of a query for the columns this serializer needs (plus the sort column)
+        '''
+        keys = list(self.column_keys)
+        if sort is not None and sort[0] not in keys:
+            keys.append(sort[0])
+        return query.with_entities(*[getattr(self.model, key) for key in keys])
+
+    def _load_nested(self, rows):
+        loaded = {}
+        for key, child, parent_key, child_key, many in self.nested:
+            index = self.column_keys.index(parent_key)
+            parent_ids = {row[index] for row in rows}
+            groups = {}
+            if parent_ids:
+                child_rows = child.select(db.session.query(child.model)).filter(
+                    getattr(child.model, child_key).in_(parent_ids)
+                ).all()
+                child_index = child.column_keys.index(child_key)
+                for child_row, data in zip(child_rows, child.dump(child_rows)):
+                    groups.setdefault(child_row[child_index], []).append(data)
+            loaded[key] = groups
+        return loaded
+
+    def dump(self, rows):
+        '''
+        List of response dicts for a list of rows produced by select()
+        '''
+        if self._dump_row is None:
+            self._dump_row = self._compile()
+        rows = list(rows)
+        if self.has_pre_dump:
+            # e.g. SubscriptionReadSchema primes the product cache for the whole batch
+            rows = self.schema._invoke_dump_processors(PRE_DUMP, rows, many=True, original_data=rows)
+        nested = self._load_nested(rows) if self.nested else None
+        dump_row = self._dump_row
+        return [dump_row(row, nested) for row in rows]
+
+
+@lru_cache(maxsize=128)
+def _compile(schema, fields):
+    return CompiledSerializer(schema.__class__(many=True, only=fields) if fields is not None else schema)
+
+
+def compiled_serializer(schema, fields=None):
+    '''
+    Compiled serializer for a Read schema, optionally limited to a sparse fieldset.
+    Compiled once per (schema, fields) and reused.
+    '''
+    return _compile(schema, frozenset(fields) if fields is not None else None)
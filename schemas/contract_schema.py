@@ -1,9 +1,12 @@
 from app import ma, db
 from models.contract import Contract
 from marshmallow import validates_schema, ValidationError
-from models import Client
+from models import Client, Subscription, SubscriptionTier
 from uuid import UUID
 from models.product import Product
+from sqlalchemy.orm import selectinload
+from schemas.subscription_schema import subscription_read_options
+from schemas.cache import cached_dump
 
 
 
@@ -32,14 +35,23 @@ class ContractWriteSchema(ma.SQLAlchemySchema):
         client_id = data.get("client_id")
         if client_id:
             id_obj = UUID(client_id) if isinstance(client_id, str) else client_id
-            if not db.session.get(Client, id_obj):
+            if not cached_dump(Client, id_obj):
                 raise ValidationError({"client_id":"Client does not exist"})
-            
-    
 
-    
 
-    
+
+def contract_read_options(fields=None):
+    '''
+    Eager-load plan matching the nesting of ContractReadSchema (subscriptions -> product, tiers).
+    Relationships left out of a sparse fieldset are not loaded.
+    '''
+    if fields is not None and "subscriptions" not in fields:
+        return []
+    return [selectinload(Contract.subscriptions).options(*subscription_read_options())]
+
+
+# Models nested in ContractReadSchema, whose updates change a contract's response
+contract_read_dependents = (Subscription, Product, SubscriptionTier)
 
 
 contract_read_schema = ContractReadSchema()
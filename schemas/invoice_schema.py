@@ -0,0 +1,43 @@
+from app import ma
+from models.invoice import InvoiceRun, Invoice, InvoiceLine
+from marshmallow import fields, validate, validates_schema, ValidationError
+from utils.invoicing import DEFAULT_CHUNK_SIZE, MAX_CHUNK_SIZE
+
+
+class InvoiceRunReadSchema(ma.SQLAlchemyAutoSchema):
+    class Meta:
+        model = InvoiceRun
+        load_instance = True
+        exclude = ("created_by",)
+
+class InvoiceRunWriteSchema(ma.Schema):
+
+    period_start = fields.Date(required=True)
+    period_end = fields.Date(required=True)
+    chunk_size = fields.Integer(load_default=DEFAULT_CHUNK_SIZE, validate=validate.Range(min=1, max=MAX_CHUNK_SIZE))
+
+    @validates_schema
+    def validate_period(self, data, **kwargs):
+        if "period_start" in data and "period_end" in data and data["period_start"] >= data["period_end"]:
+            raise ValidationError({"period_end": "period_end must be after period_start"})
+
+
+class InvoiceLineReadSchema(ma.SQLAlchemyAutoSchema):
+    class Meta:
+        model = InvoiceLine
+        include_fk = True
+        exclude = ("invoice_id",)
+
+class InvoiceReadSchema(ma.SQLAlchemyAutoSchema):
+    lines = fields.Nested(InvoiceLineReadSchema, many=True)
+
+    class Meta:
+        model = Invoice
+        include_fk = True
+
+
+invoice_run_read_schema = InvoiceRunReadSchema()
+
+invoice_run_write_schema = InvoiceRunWriteSchema()
+
+invoices_read_schema = InvoiceReadSchema(many=True)
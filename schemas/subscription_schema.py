@@ -1,13 +1,17 @@
 from app import ma, db
 from models.subscription import Subscription
-from marshmallow import validates_schema, ValidationError
-from models import Contract, Product
+from marshmallow import validates_schema, ValidationError, pre_dump
+from models import Contract, Product, SubscriptionTier
 from uuid import UUID
 from datetime import datetime
+from sqlalchemy.orm import selectinload
+from schemas.cache import cached_dump, prime
+from utils.bulk import existing_ids, parent_errors
 
 class SubscriptionReadSchema(ma.SQLAlchemyAutoSchema):
 
-    product = ma.Nested('ProductReadSchema')
+    # products rarely change, so the nested product comes from the read-through cache
+    product = ma.Method("dump_product", metadata={"columns": ("product_id",)})
     tiers = ma.Nested('SubscriptionTierReadSchema', many=True)
 
     class Meta:
@@ -16,6 +20,16 @@ class SubscriptionReadSchema(ma.SQLAlchemyAutoSchema):
         include_fk = True
         exclude = ("created_by", "updated_by",)
 
+    @pre_dump(pass_collection=True)
+    def prime_products(self, data, many, **kwargs):
+        # fetch every uncached product of the batch in one query
+        if "product" in self.fields:
+            prime(Product, [sub.product_id for sub in (data if many else [data])])
+        return data
+
+    def dump_product(self, obj):
+        return cached_dump(Product, obj.product_id)
+
 class SubscriptionWriteSchema(ma.SQLAlchemySchema):
     
     contract_id = ma.auto_field(required=True)
@@ -28,28 +42,34 @@ class SubscriptionWriteSchema(ma.SQLAlchemySchema):
         model = Subscription
 
     
-    @validates_schema
-    def validate_parents(self, data, **kwargs):
-        # Check contract exists
-        contract_id = data.get("contract_id")
-        product_id = data.get("product_id")
-        if contract_id:
-            try:
-                id_obj_cont = UUID(contract_id) if isinstance(contract_id, str) else contract_id
-            except Exception:
-                raise ValidationError({"error": "Invalid UUID format"})
-            if not db.session.get(Contract, id_obj_cont):
-                raise ValidationError({"error": "Contract does not exist"})
-        
-        if product_id:
-            try:
-                id_obj_prod = UUID(product_id) if isinstance(product_id, str) else product_id
-            except Exception:
-                raise ValidationError({"error": "Invalid UUID format"})
-            if not db.session.get(Product, id_obj_prod):
-                raise ValidationError({"error": "Product does not exist"})
+    @validates_schema(pass_collection=True, skip_on_field_errors=False)
+    def validate_parents(self, data, many, **kwargs):
+        # Check contracts and products exist, with one query per parent type for a whole batch
+        items = data if many else [data]
+        contracts = existing_ids(Contract, [item.get("contract_id") for item in items])
+        prime(Product, [item["product_id"] for item in items if isinstance(item.get("product_id"), UUID)])
+        errors = parent_errors(items, "product_id", lambda id: cached_dump(Product, id), "Product does not exist")
+        # a missing contract is reported over a missing product, as before
+        errors.update(parent_errors(items, "contract_id", contracts.__contains__, "Contract does not exist"))
+        if errors:
+            raise ValidationError(errors if many else errors[0])
+
+
+
+def subscription_read_options(fields=None):
+    '''
+    Eager-load plan matching the nesting of SubscriptionReadSchema (tiers; product is served from the cache).
+    Relationships left out of a sparse fieldset are not loaded.
+    '''
+    options = []
+    if fields is None or "tiers" in fields:
+        options.append(selectinload(Subscription.tiers))
+    return options
+
+
+# Models nested in SubscriptionReadSchema, whose updates change a subscription's response
+subscription_read_dependents = (Product, SubscriptionTier)
 
-    
 
 subscription_read_schema = SubscriptionReadSchema()
 
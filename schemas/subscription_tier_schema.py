@@ -2,7 +2,7 @@ from app import ma, db
 from models.subscription_tier import SubscriptionTier 
 from marshmallow import validates_schema, ValidationError
 from models import Subscription
-from uuid import UUID
+from utils.bulk import existing_ids, parent_errors
 from datetime import datetime
 
 
@@ -30,17 +30,17 @@ class SubscriptionTierWriteSchema(ma.SQLAlchemySchema):
     @validates_schema
     def validate_dependency(self, data, **kwargs):
         # check min/max
-        if "min_calls" in data and "max_calls" in data and data["min_calls"] > data["max_calls"]:
-            raise ValidationError({"min_calls": "min_calls must be <= max_calls"})
-        # check subscription exists
-        subscription_id = data.get("subscription_id")
-        if subscription_id:
-            try:
-                id_obj = UUID(subscription_id) if isinstance(subscription_id, str) else subscription_id
-            except Exception:
-                raise ValidationError({"error": "Invalid UUID format"})
-            if not db.session.get(Subscription, id_obj):
-                raise ValidationError({"error": "Subscription does not exist"})
+        if "min_calls" in data and "max_calls" in data and data["min_calls"] >= data["max_calls"]:
+            raise ValidationError({"min_calls": "min_calls must be < max_calls"})
+
+    @validates_schema(pass_collection=True, skip_on_field_errors=False)
+    def validate_subscriptions(self, data, many, **kwargs):
+        # check subscriptions exist, with one query for a whole batch
+        items = data if many else [data]
+        found = existing_ids(Subscription, [item.get("subscription_id") for item in items])
+        errors = parent_errors(items, "subscription_id", found.__contains__, "Subscription does not exist")
+        if errors:
+            raise ValidationError(errors if many else errors[0])
 
     @validates_schema
     def validate_dates(self, data, **kwargs):
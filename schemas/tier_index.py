@@ -0,0 +1,111 @@
+from bisect import bisect_right
+from app import db, cache
+from models import SubscriptionTier
+from schemas.compiled import compiled_serializer
+from schemas.subscription_tier_schema import subscription_tiers_read_schema
+
+# Subscriptions with more live tiers than this are not indexed in memory; their lookups go to the database
+MAX_INDEXED_TIERS = 256
+
+# Cached in place of an index for subscriptions over MAX_INDEXED_TIERS
+_UNINDEXED = "unindexed"
+
+
+def tier_index_key(subscription_id):
+    return f"tier_index:{subscription_id}"
+
+
+class TierIndex:
+    '''
+    Interval index over the live tiers of one subscription. The start and end dates of the tiers
+    cut time into periods in which the same tiers apply, and each period keeps its tiers in sorted
+    min_calls / max_calls arrays. A lookup bisects the period boundaries, then the period's
+    min_calls: O(log n). Tiers cover min_calls <= calls < max_calls and start_date <= at < end_date.
+    '''
+    __slots__ = ("bounds", "periods")
+
+    def __init__(self, tiers):
+        '''
+        tiers: (min_calls, max_calls, start_date, end_date, value) tuples; value is what lookup returns
+        '''
+        self.bounds = sorted({tier[2] for tier in tiers} | {tier[3] for tier in tiers})
+        self.periods = []
+        for start in self.bounds[:-1]:
+            active = sorted((tier for tier in tiers if tier[2] <= start < tier[3]), key=lambda tier: tier[0])
+            self.periods.append(([tier[0] for tier in active], [tier[1] for tier in active], [tier[4] for tier in active]))
+
+    def lookup(self, calls, at):
+        '''
+        Value of the tier covering calls at `at`, or None
+        '''
+        period = bisect_right(self.bounds, at) - 1
+        if period < 0 or period >= len(self.periods):
+            return None
+        mins, maxes, values = self.periods[period]
+        i = bisect_right(mins, calls) - 1
+        if i >= 0 and calls < maxes[i]:
+            return values[i]
+        return None
+
+
+def _live_tiers(subscription_id):
+    serializer = compiled_serializer(subscription_tiers_read_schema)
+    query = serializer.select(db.session.query(SubscriptionTier)).filter(
+        SubscriptionTier.subscription_id == subscription_id, SubscriptionTier.is_archived == False
+    )
+    return serializer, query
+
+
+def build_tier_index(subscription_id):
+    '''
+    TierIndex of the subscription's live tiers holding their Read schema dumps, from one query.
+    None when the subscription has more than MAX_INDEXED_TIERS tiers.
+    '''
+    serializer, query = _live_tiers(subscription_id)
+    rows = query.limit(MAX_INDEXED_TIERS + 1).all()
+    if len(rows) > MAX_INDEXED_TIERS:
+        return None
+    dumps = serializer.dump(rows)
+    return TierIndex([
+        (row.min_calls, row.max_calls, row.start_date, row.end_date, data) for row, data in zip(rows, dumps)
+    ])
+
+
+def query_tier(subscription_id, calls, at):
+    '''
+    The same lookup answered by the database, through ix_subscription_tier_lookup
+    '''
+    serializer, query = _live_tiers(subscription_id)
+    row = query.filter(
+        SubscriptionTier.min_calls <= calls, SubscriptionTier.max_calls > calls,
+        SubscriptionTier.start_date <= at, SubscriptionTier.end_date > at,
+    ).order_by(SubscriptionTier.min_calls.desc()).first()
+    return serializer.dump([row])[0] if row is not None else None
+
+
+def find_tier(subscription_id, calls, at):
+    '''
+    Read schema dump of the live tier of a subscription covering a call count at a time, or None.
+    Answered from the subscription's TierIndex, which is built on first use and kept in the
+    process-local cache until a tier write invalidates it.
+    '''
+    key = tier_index_key(subscription_id)
+    index = cache.local.get(key)
+    if index is None:
+        index = build_tier_index(subscription_id) or _UNINDEXED
+        cache.local.set(key, index)
+    if index is _UNINDEXED:
+        return query_tier(subscription_id, calls, at)
+    return index.lookup(calls, at)
+
+
+def invalidate_tier_index(*subscription_ids):
+    for subscription_id in set(subscription_ids):
+        cache.delete(tier_index_key(subscription_id))
+
+
+def invalidate_tier_indexes():
+    '''
+    Drop every tier index, for writes that do not name the subscriptions they touch (e.g. cascading archives)
+    '''
+    cache.delete_local_prefix(tier_index_key(""))
@@ -0,0 +1,11 @@
+from app import ma
+from models.usage import UsageBatch
+
+class UsageBatchReadSchema(ma.SQLAlchemyAutoSchema):
+    class Meta:
+        model = UsageBatch
+        load_instance = True
+        exclude = ("created_by",)
+
+
+usage_batch_read_schema = UsageBatchReadSchema()
@@ -1,9 +1,11 @@
 # tests/conftest.py
 import uuid
 import pytest
+from sqlalchemy import event
 from app import create_app, db as _db
 from models.user import User
 from flask_jwt_extended import create_access_token
+from tests.resp_server import RespStandIn
 
 @pytest.fixture
 def app(monkeypatch):
@@ -26,6 +28,14 @@ def clean_db(app):
         _db.drop_all()
 
 
+@pytest.fixture
+def resp_server():
+    # local stand-in for the Redis server used by the shared cache backend
+    server = RespStandIn().start()
+    yield server
+    server.stop()
+
+
 
 
 @pytest.fixture
@@ -51,6 +61,9 @@ def saved_token(app, monkeypatch):
         "blueprints.product",
         "blueprints.subscription",
         "blueprints.subscription_tier",
+        "blueprints.usage",
+        "blueprints.invoice",
+        "blueprints.imports",
     ]
     for mod in modules_to_patch:
         monkeypatch.setattr(f"{mod}.get_jwt_identity", lambda: uuid_identity)
@@ -65,3 +78,16 @@ def auth_headers(saved_token):
     return {"Authorization": f"Bearer {saved_token}"}
 
 
+@pytest.fixture
+def query_counter(app):
+    # records every SQL statement sent to the engine while the fixture is active
+    with app.app_context():
+        engine = _db.engine
+
+    statements = []
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(engine, "before_cursor_execute", before_cursor_execute)
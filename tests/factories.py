@@ -116,7 +116,11 @@ def create_subscription_using_api(client, auth_headers, contract_id, product_id,
     return res.get_json()["data"]["subscription"]
 
 def create_subscription_tier_using_api(client, auth_headers, subscription_id, payload=None):
-    payload =payload or subscription_tier_payload(subscription_id)
+    if payload is None:
+        # tiers of a subscription may not overlap, so a default tier takes the 1000 calls above its existing tiers
+        tiers = client.get(f"/subscriptions/{subscription_id}/tiers?limit=500", headers=auth_headers).get_json()["data"]["tiers"]
+        min_calls = max((tier["max_calls"] for tier in tiers), default=0)
+        payload = subscription_tier_payload(subscription_id, min_calls=min_calls, max_calls=min_calls + 1000)
     res = client.post("/subscription-tiers", headers=auth_headers, json=payload)
     assert res.status_code == 201, f"create_subscription_tier failed: {res.get_data(as_text=True)}"
     return res.get_json()["data"]["subscription_tier"]
@@ -124,3 +128,27 @@ def create_subscription_tier_using_api(client, auth_headers, subscription_id, pa
 
 
 
+
+
+def create_subscription(client, auth_headers):
+    deps = create_subscription_dependencies(client, auth_headers)
+    return create_subscription_using_api(client, auth_headers, deps["contract"]["id"], deps["product"]["id"])
+
+
+# contract with `subscriptions` subscriptions of one product, each with `tiers` tiers,
+# for client_id or a new client; names are unique so a test can create several trees
+def create_contract_tree(client, auth_headers, client_id=None, subscriptions=2, tiers=2):
+    product_obj = create_product_using_api(client, auth_headers, product_payload(api_name=f"API {uuid.uuid4().hex}"))
+    if client_id is None:
+        client_obj = create_client_using_api(client, auth_headers, client_payload(company_name=f"Client {uuid.uuid4().hex}"))
+        deps = {"client": client_obj, "contract": create_contract_using_api(client, auth_headers, client_obj["id"])}
+    else:
+        deps = {"contract": create_contract_using_api(client, auth_headers, client_id)}
+    deps["product"] = product_obj
+    deps["subscriptions"] = []
+    for _ in range(subscriptions):
+        sub = create_subscription_using_api(client, auth_headers, deps["contract"]["id"], product_obj["id"])
+        deps["subscriptions"].append(sub)
+        for _ in range(tiers):
+            create_subscription_tier_using_api(client, auth_headers, sub["id"])
+    return deps
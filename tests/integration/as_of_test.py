@@ -0,0 +1,46 @@
+from tests.factories import *
+
+YEAR_2026 = {"start_date": "2026-01-01T00:00:00", "end_date": "2027-01-01T00:00:00"}
+YEAR_2027 = {"start_date": "2027-01-01T00:00:00", "end_date": "2028-01-01T00:00:00"}
+
+
+def create_tiered_subscription(client, auth_headers, deps, **dates):
+    contract = create_contract_using_api(client, auth_headers, deps["client"]["id"])
+    sub = create_subscription_using_api(client, auth_headers, contract["id"], deps["product"]["id"])
+    tier = create_subscription_tier_using_api(client, auth_headers, sub["id"], subscription_tier_payload(sub["id"], **dates))
+    return sub, tier
+
+
+def listed_ids(client, auth_headers, path, key, as_of):
+    res = client.get(path, headers=auth_headers, query_string={"as_of": as_of, "limit": 100})
+    assert res.status_code == 200
+    return {item["id"] for item in res.get_json()["data"][key]}
+
+
+def test_as_of_lists_what_was_in_effect(client, auth_headers):
+    deps = create_subscription_dependencies(client, auth_headers)
+    sub_2026, tier_2026 = create_tiered_subscription(client, auth_headers, deps, **YEAR_2026)
+    sub_2027, tier_2027 = create_tiered_subscription(client, auth_headers, deps, **YEAR_2027)
+
+    assert listed_ids(client, auth_headers, "/subscription-tiers", "subscription_tiers", "2026-06-01T00:00:00") == {tier_2026["id"]}
+    assert listed_ids(client, auth_headers, "/subscriptions", "subscriptions", "2026-06-01T00:00:00") == {sub_2026["id"]}
+    assert listed_ids(client, auth_headers, "/contracts", "contracts", "2026-06-01T00:00:00") == {sub_2026["contract_id"]}
+
+    # end_date is exclusive, and offsets are compared in UTC
+    assert listed_ids(client, auth_headers, "/subscription-tiers", "subscription_tiers", "2027-01-01T00:00:00") == {tier_2027["id"]}
+    assert listed_ids(client, auth_headers, "/subscriptions", "subscriptions", "2027-01-01T00:30:00+01:00") == {sub_2026["id"]}
+    assert listed_ids(client, auth_headers, "/contracts", "contracts", "2030-01-01") == set()
+
+
+def test_as_of_ignores_archived_tiers(client, auth_headers):
+    sub, tier = create_tiered_subscription(client, auth_headers, create_subscription_dependencies(client, auth_headers), **YEAR_2026)
+    client.delete(f"/subscription-tiers/{tier['id']}", headers=auth_headers)
+
+    assert listed_ids(client, auth_headers, "/subscriptions", "subscriptions", "2026-06-01T00:00:00") == set()
+    assert listed_ids(client, auth_headers, "/contracts", "contracts", "2026-06-01T00:00:00") == set()
+
+
+def test_invalid_as_of_is_rejected(client, auth_headers):
+    res = client.get("/subscriptions", headers=auth_headers, query_string={"as_of": "yesterday"})
+    assert res.status_code == 400
+    assert "as_of" in res.get_json()["errors"]
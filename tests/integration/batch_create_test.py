@@ -0,0 +1,83 @@
+from tests.factories import *
+from utils.bulk import MAX_BATCH_SIZE
+
+
+def post_batch(client, auth_headers, url, items):
+    return client.post(url, headers=auth_headers, json=items)
+
+
+def test_batch_create_tiers(client, auth_headers):
+    deps = create_subscription_dependencies(client, auth_headers)
+    sub = create_subscription_using_api(client, auth_headers, deps["contract"]["id"], deps["product"]["id"])
+    items = [subscription_tier_payload(sub["id"], min_calls=i * 1000, max_calls=(i + 1) * 1000) for i in range(5)]
+
+    res = post_batch(client, auth_headers, "/subscription-tiers:batch", items)
+    assert res.status_code == 201
+    tiers = res.get_json()["data"]["subscription_tiers"]
+    # returned in request order
+    assert [tier["min_calls"] for tier in tiers] == [0, 1000, 2000, 3000, 4000]
+    assert all(tier["subscription_id"] == sub["id"] for tier in tiers)
+    assert tiers[0] == client.get(f"/subscription-tiers/{tiers[0]['id']}", headers=auth_headers).get_json()["data"]["subscription_tier"]
+
+
+def test_batch_create_clients_and_products(client, auth_headers):
+    clients = [client_payload(company_name=f"Client {i}") for i in range(3)]
+    res = post_batch(client, auth_headers, "/clients:batch", clients)
+    assert res.status_code == 201
+    assert [c["company_name"] for c in res.get_json()["data"]["clients"]] == ["Client 0", "Client 1", "Client 2"]
+
+    products = [product_payload(api_name=f"API {i}") for i in range(3)]
+    res = post_batch(client, auth_headers, "/products:batch", products)
+    assert res.status_code == 201
+    assert len(client.get("/products", headers=auth_headers).get_json()["data"]["products"]) == 3
+
+
+def test_batch_errors_are_reported_by_index(client, auth_headers):
+    deps = create_subscription_dependencies(client, auth_headers)
+    contract_id, product_id = deps["contract"]["id"], deps["product"]["id"]
+    items = [
+        subscription_payload(contract_id, product_id),
+        subscription_payload(str(uuid.uuid4()), product_id),
+        subscription_payload(contract_id, str(uuid.uuid4())),
+        subscription_payload(contract_id, product_id, pricing_type=None),
+    ]
+
+    res = post_batch(client, auth_headers, "/subscriptions:batch", items)
+    assert res.status_code == 400
+    errors = res.get_json()["errors"]
+    assert set(errors) == {"1", "2", "3"}
+    assert errors["1"] == {"error": "Contract does not exist"}
+    assert errors["2"] == {"error": "Product does not exist"}
+    assert "pricing_type" in errors["3"]
+    # nothing was created
+    assert client.get("/subscriptions", headers=auth_headers).get_json()["data"]["subscriptions"] == []
+
+
+def test_batch_is_one_transaction(client, auth_headers):
+    items = [client_payload(company_name="Twin"), client_payload(company_name="Twin")]
+    res = post_batch(client, auth_headers, "/clients:batch", items)
+    assert res.status_code == 400
+    assert client.get("/clients", headers=auth_headers).get_json()["data"]["clients"] == []
+
+
+def test_batch_body_must_be_an_array(client, auth_headers):
+    assert post_batch(client, auth_headers, "/products:batch", product_payload()).status_code == 400
+    assert post_batch(client, auth_headers, "/products:batch", []).status_code == 400
+    too_many = [product_payload(api_name=f"API {i}") for i in range(MAX_BATCH_SIZE + 1)]
+    assert post_batch(client, auth_headers, "/products:batch", too_many).status_code == 400
+
+
+def test_batch_query_count_is_constant(client, auth_headers, query_counter):
+    deps = create_subscription_dependencies(client, auth_headers)
+    contract_id, product_id = deps["contract"]["id"], deps["product"]["id"]
+
+    def count(size):
+        query_counter.clear()
+        res = post_batch(client, auth_headers, "/subscriptions:batch", [subscription_payload(contract_id, product_id) for _ in range(size)])
+        assert res.status_code == 201
+        return len(query_counter)
+
+    count(1)  # warms the product cache
+    assert count(2) == count(50)
+    # parents checked with one IN query, rows written with one multi-row INSERT
+    assert len([statement for statement in query_counter if statement.startswith("INSERT")]) == 1
@@ -0,0 +1,79 @@
+from tests.factories import *
+
+
+def archived_flags(client, auth_headers, url, key):
+    return [row["is_archived"] for row in client.get(url, headers=auth_headers).get_json()["data"][key]]
+
+
+def test_contract_delete_cascades(client, auth_headers):
+    owner = create_client_using_api(client, auth_headers)
+    tree = create_contract_tree(client, auth_headers, owner["id"])
+    other = create_contract_tree(client, auth_headers, owner["id"])
+    contract_id = tree["contract"]["id"]
+
+    res = client.delete(f"/contracts/{contract_id}?cascade=true", headers=auth_headers)
+    assert res.status_code == 200
+
+    assert archived_flags(client, auth_headers, f"/subscriptions?contract_id={contract_id}", "subscriptions") == [True, True]
+    for sub in tree["subscriptions"]:
+        assert archived_flags(client, auth_headers, f"/subscription-tiers?subscription_id={sub['id']}", "subscription_tiers") == [True, True]
+    # the sibling contract is untouched
+    assert archived_flags(client, auth_headers, f"/subscriptions?contract_id={other['contract']['id']}", "subscriptions") == [False, False]
+
+
+def test_delete_without_cascade_archives_one_row(client, auth_headers):
+    owner = create_client_using_api(client, auth_headers)
+    tree = create_contract_tree(client, auth_headers, owner["id"])
+    sub = tree["subscriptions"][0]
+
+    assert client.delete(f"/subscriptions/{sub['id']}", headers=auth_headers).status_code == 200
+    assert archived_flags(client, auth_headers, f"/subscription-tiers?subscription_id={sub['id']}", "subscription_tiers") == [False, False]
+
+    assert client.delete(f"/subscriptions/{sub['id']}?cascade=1", headers=auth_headers).status_code == 200
+    assert archived_flags(client, auth_headers, f"/subscription-tiers?subscription_id={sub['id']}", "subscription_tiers") == [True, True]
+
+
+def test_bulk_archive_clients_with_cascade(client, auth_headers, query_counter):
+    owner = create_client_using_api(client, auth_headers)
+    for _ in range(2):
+        create_contract_tree(client, auth_headers, owner["id"])
+
+    query_counter.clear()
+    res = client.post("/clients:archive?cascade=true", headers=auth_headers, json=[owner["id"]])
+    assert res.status_code == 200
+    assert res.get_json()["data"]["archived"] == {"client": 1, "contract": 2, "subscription": 4, "subscription_tier": 8}
+    # id check plus one UPDATE per table, whatever the size of the subtree
+    assert len([statement for statement in query_counter if statement.startswith("UPDATE")]) == 4
+
+    assert client.get(f"/clients/{owner['id']}", headers=auth_headers).get_json()["data"]["client"]["is_archived"] is True
+    assert all(archived_flags(client, auth_headers, "/subscription-tiers", "subscription_tiers"))
+
+    # already archived rows are not counted again
+    res = client.post("/clients:archive?cascade=true", headers=auth_headers, json=[owner["id"]])
+    assert res.get_json()["data"]["archived"] == {"client": 0, "contract": 0, "subscription": 0, "subscription_tier": 0}
+
+
+def test_bulk_archive_without_cascade(client, auth_headers):
+    owner = create_client_using_api(client, auth_headers)
+    first = create_contract_tree(client, auth_headers, owner["id"])
+    second = create_contract_tree(client, auth_headers, owner["id"])
+
+    ids = [first["contract"]["id"], second["contract"]["id"]]
+    res = client.post("/contracts:archive", headers=auth_headers, json=ids)
+    assert res.get_json()["data"]["archived"] == {"contract": 2}
+    assert not any(archived_flags(client, auth_headers, "/subscriptions", "subscriptions"))
+
+
+def test_bulk_archive_rejects_unknown_ids(client, auth_headers):
+    owner = create_client_using_api(client, auth_headers)
+    tree = create_contract_tree(client, auth_headers, owner["id"], tiers=0)
+    ids = [tree["subscriptions"][0]["id"], str(uuid.uuid4()), "not-a-uuid"]
+
+    res = client.post("/subscriptions:archive", headers=auth_headers, json=ids)
+    assert res.status_code == 400
+    assert res.get_json()["errors"] == {"2": ["Not a valid UUID."]}
+
+    res = client.post("/subscriptions:archive", headers=auth_headers, json=ids[:2])
+    assert res.status_code == 400
+    assert res.get_json()["errors"] == {"1": ["Subscription does not exist"]}
+    assert not any(archived_flags(client, auth_headers, "/subscriptions", "subscriptions"))
@@ -0,0 +1,147 @@
+import csv
+import functools
+import io
+from app import db
+from models import Client, User
+import blueprints.imports as imports
+import utils.importing as importing
+from tests.factories import *
+
+CSV_HEADERS = {"Content-Type": "text/csv"}
+
+
+def post_csv(client, auth_headers, entity, lines):
+    return client.post(f"/imports/{entity}", headers={**auth_headers, **CSV_HEADERS}, data="\n".join(lines) + "\n")
+
+
+def rejected_rows(res):
+    return {int(row["line"]): row for row in csv.DictReader(io.StringIO(res.get_json()["data"]["rejected"]))}
+
+
+def test_import_clients_rejects_invalid_and_duplicate_rows(client, auth_headers):
+    existing = create_client_using_api(client, auth_headers)
+    res = post_csv(client, auth_headers, "clients", [
+        "company_name,email,phone_number,address",
+        "Acme,acme@example.com,555-0100,1 Main St",
+        f"{existing['company_name']},new@example.com,555-0101,2 Main St",
+        "Acme,other@example.com,555-0102,3 Main St",
+        "Globex,,555-0103,4 Main St",
+        f"Initech,{'x' * 250}@example.com,555-0104,5 Main St",
+    ])
+    assert res.status_code == 200
+    assert res.get_json()["data"]["import"] == {"rows": 5, "imported": 1, "rejected": 4}
+
+    rejected = rejected_rows(res)
+    assert set(rejected) == {3, 4, 5, 6}
+    assert "already exists" in rejected[3]["errors"]
+    assert "already exists" in rejected[4]["errors"]
+    assert "Missing data" in rejected[5]["errors"]
+    assert "maximum length" in rejected[6]["errors"]
+
+    names = {item["company_name"] for item in client.get("/clients", headers=auth_headers).get_json()["data"]["clients"]}
+    assert names == {existing["company_name"], "Acme"}
+
+
+def test_import_products_twice(client, auth_headers):
+    lines = ["api_name,description"] + [f"api-{i},Product {i}" for i in range(12)]
+    res = post_csv(client, auth_headers, "products", lines)
+    assert res.get_json()["data"]["import"] == {"rows": 12, "imported": 12, "rejected": 0}
+    assert res.get_json()["data"]["rejected"] is None
+
+    # imported again, every row is already there
+    res = post_csv(client, auth_headers, "products", lines)
+    assert res.get_json()["data"]["import"] == {"rows": 12, "imported": 0, "rejected": 12}
+
+
+def test_import_tiers_checks_subscriptions_and_overlaps(client, auth_headers):
+    deps = create_subscription_dependencies(client, auth_headers)
+    sub = create_subscription_using_api(client, auth_headers, deps["contract"]["id"], deps["product"]["id"])
+    year = "2026-01-01T00:00:00,2027-01-01T00:00:00"
+    res = post_csv(client, auth_headers, "tiers", [
+        "subscription_id,min_calls,max_calls,base_price,price_per_tier,start_date,end_date",
+        f"{sub['id']},0,1000,10.00,0.05,{year}",
+        f"{sub['id']},1000,2000,0,0.04,{year}",
+        f"{sub['id']},1500,3000,0,0.03,{year}",
+        f"{uuid.uuid4()},0,1000,10.00,0.05,{year}",
+        f"{sub['id']},5000,4000,0,0.01,{year}",
+        f"{sub['id']},6000,7000,0.001,0.01,{year}",
+        f"not-a-uuid,0,1000,10.00,0.05,{year}",
+    ])
+    assert res.get_json()["data"]["import"] == {"rows": 7, "imported": 2, "rejected": 5}
+
+    rejected = rejected_rows(res)
+    assert set(rejected) == {4, 5, 6, 7, 8}
+    assert "overlaps" in rejected[4]["errors"]
+    assert "Subscription does not exist" in rejected[5]["errors"]
+    assert "min_calls must be < max_calls" in rejected[6]["errors"]
+    assert "2 decimal places" in rejected[7]["errors"]
+    assert "Not a valid UUID" in rejected[8]["errors"]
+
+    tiers = client.get(f"/subscriptions/{sub['id']}/tiers", headers=auth_headers).get_json()["data"]["tiers"]
+    assert sorted((tier["min_calls"], tier["max_calls"]) for tier in tiers) == [(0, 1000), (1000, 2000)]
+
+
+def test_rejected_rows_without_orjson(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(importing, "orjson", None)
+    res = post_csv(client, auth_headers, "products", ["api_name,description", "Search,", "Maps,Maps"])
+
+    assert res.get_json()["data"]["import"] == {"rows": 2, "imported": 1, "rejected": 1}
+    assert rejected_rows(res)[2]["errors"] == '{"description":["Missing data for required field."]}'
+
+
+def test_import_requests_are_checked(client, auth_headers):
+    assert post_csv(client, auth_headers, "contracts", ["contract_name"]).status_code == 400
+    assert post_csv(client, auth_headers, "products", ["api_name"]).get_json()["errors"] == "CSV header is missing description"
+    res = client.post("/imports/products", headers=auth_headers, json=[{"api_name": "x"}])
+    assert res.status_code == 400
+
+
+def test_import_command_writes_rejected_file(app, tmp_path):
+    with app.app_context():
+        user = User(email="importer@example.com", full_name="Importer")
+        user.set_password("pass12345")
+        db.session.add(user)
+        db.session.commit()
+
+    path = tmp_path / "clients.csv"
+    path.write_text("company_name,email,phone_number,address\n" + "".join(f"Client {i},c{i}@example.com,555-01{i:02},{i} Main St\n" for i in range(5)) + "Client 0,dup@example.com,555-0199,9 Main St\n")
+
+    result = app.test_cli_runner().invoke(args=["imports", "load", "clients", str(path), "--user", "importer@example.com", "--chunk-size", "2"])
+    assert result.exit_code == 0, result.output
+    assert "5 of 6 rows imported, 1 rejected" in result.output
+
+    rejected = list(csv.DictReader(open(f"{path}.rejected.csv")))
+    assert [(row["line"], row["company_name"]) for row in rejected] == [("7", "Client 0")]
+    with app.app_context():
+        assert db.session.query(Client).count() == 5
+
+
+def test_tiers_of_a_partially_failed_import_are_looked_up(client, auth_headers, monkeypatch):
+    deps = create_subscription_dependencies(client, auth_headers)
+    sub = create_subscription_using_api(client, auth_headers, deps["contract"]["id"], deps["product"]["id"])
+    lookup = f"/subscriptions/{sub['id']}/tiers/lookup?calls=10&at=2026-03-01T00:00:00"
+    # builds and caches the subscription's (empty) tier index
+    assert client.get(lookup, headers=auth_headers).status_code == 404
+
+    # one row per chunk, the second chunk fails after the first was committed
+    writes = []
+    def failing_write(spec, rows):
+        writes.append(rows)
+        if len(writes) == 2:
+            raise RuntimeError("disk full")
+        write(spec, rows)
+    write = importing._write
+    monkeypatch.setattr(importing, "_write", failing_write)
+    monkeypatch.setattr(imports, "import_rows", functools.partial(importing.import_rows, chunk_size=1))
+
+    year = "2026-01-01T00:00:00,2027-01-01T00:00:00"
+    res = post_csv(client, auth_headers, "tiers", [
+        "subscription_id,min_calls,max_calls,base_price,price_per_tier,start_date,end_date",
+        f"{sub['id']},0,1000,10.00,0.05,{year}",
+        f"{sub['id']},1000,2000,0,0.04,{year}",
+    ])
+    assert res.status_code == 500
+
+    res = client.get(lookup, headers=auth_headers)
+    assert res.status_code == 200
+    assert res.get_json()["data"]["subscription_tier"]["max_calls"] == 1000
@@ -0,0 +1,72 @@
+import pytest
+from sqlalchemy import event
+from app import db
+from models import Client, Contract, Product, Subscription, SubscriptionTier, User
+from schemas.client_schema import clients_read_schema
+from schemas.contract_schema import contracts_read_schema
+from schemas.product_schema import products_read_schema
+from schemas.subscription_schema import subscriptions_read_schema
+from schemas.subscription_tier_schema import subscription_tiers_read_schema
+from schemas.user_schema import users_read_schema
+from schemas.compiled import compiled_serializer
+from tests.factories import *
+
+
+def create_graph(client, auth_headers):
+    deps = create_subscription_dependencies(client, auth_headers)
+    for strategy in ("Pick", "Fill"):
+        payload = subscription_payload(deps["contract"]["id"], deps["product"]["id"], strategy=strategy)
+        sub = create_subscription_using_api(client, auth_headers, deps["contract"]["id"], deps["product"]["id"], payload)
+        create_subscription_tier_using_api(client, auth_headers, sub["id"])
+        payload = subscription_tier_payload(sub["id"], min_calls=1001, max_calls=5000, base_price=12.5,
+                                            start_date="2026-01-01T00:00:00", end_date="2026-06-30T23:59:59.999999")
+        create_subscription_tier_using_api(client, auth_headers, sub["id"], payload)
+    create_contract_using_api(client, auth_headers, deps["client"]["id"])
+
+
+@pytest.mark.parametrize("model, schema", [
+    (Client, clients_read_schema),
+    (Contract, contracts_read_schema),
+    (Product, products_read_schema),
+    (Subscription, subscriptions_read_schema),
+    (SubscriptionTier, subscription_tiers_read_schema),
+    (User, users_read_schema),
+])
+def test_compiled_output_is_identical_to_schema(app, client, auth_headers, model, schema):
+    create_graph(client, auth_headers)
+
+    with app.app_context():
+        query = db.session.query(model).order_by(model.id)
+        expected = app.json.dumps(schema.dump(query.all()))
+        serializer = compiled_serializer(schema)
+        assert app.json.dumps(serializer.dump(serializer.select(query).all())) == expected
+
+
+def test_compiled_sparse_fields(app, client, auth_headers):
+    create_graph(client, auth_headers)
+
+    with app.app_context():
+        query = db.session.query(Subscription).order_by(Subscription.id)
+        fields = {"id", "product", "tiers"}
+        expected = subscriptions_read_schema.__class__(many=True, only=fields).dump(query.all())
+        serializer = compiled_serializer(subscriptions_read_schema, fields)
+        assert serializer.dump(serializer.select(query).all()) == expected
+        assert compiled_serializer(subscriptions_read_schema, set(fields)) is serializer
+
+
+def test_list_endpoints_do_not_hydrate_orm_objects(client, auth_headers):
+    create_graph(client, auth_headers)
+
+    loaded = []
+    listener = lambda target, context: loaded.append(target)
+    for model in (Contract, Subscription, SubscriptionTier):
+        event.listen(model, "load", listener)
+    try:
+        res = client.get("/contracts", headers=auth_headers)
+        assert res.status_code == 200
+        assert len(res.get_json()["data"]["contracts"][0]["subscriptions"]) == 2
+        assert client.get("/subscriptions", headers=auth_headers).status_code == 200
+    finally:
+        for model in (Contract, Subscription, SubscriptionTier):
+            event.remove(model, "load", listener)
+    assert loaded == []
@@ -0,0 +1,91 @@
+import gzip
+import json
+import os
+import zlib
+import pytest
+from tests.factories import *
+
+
+def test_gzip_large_response(client, auth_headers):
+    create_contract_tree(client, auth_headers, subscriptions=1, tiers=5)
+    plain = client.get("/contracts", headers=auth_headers)
+
+    res = client.get("/contracts", headers={**auth_headers, "Accept-Encoding": "gzip"})
+    assert res.status_code == 200
+    assert res.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in res.headers["Vary"]
+    assert int(res.headers["Content-Length"]) < len(plain.get_data())
+    assert json.loads(gzip.decompress(res.get_data())) == plain.get_json()
+
+
+def test_deflate_and_client_preference(client, auth_headers):
+    create_contract_tree(client, auth_headers, subscriptions=1, tiers=5)
+    plain = client.get("/contracts", headers=auth_headers)
+
+    res = client.get("/contracts", headers={**auth_headers, "Accept-Encoding": "gzip;q=0.5, deflate"})
+    assert res.headers["Content-Encoding"] == "deflate"
+    assert json.loads(zlib.decompress(res.get_data())) == plain.get_json()
+
+
+def test_small_and_unrequested_responses_are_not_compressed(app, client, auth_headers):
+    create_contract_tree(client, auth_headers, subscriptions=1, tiers=5)
+
+    res = client.get("/contracts", headers=auth_headers)
+    assert "Content-Encoding" not in res.headers
+    assert "Accept-Encoding" in res.headers["Vary"]
+
+    app.config["COMPRESS_MIN_SIZE"] = 10 ** 9
+    res = client.get("/contracts", headers={**auth_headers, "Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in res.headers
+    assert res.get_json()["success"] is True
+
+
+def test_compression_level_is_configurable(app, client, auth_headers):
+    create_contract_tree(client, auth_headers, subscriptions=1, tiers=20)
+    headers = {**auth_headers, "Accept-Encoding": "gzip"}
+
+    app.config["COMPRESS_LEVEL"] = 1
+    fast = client.get("/contracts", headers=headers).get_data()
+    app.config["COMPRESS_LEVEL"] = 9
+    small = client.get("/contracts", headers=headers).get_data()
+    assert gzip.decompress(fast) == gzip.decompress(small)
+    assert len(small) <= len(fast)
+
+
+def test_stream_is_compressed_incrementally(client, auth_headers):
+    deps = create_contract_tree(client, auth_headers, subscriptions=1, tiers=5)
+    for _ in range(3):
+        create_contract_using_api(client, auth_headers, deps["client"]["id"])
+
+    res = client.get("/contracts?stream=1", headers={**auth_headers, "Accept-Encoding": "gzip"}, buffered=False)
+    assert res.headers["Content-Encoding"] == "gzip"
+    assert "Content-Length" not in res.headers
+
+    chunks = list(res.response)
+    decompressor = zlib.decompressobj(31)
+    first = decompressor.decompress(chunks[0])
+    # each chunk decompresses on its own, without waiting for the end of the stream
+    assert first.endswith(b"\n")
+    body = first + b"".join(decompressor.decompress(chunk) for chunk in chunks[1:])
+    assert len([json.loads(line) for line in body.splitlines()]) == 4
+
+
+def test_static_swagger_is_precompressed(app, client):
+    with open(os.path.join(app.static_folder, "swaggerDoc1.6.json"), "rb") as f:
+        original = f.read()
+    plain = client.get("/static/swaggerDoc1.6.json")
+
+    res = client.get("/static/swaggerDoc1.6.json", headers={"Accept-Encoding": "gzip"})
+    assert res.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(res.get_data()) == original
+    assert res.get_etag()[0] == f"{plain.get_etag()[0]}-gzip"
+    plain.close()
+
+
+def test_brotli_when_available(client, auth_headers):
+    brotli = pytest.importorskip("brotli")
+    create_contract_tree(client, auth_headers, subscriptions=1, tiers=5)
+
+    res = client.get("/contracts", headers={**auth_headers, "Accept-Encoding": "br, gzip"})
+    assert res.headers["Content-Encoding"] == "br"
+    assert json.loads(brotli.decompress(res.get_data()))["success"] is True
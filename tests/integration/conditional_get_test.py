@@ -0,0 +1,82 @@
+from tests.factories import *
+
+
+
+def test_contract_by_id_has_validators(client, auth_headers):
+    contract_obj = create_contract_using_api(client, auth_headers)
+
+    res = client.get(f"/contracts/{contract_obj['id']}", headers=auth_headers)
+    assert res.status_code == 200
+    assert res.headers["ETag"].startswith('W/"')
+    assert res.headers["Last-Modified"]
+
+
+def test_contract_by_id_if_none_match(client, auth_headers, query_counter):
+    contract_obj = create_contract_using_api(client, auth_headers)
+    etag = client.get(f"/contracts/{contract_obj['id']}", headers=auth_headers).headers["ETag"]
+
+    query_counter.clear()
+    res = client.get(f"/contracts/{contract_obj['id']}", headers={**auth_headers, "If-None-Match": etag})
+    assert res.status_code == 304
+    assert res.get_data() == b""
+    assert res.headers["ETag"] == etag
+    assert len(query_counter) == 1
+
+
+def test_contract_by_id_changes_after_update(client, auth_headers):
+    contract_obj = create_contract_using_api(client, auth_headers)
+    etag = client.get(f"/contracts/{contract_obj['id']}", headers=auth_headers).headers["ETag"]
+
+    client.patch(f"/contracts/{contract_obj['id']}", headers=auth_headers, json={"contract_name": "Renamed"})
+
+    res = client.get(f"/contracts/{contract_obj['id']}", headers={**auth_headers, "If-None-Match": etag})
+    assert res.status_code == 200
+    assert res.headers["ETag"] != etag
+    assert res.get_json()["data"]["contract"]["contract_name"] == "Renamed"
+
+
+def test_contract_by_id_if_modified_since(client, auth_headers):
+    contract_obj = create_contract_using_api(client, auth_headers)
+    last_modified = client.get(f"/contracts/{contract_obj['id']}", headers=auth_headers).headers["Last-Modified"]
+
+    res = client.get(f"/contracts/{contract_obj['id']}", headers={**auth_headers, "If-Modified-Since": last_modified})
+    assert res.status_code == 304
+
+
+def test_contracts_collection_if_none_match(client, auth_headers):
+    create_contract_using_api(client, auth_headers)
+    etag = client.get("/contracts", headers=auth_headers).headers["ETag"]
+
+    res = client.get("/contracts", headers={**auth_headers, "If-None-Match": etag})
+    assert res.status_code == 304
+
+
+def test_contracts_collection_changes_with_nested_rows(client, auth_headers):
+    deps = create_subscription_dependencies(client, auth_headers)
+    etag = client.get("/contracts", headers=auth_headers).headers["ETag"]
+
+    create_subscription_using_api(client, auth_headers, deps["contract"]["id"], deps["product"]["id"])
+
+    res = client.get("/contracts", headers={**auth_headers, "If-None-Match": etag})
+    assert res.status_code == 200
+    assert len(res.get_json()["data"]["contracts"][0]["subscriptions"]) == 1
+
+
+def test_collection_etag_depends_on_query_string(client, auth_headers):
+    create_product_using_api(client, auth_headers)
+    etag = client.get("/products", headers=auth_headers).headers["ETag"]
+
+    res = client.get("/products?fields=id", headers={**auth_headers, "If-None-Match": etag})
+    assert res.status_code == 200
+
+
+def test_collection_etag_depends_on_negotiated_format(client, auth_headers):
+    create_product_using_api(client, auth_headers)
+    page = client.get("/products", headers={**auth_headers, "Accept": "application/json"})
+    assert "Accept" in page.headers["Vary"]
+
+    res = client.get("/products", headers={**auth_headers, "Accept": "application/x-ndjson", "If-None-Match": page.headers["ETag"]})
+    assert res.status_code == 200
+    assert res.mimetype == "application/x-ndjson"
+    assert res.headers["ETag"] != page.headers["ETag"]
+    assert "Accept" in res.headers["Vary"]
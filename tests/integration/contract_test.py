@@ -1,4 +1,4 @@
-from tests.factories import contract_payload, client_payload
+from tests.factories import contract_payload, client_payload, product_payload, create_subscription_dependencies, create_subscription_using_api, create_product_using_api
 import uuid
 
 def test_create_contract(client, auth_headers):
@@ -148,4 +148,29 @@ def test_delete_contract_not_found(client, auth_headers):
     assert res_delete.get_json()["message"] == "Contract not found"
 
 
-    
\ No newline at end of file
+def test_get_contract_products(client, auth_headers):
+    deps = create_subscription_dependencies(client, auth_headers)
+    contract_id = deps["contract"]["id"]
+    # two subscriptions to the same product are returned once
+    create_subscription_using_api(client, auth_headers, contract_id, deps["product"]["id"])
+    create_subscription_using_api(client, auth_headers, contract_id, deps["product"]["id"])
+
+    archived_product = create_product_using_api(client, auth_headers, product_payload(api_name="Archived API"))
+    create_subscription_using_api(client, auth_headers, contract_id, archived_product["id"])
+    client.delete(f"/products/{archived_product['id']}", headers=auth_headers)
+
+    dropped_product = create_product_using_api(client, auth_headers, product_payload(api_name="Dropped API"))
+    dropped_sub = create_subscription_using_api(client, auth_headers, contract_id, dropped_product["id"])
+    client.delete(f"/subscriptions/{dropped_sub['id']}", headers=auth_headers)
+
+    res_get = client.get(f"/contracts/{contract_id}/product", headers=auth_headers)
+    assert res_get.status_code == 200
+    assert res_get.get_json()["message"] == "Products fetched successfully"
+    products = res_get.get_json()["data"]["products"]
+    assert [p["id"] for p in products] == [deps["product"]["id"]]
+
+
+def test_get_contract_products_not_found(client, auth_headers):
+    res_get = client.get(f"/contracts/{uuid.uuid4()}/product", headers=auth_headers)
+    assert res_get.status_code == 404
+    assert res_get.get_json()["message"] == "Contract not found"
@@ -0,0 +1,93 @@
+import csv
+import io
+import pytest
+from tests.factories import *
+from utils.export import EXPORT_COLUMNS, pyarrow
+
+
+def seed_contracts(client, auth_headers):
+    '''
+    A contract with a subscription of two tiers (one archived) and a contract without subscriptions
+    '''
+    deps = create_subscription_dependencies(client, auth_headers)
+    sub = create_subscription_using_api(client, auth_headers, deps["contract"]["id"], deps["product"]["id"])
+    tiers = [
+        create_subscription_tier_using_api(client, auth_headers, sub["id"], subscription_tier_payload(sub["id"], min_calls=min_calls, max_calls=min_calls + 1000))
+        for min_calls in (0, 1000)
+    ]
+    client.delete(f"/subscription-tiers/{tiers[1]['id']}", headers=auth_headers)
+    empty = create_contract_using_api(client, auth_headers, deps["client"]["id"])
+    return deps, sub, tiers, empty
+
+
+def read_csv(text):
+    return list(csv.DictReader(io.StringIO(text)))
+
+
+def test_csv_export_flattens_the_pricing_tree(client, auth_headers):
+    deps, sub, tiers, empty = seed_contracts(client, auth_headers)
+
+    res = client.get("/exports/contracts", headers=auth_headers)
+    assert res.status_code == 200
+    assert res.mimetype == "text/csv"
+    assert "attachment" in res.headers["Content-Disposition"]
+
+    text = res.get_data(as_text=True)
+    assert text.splitlines()[0] == ",".join(EXPORT_COLUMNS)
+    rows = {(row["contract_id"], row["tier_id"]): row for row in read_csv(text)}
+    assert set(rows) == {(deps["contract"]["id"], tiers[0]["id"]), (empty["id"], "")}
+
+    row = rows[(deps["contract"]["id"], tiers[0]["id"])]
+    assert row["client_company_name"] == deps["client"]["company_name"]
+    assert row["subscription_id"] == sub["id"]
+    assert row["product_api_name"] == deps["product"]["api_name"]
+    assert (row["min_calls"], row["max_calls"]) == ("0", "1000")
+    assert rows[(empty["id"], "")]["subscription_id"] == ""
+
+
+def test_csv_export_with_archived_rows(client, auth_headers):
+    deps, sub, tiers, empty = seed_contracts(client, auth_headers)
+
+    res = client.get("/exports/contracts", headers=auth_headers, query_string={"include_archived": "true"})
+    rows = read_csv(res.get_data(as_text=True))
+    assert {row["tier_id"] for row in rows} == {tiers[0]["id"], tiers[1]["id"], ""}
+    assert [row["tier_is_archived"] for row in rows if row["tier_id"] == tiers[1]["id"]] == ["True"]
+
+
+def test_unavailable_format_is_rejected(client, auth_headers):
+    res = client.get("/exports/contracts", headers=auth_headers, query_string={"format": "xlsx"})
+    assert res.status_code == 400
+    assert "format" in res.get_json()["errors"]
+
+
+def test_archived_products_are_left_out(client, auth_headers):
+    deps, sub, tiers, empty = seed_contracts(client, auth_headers)
+    client.delete(f"/products/{deps['product']['id']}", headers=auth_headers)
+
+    rows = read_csv(client.get("/exports/contracts", headers=auth_headers).get_data(as_text=True))
+    row = next(row for row in rows if row["subscription_id"] == sub["id"])
+    assert (row["product_id"], row["product_api_name"]) == ("", "")
+
+    res = client.get("/exports/contracts", headers=auth_headers, query_string={"include_archived": "true"})
+    row = next(row for row in read_csv(res.get_data(as_text=True)) if row["subscription_id"] == sub["id"])
+    assert row["product_api_name"] == deps["product"]["api_name"]
+
+
+@pytest.mark.skipif(pyarrow is None, reason="pyarrow is not installed")
+def test_parquet_export(client, auth_headers):
+    deps, sub, tiers, empty = seed_contracts(client, auth_headers)
+
+    res = client.get("/exports/contracts", headers=auth_headers, query_string={"format": "parquet"})
+    assert res.status_code == 200
+    table = pyarrow.parquet.read_table(pyarrow.BufferReader(res.get_data()))
+    assert table.column_names == list(EXPORT_COLUMNS)
+    assert sorted(table.column("tier_id").to_pylist(), key=str) == sorted([tiers[0]["id"], None], key=str)
+
+
+def test_export_command_writes_in_batches(app, client, auth_headers, tmp_path):
+    deps, sub, tiers, empty = seed_contracts(client, auth_headers)
+    output = tmp_path / "contracts.csv"
+
+    result = app.test_cli_runner().invoke(args=["exports", "contracts", "--output", str(output), "--batch-size", "1"])
+    assert result.exit_code == 0, result.output
+    assert len(read_csv(output.read_text())) == 2
@@ -0,0 +1,87 @@
+from tests.factories import *
+
+
+
+def test_filter_contracts_by_client(client, auth_headers):
+    contract_obj = create_contract_using_api(client, auth_headers)
+    create_contract_using_api(client, auth_headers, client_id=create_client_using_api(client, auth_headers, client_payload(company_name="Other Client"))["id"])
+
+    res = client.get(f"/contracts?client_id={contract_obj['client_id']}", headers=auth_headers)
+    assert res.status_code == 200
+    contracts = res.get_json()["data"]["contracts"]
+    assert [c["id"] for c in contracts] == [contract_obj["id"]]
+
+
+def test_filter_contracts_by_is_archived(client, auth_headers):
+    archived = create_contract_using_api(client, auth_headers)
+    live = create_contract_using_api(client, auth_headers, client_id=archived["client_id"])
+    client.delete(f"/contracts/{archived['id']}", headers=auth_headers)
+
+    res = client.get(f"/contracts?client_id={archived['client_id']}&is_archived=false", headers=auth_headers)
+    assert [c["id"] for c in res.get_json()["data"]["contracts"]] == [live["id"]]
+
+    res = client.get("/contracts?is_archived=true", headers=auth_headers)
+    assert [c["id"] for c in res.get_json()["data"]["contracts"]] == [archived["id"]]
+
+
+def test_filter_subscriptions_by_strategy(client, auth_headers):
+    deps = create_subscription_dependencies(client, auth_headers)
+    fixed = create_subscription_using_api(client, auth_headers, deps["contract"]["id"], deps["product"]["id"])
+    create_subscription_using_api(client, auth_headers, deps["contract"]["id"], deps["product"]["id"],
+                                  payload=subscription_payload(deps["contract"]["id"], deps["product"]["id"], pricing_type="Variable", strategy="Pick"))
+
+    res = client.get(f"/subscriptions?contract_id={deps['contract']['id']}&strategy=Fixed", headers=auth_headers)
+    assert res.status_code == 200
+    assert [s["id"] for s in res.get_json()["data"]["subscriptions"]] == [fixed["id"]]
+
+
+def test_filter_created_range(client, auth_headers):
+    create_product_using_api(client, auth_headers)
+
+    res = client.get("/products?created_after=2000-01-01T00:00:00", headers=auth_headers)
+    assert len(res.get_json()["data"]["products"]) == 1
+
+    res = client.get("/products?created_before=2000-01-01T00:00:00", headers=auth_headers)
+    assert res.get_json()["data"]["products"] == []
+
+
+def test_filter_invalid_value(client, auth_headers):
+    res = client.get("/subscriptions?strategy=Cheapest", headers=auth_headers)
+    assert res.status_code == 400
+    assert res.get_json()["message"] == "Invalid filter parameters"
+
+    res = client.get("/subscription-tiers?subscription_id=not-a-uuid", headers=auth_headers)
+    assert res.status_code == 400
+
+
+def test_sort_descending_with_pagination(client, auth_headers):
+    for name in ["Alpha", "Bravo", "Charlie"]:
+        create_product_using_api(client, auth_headers, product_payload(api_name=name))
+
+    first = client.get("/products?sort=-api_name&limit=2", headers=auth_headers).get_json()
+    assert [p["api_name"] for p in first["data"]["products"]] == ["Charlie", "Bravo"]
+
+    cursor = first["meta"]["next_cursor"]
+    second = client.get(f"/products?sort=-api_name&limit=2&cursor={cursor}", headers=auth_headers).get_json()
+    assert [p["api_name"] for p in second["data"]["products"]] == ["Alpha"]
+
+
+def test_sort_not_allowed(client, auth_headers):
+    res = client.get("/products?sort=description", headers=auth_headers)
+    assert res.status_code == 400
+
+
+def test_cursor_from_other_sort_rejected(client, auth_headers):
+    for name in ["Alpha", "Bravo"]:
+        create_product_using_api(client, auth_headers, product_payload(api_name=name))
+    cursor = client.get("/products?limit=1", headers=auth_headers).get_json()["meta"]["next_cursor"]
+
+    res = client.get(f"/products?sort=api_name&cursor={cursor}", headers=auth_headers)
+    assert res.status_code == 400
+
+
+def test_filters_compose_with_sparse_fields(client, auth_headers):
+    contract_obj = create_contract_using_api(client, auth_headers)
+
+    res = client.get(f"/contracts?client_id={contract_obj['client_id']}&fields=id", headers=auth_headers)
+    assert res.get_json()["data"]["contracts"] == [{"id": contract_obj["id"]}]
@@ -0,0 +1,143 @@
+import json
+import time
+from datetime import date
+from decimal import Decimal
+import pytest
+from app import create_app, db
+from models import Invoice, InvoiceRun
+from tests.factories import *
+from utils.invoicing import start_run, bill_chunk, run_invoices
+
+
+@pytest.fixture
+def app(monkeypatch, tmp_path):
+    # a database file, so pool worker processes see the rows written by the test
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'invoices.db'}")
+    monkeypatch.setenv("JWT_SECRET_KEY", "test-secret")
+    monkeypatch.setenv("INVOICE_WORKERS", "0")
+    app = create_app()
+    app.config["TESTING"] = True
+    yield app
+
+
+def seed_contracts(client, auth_headers, count=3):
+    '''
+    count contracts of one client, each with a Pick subscription (10.00 + 0.05/call) used 100 * (i + 1) times in February 2026,
+    plus an archived contract that is not billed
+    '''
+    owner = create_client_using_api(client, auth_headers)
+    product = create_product_using_api(client, auth_headers)
+    contracts, events = [], []
+    for i in range(count + 1):
+        contract = create_contract_using_api(client, auth_headers, owner["id"])
+        sub = create_subscription_using_api(client, auth_headers, contract["id"], product["id"], payload=subscription_payload(contract["id"], product["id"], pricing_type="Variable", strategy="Pick"))
+        create_subscription_tier_using_api(client, auth_headers, sub["id"], payload=subscription_tier_payload(
+            sub["id"], min_calls=0, max_calls=1000, base_price=10, price_per_tier=0.05, start_date="2026-01-01T00:00:00", end_date="2027-01-01T00:00:00",
+        ))
+        events.append({"subscription_id": sub["id"], "timestamp": "2026-02-10T00:00:00", "calls": 100 * (i + 1)})
+        contracts.append(contract)
+    client.delete(f"/contracts/{contracts[-1]['id']}", headers=auth_headers)
+
+    body = b"\n".join(json.dumps(event).encode() for event in events)
+    res = client.put(f"/usage-batches/{uuid.uuid4()}", headers={**auth_headers, "Content-Type": "application/x-ndjson"}, data=body)
+    assert res.status_code == 201
+    return contracts[:-1]
+
+
+def billed(client, auth_headers, run_id):
+    invoices = client.get(f"/invoice-runs/{run_id}/invoices?limit=500", headers=auth_headers).get_json()["data"]["invoices"]
+    return {invoice["contract_id"]: (invoice["calls"], invoice["amount"], len(invoice["lines"])) for invoice in invoices}
+
+
+def test_invoice_run_endpoint(client, auth_headers):
+    contracts = seed_contracts(client, auth_headers)
+
+    res = client.post("/invoice-runs", headers=auth_headers, json={"period_start": "2026-02-01", "period_end": "2026-03-01", "chunk_size": 2})
+    assert res.status_code == 201
+    run = res.get_json()["data"]["invoice_run"]
+    assert (run["chunks"], run["completed_chunks"], run["invoices"]) == (2, 2, 3)
+    assert run["completed_at"] is not None
+
+    assert billed(client, auth_headers, run["id"]) == {
+        contracts[0]["id"]: (100, "15.00", 1),
+        contracts[1]["id"]: (200, "20.00", 1),
+        contracts[2]["id"]: (300, "25.00", 1),
+    }
+    assert client.get(f"/invoice-runs/{run['id']}", headers=auth_headers).get_json()["data"]["invoice_run"] == run
+
+    res = client.post("/invoice-runs", headers=auth_headers, json={"period_start": "2026-03-01", "period_end": "2026-02-01"})
+    assert res.status_code == 400
+    assert client.get(f"/invoice-runs/{uuid.uuid4()}", headers=auth_headers).status_code == 404
+
+
+def test_resume_bills_only_pending_chunks(app, client, auth_headers):
+    seed_contracts(client, auth_headers)
+
+    with app.app_context():
+        run = start_run(date(2026, 2, 1), date(2026, 3, 1), chunk_size=1)
+        db.session.commit()
+        run_id = run.id
+        # the run stops after its first chunk
+        assert bill_chunk(run_id, 0) == 1
+        assert bill_chunk(run_id, 0) == 0
+        db.session.remove()
+
+    res = client.post(f"/invoice-runs/{run_id}:resume", headers=auth_headers)
+    assert res.get_json()["data"]["invoice_run"]["invoices"] == 3
+
+    with app.app_context():
+        assert run_invoices(run_id, 0) == 0
+        assert db.session.query(Invoice).filter(Invoice.run_id == run_id).count() == 3
+        db.session.remove()
+
+
+def test_resumed_run_bills_the_contracts_it_started_with(app, client, auth_headers):
+    contracts = seed_contracts(client, auth_headers)
+
+    with app.app_context():
+        run = start_run(date(2026, 2, 1), date(2026, 3, 1), chunk_size=2)
+        db.session.commit()
+        run_id = run.id
+        db.session.remove()
+
+    # before resuming: a contract is added and one the run started with is archived
+    added = create_contract_using_api(client, auth_headers, contracts[0]["client_id"])
+    client.delete(f"/contracts/{contracts[2]['id']}", headers=auth_headers)
+
+    res = client.post(f"/invoice-runs/{run_id}:resume", headers=auth_headers)
+    assert res.get_json()["data"]["invoice_run"]["invoices"] == 3
+    assert set(billed(client, auth_headers, run_id)) == {contract["id"] for contract in contracts}
+    assert added["id"] not in billed(client, auth_headers, run_id)
+
+
+def test_invoice_run_endpoint_with_worker_processes(app, client, auth_headers):
+    contracts = seed_contracts(client, auth_headers)
+    app.config["INVOICE_WORKERS"] = 2
+
+    res = client.post("/invoice-runs", headers=auth_headers, json={"period_start": "2026-02-01", "period_end": "2026-03-01", "chunk_size": 1})
+    assert res.status_code == 201
+    run = res.get_json()["data"]["invoice_run"]
+
+    # billed in the background by spawned pool workers
+    deadline = time.monotonic() + 60
+    while run["completed_at"] is None and time.monotonic() < deadline:
+        time.sleep(0.2)
+        run = client.get(f"/invoice-runs/{run['id']}", headers=auth_headers).get_json()["data"]["invoice_run"]
+    assert (run["chunks"], run["completed_chunks"], run["invoices"]) == (3, 3, 3)
+    assert billed(client, auth_headers, run["id"]) == {
+        contract["id"]: (100 * (i + 1), f"{10 + 5 * (i + 1)}.00", 1) for i, contract in enumerate(contracts)
+    }
+
+
+def test_generate_command_with_worker_processes(app, client, auth_headers):
+    contracts = seed_contracts(client, auth_headers, count=4)
+
+    result = app.test_cli_runner().invoke(args=["invoices", "generate", "--start", "2026-02-01", "--end", "2026-03-01", "--chunk-size", "1", "--workers", "2"])
+    assert result.exit_code == 0, result.output
+    assert result.output.splitlines()[-1] == "4 invoices written"
+
+    with app.app_context():
+        run_id = db.session.query(InvoiceRun.id).scalar()
+        amounts = dict(db.session.query(Invoice.contract_id, Invoice.amount).filter(Invoice.run_id == run_id))
+        assert amounts == {uuid.UUID(contract["id"]): Decimal(10 + 5 * (i + 1)) for i, contract in enumerate(contracts)}
+        db.session.remove()
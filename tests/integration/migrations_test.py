@@ -0,0 +1,57 @@
+import os
+from flask_migrate import upgrade, downgrade
+from sqlalchemy import create_engine, inspect
+from app import create_app, db
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "migrations")
+
+
+
+def migrated_app(monkeypatch, tmp_path):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'migrations.db'}")
+    monkeypatch.setenv("JWT_SECRET_KEY", "test-secret")
+    return create_app()
+
+
+def test_migrations_create_model_indexes(monkeypatch, tmp_path):
+    app = migrated_app(monkeypatch, tmp_path)
+    with app.app_context():
+        upgrade(directory=MIGRATIONS_DIR)
+        inspector = inspect(db.engine)
+        # the indexes create_all builds on SQLite, leaving out the Postgres-only ones
+        created = create_engine("sqlite://")
+        db.metadata.create_all(created)
+        for table in db.metadata.sorted_tables:
+            expected = {index["name"] for index in inspect(created).get_indexes(table.name)}
+            migrated = {index["name"] for index in inspector.get_indexes(table.name)}
+            assert expected <= migrated, table.name
+
+
+def test_migrations_partial_indexes(monkeypatch, tmp_path):
+    app = migrated_app(monkeypatch, tmp_path)
+    with app.app_context():
+        upgrade(directory=MIGRATIONS_DIR)
+        with db.engine.connect() as conn:
+            sql = conn.exec_driver_sql("SELECT sql FROM sqlite_master WHERE name = 'ix_subscription_contract_id_live'").scalar()
+        assert "WHERE is_archived = 0" in sql
+
+
+def test_migrations_downgrade_to_initial_schema(monkeypatch, tmp_path):
+    app = migrated_app(monkeypatch, tmp_path)
+    with app.app_context():
+        upgrade(directory=MIGRATIONS_DIR)
+        downgrade(directory=MIGRATIONS_DIR, revision="0001")
+        assert inspect(db.engine).get_indexes("contract") == []
+
+
+def test_migrations_tier_overlap_triggers(monkeypatch, tmp_path):
+    app = migrated_app(monkeypatch, tmp_path)
+    with app.app_context():
+        upgrade(directory=MIGRATIONS_DIR)
+        with db.engine.connect() as conn:
+            triggers = set(conn.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'trigger'").scalars())
+        assert triggers == {"subscription_tier_no_overlap_insert", "subscription_tier_no_overlap_update"}
+
+        downgrade(directory=MIGRATIONS_DIR, revision="0003")
+        with db.engine.connect() as conn:
+            assert conn.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'trigger'").scalars().all() == []
@@ -0,0 +1,62 @@
+from tests.factories import *
+from utils.pagination import MAX_LIMIT
+
+
+
+def test_products_first_page_has_next_cursor(client, auth_headers):
+    for i in range(3):
+        create_product_using_api(client, auth_headers, product_payload(api_name=f"API {i}"))
+
+    res = client.get("/products?limit=2", headers=auth_headers)
+    assert res.status_code == 200
+    body = res.get_json()
+    assert len(body["data"]["products"]) == 2
+    assert body["meta"]["limit"] == 2
+    assert body["meta"]["next_cursor"] is not None
+
+
+def test_products_walk_all_pages(client, auth_headers):
+    created_ids = set()
+    for i in range(5):
+        created_ids.add(create_product_using_api(client, auth_headers, product_payload(api_name=f"API {i}"))["id"])
+
+    seen = []
+    cursor = None
+    while True:
+        url = "/products?limit=2" + (f"&cursor={cursor}" if cursor else "")
+        body = client.get(url, headers=auth_headers).get_json()
+        seen.extend(p["id"] for p in body["data"]["products"])
+        cursor = body["meta"]["next_cursor"]
+        if cursor is None:
+            break
+
+    assert len(seen) == len(created_ids)
+    assert set(seen) == created_ids
+
+
+def test_last_page_has_no_next_cursor(client, auth_headers):
+    create_client_using_api(client, auth_headers)
+
+    res = client.get("/clients", headers=auth_headers)
+    assert res.status_code == 200
+    assert res.get_json()["meta"]["next_cursor"] is None
+
+
+def test_limit_is_capped(client, auth_headers):
+    res = client.get(f"/contracts?limit={MAX_LIMIT + 100}", headers=auth_headers)
+    assert res.status_code == 200
+    assert res.get_json()["meta"]["limit"] == MAX_LIMIT
+
+
+def test_invalid_limit(client, auth_headers):
+    res = client.get("/subscriptions?limit=abc", headers=auth_headers)
+    assert res.status_code == 400
+
+    res = client.get("/subscriptions?limit=0", headers=auth_headers)
+    assert res.status_code == 400
+
+
+def test_invalid_cursor(client, auth_headers):
+    res = client.get("/subscription-tiers?cursor=not-a-cursor", headers=auth_headers)
+    assert res.status_code == 400
+    assert res.get_json()["message"] == "Invalid pagination parameters"
@@ -0,0 +1,29 @@
+from datetime import datetime
+from decimal import Decimal
+from app import db
+from tests.factories import *
+from utils.pricing import load_ladders
+
+
+def test_load_ladders_prices_live_tiers(app, client, auth_headers):
+    deps = create_subscription_dependencies(client, auth_headers)
+    sub = create_subscription_using_api(client, auth_headers, deps["contract"]["id"], deps["product"]["id"], payload=subscription_payload(deps["contract"]["id"], deps["product"]["id"], strategy="Fill"))
+    tiers = [
+        subscription_tier_payload(sub["id"], min_calls=0, max_calls=1000, base_price=10, price_per_tier=0.05),
+        subscription_tier_payload(sub["id"], min_calls=1000, max_calls=5000, base_price=20, price_per_tier=0.03),
+        # only in effect during 2030
+        subscription_tier_payload(sub["id"], min_calls=5000, max_calls=9000, base_price=50, price_per_tier=0.01, start_date="2030-01-01T00:00:00", end_date="2031-01-01T00:00:00"),
+    ]
+    for payload in tiers:
+        create_subscription_tier_using_api(client, auth_headers, sub["id"], payload=payload)
+    archived = create_subscription_tier_using_api(client, auth_headers, sub["id"], payload=subscription_tier_payload(sub["id"], min_calls=9000, max_calls=10000, base_price=1000))
+    client.delete(f"/subscription-tiers/{archived['id']}", headers=auth_headers)
+
+    id = uuid.UUID(sub["id"])
+    with app.app_context():
+        # 10 + 50 for the first tier, 20 + 4000 * 0.03 for the second, 50 + 1000 * 0.01 for the third
+        assert load_ladders([id]).price([id], [6000]) == [Decimal("260.00")]
+        # before 2030 the second tier is the last one: 60 + 20 + 5000 * 0.03
+        assert load_ladders([id], at=datetime(2026, 6, 1)).price([id], [6000]) == [Decimal("230.00")]
+        assert load_ladders([]).ladders == {}
+        db.session.remove()
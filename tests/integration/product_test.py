@@ -1,4 +1,4 @@
-from tests.factories import product_payload
+from tests.factories import product_payload, client_payload, create_subscription_dependencies, create_subscription_using_api, create_contract_using_api, create_client_using_api
 from uuid import uuid4
 
 
@@ -143,3 +143,36 @@ def test_cannot_update_archived_product(client, auth_headers):
     res = client.patch(f"/products/{pid}", headers=auth_headers, json={"api_name": "newname"})
     assert res.status_code == 400
     assert "Cannot update an archived product" == res.get_json()["message"]
+
+
+def test_get_product_contracts(client, auth_headers):
+    deps = create_subscription_dependencies(client, auth_headers)
+    product_id = deps["product"]["id"]
+    # two subscriptions on the same contract are returned once
+    create_subscription_using_api(client, auth_headers, deps["contract"]["id"], product_id)
+    create_subscription_using_api(client, auth_headers, deps["contract"]["id"], product_id)
+
+    archived_contract = create_contract_using_api(client, auth_headers, deps["client"]["id"])
+    create_subscription_using_api(client, auth_headers, archived_contract["id"], product_id)
+    client.delete(f"/contracts/{archived_contract['id']}", headers=auth_headers)
+
+    other_client = create_client_using_api(client, auth_headers, client_payload(company_name="Other Client"))
+    second_contract = create_contract_using_api(client, auth_headers, other_client["id"])
+    create_subscription_using_api(client, auth_headers, second_contract["id"], product_id)
+
+    res = client.get(f"/products/{product_id}/contracts?limit=1", headers=auth_headers)
+    assert res.status_code == 200
+    first_page = res.get_json()
+    assert len(first_page["data"]["contracts"]) == 1
+
+    res = client.get(f"/products/{product_id}/contracts?limit=1&cursor={first_page['meta']['next_cursor']}", headers=auth_headers)
+    second_page = res.get_json()
+    assert second_page["meta"]["next_cursor"] is None
+
+    ids = [c["id"] for c in first_page["data"]["contracts"] + second_page["data"]["contracts"]]
+    assert ids == [deps["contract"]["id"], second_contract["id"]]
+
+
+def test_get_product_contracts_not_found(client, auth_headers):
+    res = client.get(f"/products/{uuid4()}/contracts", headers=auth_headers)
+    assert res.status_code == 404
@@ -0,0 +1,75 @@
+from tests.factories import *
+
+
+def count_get(client, auth_headers, query_counter, url):
+    query_counter.clear()
+    res = client.get(url, headers=auth_headers)
+    assert res.status_code == 200
+    return len(query_counter)
+
+
+
+def test_contracts_query_count_is_constant(client, auth_headers, query_counter):
+    create_contract_tree(client, auth_headers)
+    small = count_get(client, auth_headers, query_counter, "/contracts")
+
+    for _ in range(3):
+        create_contract_tree(client, auth_headers, subscriptions=3, tiers=3)
+    large = count_get(client, auth_headers, query_counter, "/contracts")
+
+    assert small == large
+    # cache validators, contracts, subscriptions (joined with product), tiers
+    assert large == 4
+
+
+def test_contract_by_id_query_count(client, auth_headers, query_counter):
+    deps = create_contract_tree(client, auth_headers, subscriptions=3, tiers=3)
+    assert count_get(client, auth_headers, query_counter, f"/contracts/{deps['contract']['id']}") == 4
+
+
+def test_subscriptions_query_count_is_constant(client, auth_headers, query_counter):
+    create_contract_tree(client, auth_headers, subscriptions=1)
+    small = count_get(client, auth_headers, query_counter, "/subscriptions")
+
+    create_contract_tree(client, auth_headers, subscriptions=5, tiers=3)
+    large = count_get(client, auth_headers, query_counter, "/subscriptions")
+
+    assert small == large == 3
+
+
+def test_client_contracts_query_count_is_constant(client, auth_headers, query_counter):
+    deps = create_contract_tree(client, auth_headers)
+    small = count_get(client, auth_headers, query_counter, f"/clients/{deps['client']['id']}/contracts")
+
+    for _ in range(3):
+        sub = create_subscription_using_api(client, auth_headers, deps["contract"]["id"], deps["product"]["id"])
+        create_subscription_tier_using_api(client, auth_headers, sub["id"])
+    large = count_get(client, auth_headers, query_counter, f"/clients/{deps['client']['id']}/contracts")
+
+    assert small == large
+
+
+def test_product_contracts_query_count_is_constant(client, auth_headers, query_counter):
+    deps = create_contract_tree(client, auth_headers, subscriptions=1)
+    small = count_get(client, auth_headers, query_counter, f"/products/{deps['product']['id']}/contracts")
+
+    for _ in range(3):
+        contract_obj = create_contract_using_api(client, auth_headers, deps["client"]["id"])
+        sub = create_subscription_using_api(client, auth_headers, contract_obj["id"], deps["product"]["id"])
+        create_subscription_tier_using_api(client, auth_headers, sub["id"])
+    large = count_get(client, auth_headers, query_counter, f"/products/{deps['product']['id']}/contracts")
+
+    assert small == large
+
+
+def test_contract_products_query_count_is_constant(client, auth_headers, query_counter):
+    deps = create_contract_tree(client, auth_headers, subscriptions=1)
+    small = count_get(client, auth_headers, query_counter, f"/contracts/{deps['contract']['id']}/product")
+
+    for i in range(3):
+        product_obj = create_product_using_api(client, auth_headers, product_payload(api_name=f"Extra API {i}"))
+        create_subscription_using_api(client, auth_headers, deps["contract"]["id"], product_obj["id"])
+    large = count_get(client, auth_headers, query_counter, f"/contracts/{deps['contract']['id']}/product")
+
+    # contract lookup, products
+    assert small == large == 2
@@ -0,0 +1,70 @@
+from app import db
+from models import Client
+from tests.factories import *
+
+
+
+def test_subscription_validation_uses_cached_product(client, auth_headers, query_counter):
+    deps = create_subscription_dependencies(client, auth_headers)
+    create_subscription_using_api(client, auth_headers, deps["contract"]["id"], deps["product"]["id"])
+
+    query_counter.clear()
+    create_subscription_using_api(client, auth_headers, deps["contract"]["id"], deps["product"]["id"])
+    assert not any("FROM product" in statement for statement in query_counter)
+
+
+def test_contract_validation_uses_cached_client(client, auth_headers, query_counter):
+    client_obj = create_client_using_api(client, auth_headers)
+    client.get(f"/clients/{client_obj['id']}", headers=auth_headers)
+
+    query_counter.clear()
+    create_contract_using_api(client, auth_headers, client_obj["id"])
+    assert not any("FROM client" in statement for statement in query_counter)
+
+
+def test_product_update_invalidates_cache(client, auth_headers):
+    product_obj = create_product_using_api(client, auth_headers)
+    client.get(f"/products/{product_obj['id']}", headers=auth_headers)
+
+    client.patch(f"/products/{product_obj['id']}", headers=auth_headers, json={"description": "Changed"})
+
+    res = client.get(f"/products/{product_obj['id']}", headers=auth_headers)
+    assert res.get_json()["data"]["product"]["description"] == "Changed"
+
+
+def test_nested_product_matches_product_endpoint(client, auth_headers):
+    deps = create_subscription_dependencies(client, auth_headers)
+    create_subscription_using_api(client, auth_headers, deps["contract"]["id"], deps["product"]["id"])
+    client.patch(f"/products/{deps['product']['id']}", headers=auth_headers, json={"description": "Changed"})
+
+    product = client.get(f"/products/{deps['product']['id']}", headers=auth_headers).get_json()["data"]["product"]
+    subscription = client.get("/subscriptions", headers=auth_headers).get_json()["data"]["subscriptions"][0]
+    assert subscription["product"] == product
+
+
+def test_cache_metrics(client, auth_headers):
+    product_obj = create_product_using_api(client, auth_headers)
+    client.get(f"/products/{product_obj['id']}", headers=auth_headers)
+    client.get(f"/products/{product_obj['id']}", headers=auth_headers)
+
+    res = client.get("/metrics/cache", headers=auth_headers)
+    assert res.status_code == 200
+    stats = res.get_json()["data"]["cache"]
+    assert stats["hits"] >= 1
+    assert stats["misses"] >= 1
+    assert stats["size"] >= 1
+
+
+def test_stale_cached_dump_is_not_served_under_a_new_etag(app, client, auth_headers):
+    client_obj = create_client_using_api(client, auth_headers)
+    client.get(f"/clients/{client_obj['id']}", headers=auth_headers)
+
+    # written by another worker: the row changes, this process's cache is not told
+    with app.app_context():
+        row = db.session.get(Client, uuid.UUID(client_obj["id"]))
+        row.address = "Changed by another worker"
+        db.session.commit()
+
+    res = client.get(f"/clients/{client_obj['id']}", headers=auth_headers)
+    assert res.get_json()["data"]["client"]["address"] == "Changed by another worker"
+    assert client.get(f"/clients/{client_obj['id']}", headers={**auth_headers, "If-None-Match": res.headers["ETag"]}).status_code == 304
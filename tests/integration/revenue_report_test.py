@@ -0,0 +1,84 @@
+from app import cache
+from tests.factories import *
+
+YEAR_2026 = {"start_date": "2026-01-01T00:00:00", "end_date": "2027-01-01T00:00:00"}
+
+
+def tier(client, auth_headers, sub, dates=YEAR_2026, **overrides):
+    return create_subscription_tier_using_api(client, auth_headers, sub["id"], payload=subscription_tier_payload(sub["id"], **dates, **overrides))
+
+
+def seed(client, auth_headers):
+    alpha = create_client_using_api(client, auth_headers, client_payload(company_name="Alpha"))
+    beta = create_client_using_api(client, auth_headers, client_payload(company_name="Beta"))
+    maps = create_product_using_api(client, auth_headers, product_payload(api_name="Maps"))
+    search = create_product_using_api(client, auth_headers, product_payload(api_name="Search"))
+
+    contract = create_contract_using_api(client, auth_headers, alpha["id"])
+    variable = create_subscription_using_api(client, auth_headers, contract["id"], maps["id"], payload=subscription_payload(contract["id"], maps["id"], pricing_type="Variable", strategy="Pick"))
+    # 10 + 1000 * 0.05 and 20 + 1000 * 0.01
+    tier(client, auth_headers, variable, min_calls=0, max_calls=1000, base_price=10, price_per_tier=0.05)
+    tier(client, auth_headers, variable, min_calls=1000, max_calls=2000, base_price=20, price_per_tier=0.01)
+
+    contract = create_contract_using_api(client, auth_headers, beta["id"])
+    fixed = create_subscription_using_api(client, auth_headers, contract["id"], search["id"])
+    tier(client, auth_headers, fixed, min_calls=0, max_calls=100, base_price=100, price_per_tier=0)
+    archived = tier(client, auth_headers, fixed, {"start_date": "2027-01-01T00:00:00", "end_date": "2028-01-01T00:00:00"}, min_calls=0, max_calls=100, base_price=1000, price_per_tier=0)
+    client.delete(f"/subscription-tiers/{archived['id']}", headers=auth_headers)
+    tier(client, auth_headers, fixed, {"start_date": "2030-01-01T00:00:00", "end_date": "2031-01-01T00:00:00"}, min_calls=0, max_calls=100, base_price=500, price_per_tier=0)
+    return alpha, beta
+
+
+def report(client, auth_headers, **params):
+    res = client.get("/reports/revenue", headers=auth_headers, query_string=params)
+    assert res.status_code == 200, res.get_data(as_text=True)
+    return [(row["name"], row["tiers"], row["base_revenue"], row["usage_revenue"], row["contract_value"]) for row in res.get_json()["data"]["revenue"]]
+
+
+def test_revenue_by_group(client, auth_headers):
+    alpha, _ = seed(client, auth_headers)
+    window = {"start": "2026-01-01", "end": "2027-01-01"}
+
+    assert report(client, auth_headers, group_by="client", **window) == [("Beta", 1, "100.00", "0.00", "100.00"), ("Alpha", 2, "30.00", "60.00", "90.00")]
+    assert report(client, auth_headers, group_by="product", **window) == [("Search", 1, "100.00", "0.00", "100.00"), ("Maps", 2, "30.00", "60.00", "90.00")]
+    assert report(client, auth_headers, group_by="pricing_type", **window) == [("Fixed", 1, "100.00", "0.00", "100.00"), ("Variable", 2, "30.00", "60.00", "90.00")]
+
+    # without a window every live tier counts, archived ones only on request
+    assert report(client, auth_headers)[0] == ("Beta", 2, "600.00", "0.00", "600.00")
+    assert report(client, auth_headers, include_archived="true")[0] == ("Beta", 3, "1600.00", "0.00", "1600.00")
+
+    client.delete(f"/clients/{alpha['id']}", headers=auth_headers)
+    assert [row[0] for row in report(client, auth_headers, **window)] == ["Beta"]
+
+
+def test_revenue_report_is_cached_until_data_changes(client, auth_headers, query_counter):
+    seed(client, auth_headers)
+    first = report(client, auth_headers, group_by="product")
+
+    query_counter.clear()
+    assert report(client, auth_headers, group_by="product") == first
+    # only the data version is read
+    assert len([statement for statement in query_counter if "GROUP BY" in statement]) == 0
+
+    sub = client.get("/subscriptions", headers=auth_headers).get_json()["data"]["subscriptions"][0]
+    tier(client, auth_headers, sub, {"start_date": "2040-01-01T00:00:00", "end_date": "2041-01-01T00:00:00"}, min_calls=0, max_calls=10, base_price=1, price_per_tier=0)
+    query_counter.clear()
+    assert report(client, auth_headers, group_by="product") != first
+    assert len([statement for statement in query_counter if "GROUP BY" in statement]) == 1
+
+
+def test_revenue_reports_have_their_own_cache(client, auth_headers):
+    seed(client, auth_headers)
+    entries = cache.backend.stats()["size"]
+
+    for group_by in ("client", "product", "pricing_type"):
+        report(client, auth_headers, group_by=group_by)
+    assert cache.backend.stats()["size"] == entries
+    assert cache.reports.stats()["size"] == 3
+    assert cache.reports.stats()["max_entries"] < cache.backend.stats()["max_entries"]
+
+
+def test_revenue_report_rejects_bad_parameters(client, auth_headers):
+    assert client.get("/reports/revenue?group_by=region", headers=auth_headers).status_code == 400
+    assert client.get("/reports/revenue?start=2026-13-01", headers=auth_headers).status_code == 400
+    assert client.get("/reports/revenue?start=2026-02-01&end=2026-01-01", headers=auth_headers).status_code == 400
@@ -0,0 +1,58 @@
+import time
+import pytest
+from app import create_app, cache
+from utils.cache import LRUCache
+from utils.redis_cache import RedisBroadcaster
+from tests.factories import *
+
+
+@pytest.fixture
+def app(monkeypatch, resp_server, request):
+    monkeypatch.setenv("DATABASE_URL", "sqlite:///:memory:")
+    monkeypatch.setenv("JWT_SECRET_KEY", "test-secret")
+    monkeypatch.setenv("CACHE_REDIS_URL", resp_server.url)
+    monkeypatch.setenv("CACHE_BACKEND", getattr(request, "param", "memory"))
+    app = create_app()
+    app.config["TESTING"] = True
+    yield app
+    if cache.broadcaster is not None:
+        cache.broadcaster.close()
+        cache.broadcaster = None
+
+
+@pytest.mark.parametrize("app", ["redis"], indirect=True)
+def test_redis_backend_is_read_through_and_invalidated(client, auth_headers, resp_server):
+    product_obj = create_product_using_api(client, auth_headers)
+    key = f"acms:product:{product_obj['id']}".encode()
+
+    client.get(f"/products/{product_obj['id']}", headers=auth_headers)
+    assert resp_server.lookup(key) is not None
+
+    client.patch(f"/products/{product_obj['id']}", headers=auth_headers, json={"description": "Changed"})
+    assert resp_server.lookup(key) is None
+
+    res = client.get(f"/products/{product_obj['id']}", headers=auth_headers)
+    assert res.get_json()["data"]["product"]["description"] == "Changed"
+    assert client.get("/metrics/cache", headers=auth_headers).get_json()["data"]["cache"]["backend"] == "redis"
+
+
+def test_client_write_invalidates_other_workers(client, auth_headers, resp_server):
+    client_obj = create_client_using_api(client, auth_headers)
+    key = f"client:{client_obj['id']}"
+
+    # a second worker process holding its own copy of the client
+    other_worker = LRUCache()
+    other_worker.set(key, client_obj)
+    broadcaster = RedisBroadcaster(resp_server.url, other_worker.delete)
+    try:
+        assert broadcaster.wait_until_subscribed(timeout=2)
+        assert cache.broadcaster.wait_until_subscribed(timeout=2)
+
+        client.patch(f"/clients/{client_obj['id']}", headers=auth_headers, json={"company_name": "Renamed Co"})
+
+        deadline = time.monotonic() + 2
+        while other_worker.get(key) is not None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert other_worker.get(key) is None
+    finally:
+        broadcaster.close()
@@ -0,0 +1,58 @@
+from tests.factories import *
+
+
+
+def test_contracts_sparse_fields(client, auth_headers):
+    deps = create_subscription_dependencies(client, auth_headers)
+    create_subscription_using_api(client, auth_headers, deps["contract"]["id"], deps["product"]["id"])
+
+    res = client.get("/contracts?fields=id,contract_name", headers=auth_headers)
+    assert res.status_code == 200
+    contracts = res.get_json()["data"]["contracts"]
+    assert contracts == [{"id": deps["contract"]["id"], "contract_name": deps["contract"]["contract_name"]}]
+
+
+def test_contracts_sparse_fields_skip_relationship_loads(client, auth_headers, query_counter):
+    deps = create_subscription_dependencies(client, auth_headers)
+    create_subscription_using_api(client, auth_headers, deps["contract"]["id"], deps["product"]["id"])
+
+    query_counter.clear()
+    res = client.get("/contracts?fields=id,contract_name", headers=auth_headers)
+    assert res.status_code == 200
+    # cache validators, contracts
+    assert len(query_counter) == 2
+    assert "is_archived" not in query_counter[1]
+    assert "client_id" not in query_counter[1]
+
+
+def test_contracts_sparse_fields_with_relationship(client, auth_headers):
+    deps = create_subscription_dependencies(client, auth_headers)
+    create_subscription_using_api(client, auth_headers, deps["contract"]["id"], deps["product"]["id"])
+
+    res = client.get("/contracts?fields=id,subscriptions", headers=auth_headers)
+    assert res.status_code == 200
+    contract = res.get_json()["data"]["contracts"][0]
+    assert set(contract) == {"id", "subscriptions"}
+    assert contract["subscriptions"][0]["product"]["id"] == deps["product"]["id"]
+
+
+def test_contract_by_id_sparse_fields(client, auth_headers):
+    contract_obj = create_contract_using_api(client, auth_headers)
+
+    res = client.get(f"/contracts/{contract_obj['id']}?fields=contract_name", headers=auth_headers)
+    assert res.status_code == 200
+    assert res.get_json()["data"]["contract"] == {"contract_name": contract_obj["contract_name"]}
+
+
+def test_products_sparse_fields(client, auth_headers):
+    product_obj = create_product_using_api(client, auth_headers)
+
+    res = client.get("/products?fields=id,api_name", headers=auth_headers)
+    assert res.status_code == 200
+    assert res.get_json()["data"]["products"] == [{"id": product_obj["id"], "api_name": product_obj["api_name"]}]
+
+
+def test_sparse_fields_unknown_field(client, auth_headers):
+    res = client.get("/products?fields=id,not_a_field", headers=auth_headers)
+    assert res.status_code == 400
+    assert res.get_json()["message"] == "Invalid fields parameter"
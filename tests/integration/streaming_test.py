@@ -0,0 +1,48 @@
+import json
+from tests.factories import *
+
+
+
+def create_tiers(client, auth_headers, count):
+    deps = create_subscription_dependencies(client, auth_headers)
+    sub = create_subscription_using_api(client, auth_headers, deps["contract"]["id"], deps["product"]["id"])
+    return [create_subscription_tier_using_api(client, auth_headers, sub["id"])["id"] for _ in range(count)]
+
+
+
+def test_stream_subscription_tiers_query_param(client, auth_headers):
+    tier_ids = create_tiers(client, auth_headers, 3)
+
+    res = client.get("/subscription-tiers?stream=1", headers=auth_headers)
+    assert res.status_code == 200
+    assert res.mimetype == "application/x-ndjson"
+    rows = [json.loads(line) for line in res.get_data(as_text=True).splitlines()]
+    assert [row["id"] for row in rows] == tier_ids
+
+
+def test_stream_accept_header(client, auth_headers):
+    create_tiers(client, auth_headers, 2)
+
+    res = client.get("/contracts", headers={**auth_headers, "Accept": "application/x-ndjson"})
+    assert res.status_code == 200
+    assert res.mimetype == "application/x-ndjson"
+    rows = [json.loads(line) for line in res.get_data(as_text=True).splitlines()]
+    assert len(rows) == 1
+    assert len(rows[0]["subscriptions"]) == 1
+    assert len(rows[0]["subscriptions"][0]["tiers"]) == 2
+
+
+def test_stream_matches_json_rows(client, auth_headers):
+    create_tiers(client, auth_headers, 2)
+
+    envelope = client.get("/subscriptions", headers=auth_headers).get_json()
+    res = client.get("/subscriptions?stream=1", headers=auth_headers)
+    rows = [json.loads(line) for line in res.get_data(as_text=True).splitlines()]
+    assert rows == envelope["data"]["subscriptions"]
+
+
+def test_default_accept_returns_envelope(client, auth_headers):
+    res = client.get("/products", headers={**auth_headers, "Accept": "*/*"})
+    assert res.status_code == 200
+    assert res.mimetype == "application/json"
+    assert res.get_json()["success"] is True
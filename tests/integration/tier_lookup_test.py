@@ -0,0 +1,65 @@
+from app import cache
+from schemas.tier_index import tier_index_key
+import schemas.tier_index as tier_index
+from tests.factories import *
+
+
+def create_ladder(client, auth_headers):
+    deps = create_subscription_dependencies(client, auth_headers)
+    sub = create_subscription_using_api(client, auth_headers, deps["contract"]["id"], deps["product"]["id"])
+    tiers = [
+        create_subscription_tier_using_api(client, auth_headers, sub["id"], payload=subscription_tier_payload(sub["id"], min_calls=lo, max_calls=hi, start_date="2026-01-01T00:00:00", end_date="2027-01-01T00:00:00"))
+        for lo, hi in ((0, 1000), (1000, 5000))
+    ]
+    return sub, tiers
+
+
+def lookup(client, auth_headers, sub, **params):
+    return client.get(f"/subscriptions/{sub['id']}/tiers/lookup", headers=auth_headers, query_string=params)
+
+
+def test_lookup_uses_the_cached_index(client, auth_headers, query_counter):
+    sub, tiers = create_ladder(client, auth_headers)
+
+    res = lookup(client, auth_headers, sub, calls=1500, at="2026-03-01T00:00:00Z")
+    assert res.status_code == 200
+    assert res.get_json()["data"]["subscription_tier"] == tiers[1]
+
+    query_counter.clear()
+    assert lookup(client, auth_headers, sub, calls=10, at="2026-03-01T00:00:00").get_json()["data"]["subscription_tier"]["id"] == tiers[0]["id"]
+    # answered from memory
+    assert query_counter == []
+
+    assert lookup(client, auth_headers, sub, calls=5000, at="2026-03-01T00:00:00").status_code == 404
+    assert lookup(client, auth_headers, sub, calls=10, at="2028-01-01T00:00:00").status_code == 404
+    assert lookup(client, auth_headers, sub, calls=-1).status_code == 400
+    assert lookup(client, auth_headers, sub).status_code == 400
+
+
+def test_tier_writes_invalidate_the_index(client, auth_headers):
+    sub, tiers = create_ladder(client, auth_headers)
+    assert lookup(client, auth_headers, sub, calls=7000, at="2026-03-01T00:00:00").status_code == 404
+    assert cache.local.get(tier_index_key(sub["id"])) is not None
+
+    created_tier = create_subscription_tier_using_api(client, auth_headers, sub["id"], payload=subscription_tier_payload(sub["id"], min_calls=5000, max_calls=10000, start_date="2026-01-01T00:00:00", end_date="2027-01-01T00:00:00"))
+    assert lookup(client, auth_headers, sub, calls=7000, at="2026-03-01T00:00:00").get_json()["data"]["subscription_tier"]["id"] == created_tier["id"]
+
+    client.patch(f"/subscription-tiers/{created_tier['id']}", headers=auth_headers, json={"max_calls": 6000})
+    assert lookup(client, auth_headers, sub, calls=7000, at="2026-03-01T00:00:00").status_code == 404
+
+    client.delete(f"/subscription-tiers/{tiers[0]['id']}", headers=auth_headers)
+    assert lookup(client, auth_headers, sub, calls=10, at="2026-03-01T00:00:00").status_code == 404
+
+    client.post("/subscription-tiers:archive", headers=auth_headers, json=[tiers[1]["id"]])
+    assert lookup(client, auth_headers, sub, calls=1500, at="2026-03-01T00:00:00").status_code == 404
+
+
+def test_large_ladders_are_looked_up_in_the_database(client, auth_headers, monkeypatch, query_counter):
+    monkeypatch.setattr(tier_index, "MAX_INDEXED_TIERS", 1)
+    sub, tiers = create_ladder(client, auth_headers)
+
+    for _ in range(2):
+        query_counter.clear()
+        res = lookup(client, auth_headers, sub, calls=1500, at="2026-03-01T00:00:00")
+        assert res.get_json()["data"]["subscription_tier"] == tiers[1]
+        assert any("min_calls <=" in statement for statement in query_counter)
@@ -0,0 +1,87 @@
+from tests.factories import *
+
+YEAR_2026 = {"start_date": "2026-01-01T00:00:00", "end_date": "2027-01-01T00:00:00"}
+YEAR_2027 = {"start_date": "2027-01-01T00:00:00", "end_date": "2028-01-01T00:00:00"}
+
+
+def post_tier(client, auth_headers, sub, **overrides):
+    return client.post("/subscription-tiers", headers=auth_headers, json=subscription_tier_payload(sub["id"], **overrides))
+
+
+def test_overlapping_tier_is_rejected(client, auth_headers):
+    sub = create_subscription(client, auth_headers)
+    assert post_tier(client, auth_headers, sub, min_calls=0, max_calls=1000, **YEAR_2026).status_code == 201
+
+    res = post_tier(client, auth_headers, sub, min_calls=500, max_calls=2000, **YEAR_2026)
+    assert res.status_code == 400
+    assert "overlaps" in res.get_json()["errors"]["error"]
+
+    # adjacent call ranges, the same calls in another year and another subscription are fine
+    assert post_tier(client, auth_headers, sub, min_calls=1000, max_calls=2000, **YEAR_2026).status_code == 201
+    assert post_tier(client, auth_headers, sub, min_calls=500, max_calls=2000, **YEAR_2027).status_code == 201
+    other = create_subscription_using_api(client, auth_headers, sub["contract_id"], sub["product_id"])
+    assert post_tier(client, auth_headers, other, min_calls=0, max_calls=1000, **YEAR_2026).status_code == 201
+
+
+def test_archived_tiers_do_not_count(client, auth_headers):
+    sub = create_subscription(client, auth_headers)
+    tier = post_tier(client, auth_headers, sub, min_calls=0, max_calls=1000, **YEAR_2026).get_json()["data"]["subscription_tier"]
+    client.delete(f"/subscription-tiers/{tier['id']}", headers=auth_headers)
+
+    assert post_tier(client, auth_headers, sub, min_calls=0, max_calls=1000, **YEAR_2026).status_code == 201
+
+
+def test_update_into_an_overlap_is_rejected(client, auth_headers):
+    sub = create_subscription(client, auth_headers)
+    post_tier(client, auth_headers, sub, min_calls=0, max_calls=1000, **YEAR_2026)
+    tier = post_tier(client, auth_headers, sub, min_calls=1000, max_calls=2000, **YEAR_2026).get_json()["data"]["subscription_tier"]
+
+    res = client.patch(f"/subscription-tiers/{tier['id']}", headers=auth_headers, json={"min_calls": 900})
+    assert res.status_code == 400
+    assert "overlaps" in res.get_json()["errors"]["error"]
+    # the tier itself is not a sibling
+    assert client.patch(f"/subscription-tiers/{tier['id']}", headers=auth_headers, json={"max_calls": 3000}).status_code == 200
+
+
+def test_batch_overlapping_itself_is_rejected(client, auth_headers):
+    sub = create_subscription(client, auth_headers)
+    items = [
+        subscription_tier_payload(sub["id"], min_calls=0, max_calls=1000, **YEAR_2026),
+        subscription_tier_payload(sub["id"], min_calls=999, max_calls=2000, **YEAR_2026),
+    ]
+
+    res = client.post("/subscription-tiers:batch", headers=auth_headers, json=items)
+    assert res.status_code == 400
+    assert "overlaps" in res.get_json()["errors"]["error"]
+    assert client.get(f"/subscription-tiers?subscription_id={sub['id']}", headers=auth_headers).get_json()["data"]["subscription_tiers"] == []
+
+
+def test_partial_update_cannot_invert_a_tier(client, auth_headers):
+    sub = create_subscription(client, auth_headers)
+    tier = post_tier(client, auth_headers, sub, min_calls=0, max_calls=100, **YEAR_2026).get_json()["data"]["subscription_tier"]
+
+    res = client.patch(f"/subscription-tiers/{tier['id']}", headers=auth_headers, json={"min_calls": 500})
+    assert res.status_code == 400
+    assert "min_calls" in res.get_json()["errors"]
+    res = client.patch(f"/subscription-tiers/{tier['id']}", headers=auth_headers, json={"end_date": "2025-01-01T00:00:00"})
+    assert res.status_code == 400
+    assert "start_date" in res.get_json()["errors"]["error"]
+
+    stored = client.get(f"/subscription-tiers/{tier['id']}", headers=auth_headers).get_json()["data"]["subscription_tier"]
+    assert (stored["min_calls"], stored["max_calls"]) == (0, 100)
+    assert client.patch(f"/subscription-tiers/{tier['id']}", headers=auth_headers, json={"max_calls": 500}).status_code == 200
+
+
+def test_empty_tier_is_rejected(client, auth_headers):
+    sub = create_subscription(client, auth_headers)
+    tier = post_tier(client, auth_headers, sub, min_calls=0, max_calls=10, **YEAR_2026).get_json()["data"]["subscription_tier"]
+
+    # [5, 5) covers no calls and would sit inside [0, 10), hiding it from lookups and pricing
+    res = post_tier(client, auth_headers, sub, min_calls=5, max_calls=5, **YEAR_2026)
+    assert res.status_code == 400
+    assert res.get_json()["errors"]["min_calls"] == "min_calls must be < max_calls"
+    assert client.patch(f"/subscription-tiers/{tier['id']}", headers=auth_headers, json={"max_calls": 0}).status_code == 400
+
+    res = client.get(f"/subscriptions/{sub['id']}/tiers/lookup", headers=auth_headers, query_string={"calls": 7, "at": "2026-03-01T00:00:00"})
+    assert res.status_code == 200
+    assert res.get_json()["data"]["subscription_tier"]["id"] == tier["id"]
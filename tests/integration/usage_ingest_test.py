@@ -0,0 +1,110 @@
+import json
+from app import db
+from models import UsageEvent
+import utils.usage as usage
+from tests.factories import *
+
+
+def ndjson(events):
+    return b"\n".join(json.dumps(event).encode() for event in events)
+
+
+def put_batch(client, auth_headers, body, batch_id=None, content_type="application/x-ndjson"):
+    batch_id = batch_id or str(uuid.uuid4())
+    return client.put(f"/usage-batches/{batch_id}", headers={**auth_headers, "Content-Type": content_type}, data=body)
+
+
+def stored_events(app):
+    with app.app_context():
+        events = db.session.query(UsageEvent.subscription_id, UsageEvent.occurred_at, UsageEvent.calls).order_by(UsageEvent.id).all()
+        db.session.remove()
+    return [(str(id), at.isoformat(), calls) for id, at, calls in events]
+
+
+def test_ingest_ndjson_is_idempotent_by_batch_id(app, client, auth_headers):
+    sub = create_subscription(client, auth_headers)
+    batch_id = str(uuid.uuid4())
+    body = ndjson([
+        {"subscription_id": sub["id"], "timestamp": "2026-03-01T10:00:00", "calls": 40},
+        {"subscription_id": sub["id"], "timestamp": "2026-03-01T12:00:00+02:00"},
+    ])
+
+    res = put_batch(client, auth_headers, body + b"\n\n", batch_id)
+    assert res.status_code == 201
+    ack = res.get_json()["data"]["usage_batch"]
+    assert (ack["id"], ack["events"], ack["calls"]) == (batch_id, 2, 41)
+
+    # a replay, even with another body, is acknowledged without storing anything
+    res = put_batch(client, auth_headers, body + b"\n" + body, batch_id)
+    assert res.status_code == 200
+    assert res.get_json()["data"]["usage_batch"] == ack
+    assert client.get(f"/usage-batches/{batch_id}", headers=auth_headers).get_json()["data"]["usage_batch"] == ack
+    assert stored_events(app) == [(sub["id"], "2026-03-01T10:00:00", 40), (sub["id"], "2026-03-01T10:00:00", 1)]
+
+
+def test_ingest_csv(app, client, auth_headers):
+    sub = create_subscription(client, auth_headers)
+    body = f"timestamp,subscription_id,calls\n2026-03-01T00:00:00Z,{sub['id']},7\n2026-03-02T00:00:00,{sub['id']},\n"
+
+    res = put_batch(client, auth_headers, body, content_type="text/csv")
+    assert res.status_code == 201
+    assert stored_events(app) == [(sub["id"], "2026-03-01T00:00:00", 7), (sub["id"], "2026-03-02T00:00:00", 1)]
+
+    res = put_batch(client, auth_headers, "subscription_id,calls\n", content_type="text/csv")
+    assert res.status_code == 400
+    assert res.get_json()["errors"] == "CSV header is missing timestamp"
+
+
+def test_invalid_events_reject_the_batch(app, client, auth_headers):
+    sub = create_subscription(client, auth_headers)
+    batch_id = str(uuid.uuid4())
+    body = b"\n".join([
+        json.dumps({"subscription_id": sub["id"], "timestamp": "2026-03-01T00:00:00", "calls": 1}).encode(),
+        b"{not json",
+        json.dumps({"subscription_id": str(uuid.uuid4()), "timestamp": "2026-03-01T00:00:00"}).encode(),
+        json.dumps({"subscription_id": "nope", "timestamp": "yesterday", "calls": -1}).encode(),
+    ])
+
+    res = put_batch(client, auth_headers, body, batch_id)
+    assert res.status_code == 400
+    assert res.get_json()["errors"] == {
+        "2": {"_schema": ["Event must be a JSON object"]},
+        "3": {"subscription_id": ["Subscription does not exist"]},
+        "4": {"subscription_id": ["Not a valid UUID."], "timestamp": ["Not a valid datetime."], "calls": ["Must be greater than or equal to 0."]},
+    }
+    assert stored_events(app) == []
+    assert client.get(f"/usage-batches/{batch_id}", headers=auth_headers).status_code == 404
+
+    # the batch id is still free once the events are fixed
+    assert put_batch(client, auth_headers, body.split(b"\n")[0], batch_id).status_code == 201
+
+
+def test_ndjson_without_orjson(app, client, auth_headers, monkeypatch):
+    monkeypatch.setattr(usage, "_loads", json.loads)
+    sub = create_subscription(client, auth_headers)
+    event = {"subscription_id": sub["id"], "timestamp": "2026-03-01T00:00:00", "calls": 3}
+
+    res = put_batch(client, auth_headers, b"\n".join([json.dumps(event).encode(), b"{not json", b"\xff"]))
+    assert res.status_code == 400
+    assert set(res.get_json()["errors"]) == {"2", "3"}
+
+    assert put_batch(client, auth_headers, ndjson([event])).status_code == 201
+    assert stored_events(app) == [(sub["id"], "2026-03-01T00:00:00", 3)]
+
+
+def test_ingest_rejects_other_formats(client, auth_headers):
+    assert put_batch(client, auth_headers, b"[]", content_type="application/json").status_code == 400
+    assert put_batch(client, auth_headers, b"", batch_id="not-a-uuid").status_code == 400
+
+
+def test_ingest_is_set_based(client, auth_headers, query_counter):
+    deps = create_subscription_dependencies(client, auth_headers)
+    subs = [create_subscription_using_api(client, auth_headers, deps["contract"]["id"], deps["product"]["id"]) for _ in range(3)]
+    body = ndjson({"subscription_id": subs[i % 3]["id"], "timestamp": f"2026-03-01T00:00:{i % 60:02}", "calls": i} for i in range(3000))
+
+    query_counter.clear()
+    res = put_batch(client, auth_headers, body)
+    assert res.get_json()["data"]["usage_batch"]["events"] == 3000
+    # one subscription check and one executemany INSERT for the events, whatever the batch size
+    assert len([s for s in query_counter if s.startswith("SELECT subscription.id")]) == 1
+    assert len([s for s in query_counter if s.startswith("INSERT INTO usage_event")]) == 1
@@ -0,0 +1,91 @@
+import json
+from datetime import date
+from app import db
+from models import UsageDaily, UsageMonthly
+from tests.factories import *
+from utils.usage import usage_totals
+
+
+def put_events(client, auth_headers, events):
+    body = b"\n".join(json.dumps(event).encode() for event in events)
+    res = client.put(f"/usage-batches/{uuid.uuid4()}", headers={**auth_headers, "Content-Type": "application/x-ndjson"}, data=body)
+    assert res.status_code == 201, res.get_data(as_text=True)
+
+
+def usage(client, auth_headers, sub, **params):
+    res = client.get(f"/subscriptions/{sub['id']}/usage", headers=auth_headers, query_string=params)
+    return res.get_json()["data"]
+
+
+def seed_usage(client, auth_headers):
+    deps = create_subscription_dependencies(client, auth_headers)
+    subs = [create_subscription_using_api(client, auth_headers, deps["contract"]["id"], deps["product"]["id"]) for _ in range(2)]
+    first, second = subs
+    put_events(client, auth_headers, [
+        {"subscription_id": first["id"], "timestamp": "2026-01-31T23:00:00", "calls": 5},
+        {"subscription_id": first["id"], "timestamp": "2026-02-01T01:00:00", "calls": 10},
+        {"subscription_id": second["id"], "timestamp": "2026-02-15T12:00:00", "calls": 100},
+    ])
+    # a later batch adds to the rows the first one created
+    put_events(client, auth_headers, [
+        {"subscription_id": first["id"], "timestamp": "2026-02-01T22:00:00", "calls": 20},
+        {"subscription_id": first["id"], "timestamp": "2026-03-02T00:00:00", "calls": 1},
+    ])
+    return subs
+
+
+def test_ingestion_maintains_rollups(client, auth_headers):
+    first, second = seed_usage(client, auth_headers)
+
+    assert usage(client, auth_headers, first, start="2026-01-01", end="2026-04-01") == {"usage": [
+        {"period": "2026-01-31", "events": 1, "calls": 5},
+        {"period": "2026-02-01", "events": 2, "calls": 30},
+        {"period": "2026-03-02", "events": 1, "calls": 1},
+    ], "calls": 36}
+    assert usage(client, auth_headers, first, start="2026-02-01", end="2026-04-01", granularity="month") == {"usage": [
+        {"period": "2026-02-01", "events": 2, "calls": 30},
+        {"period": "2026-03-01", "events": 1, "calls": 1},
+    ], "calls": 31}
+    assert usage(client, auth_headers, second, start="2026-01-01", end="2026-12-01", granularity="month")["calls"] == 100
+
+    res = client.get(f"/subscriptions/{first['id']}/usage?start=2026-01-01&end=2026-02-01&granularity=week", headers=auth_headers)
+    assert res.status_code == 400
+
+
+def test_usage_totals_read_months_and_edge_days(app, client, auth_headers, query_counter):
+    first, second = seed_usage(client, auth_headers)
+    ids = [uuid.UUID(first["id"]), uuid.UUID(second["id"])]
+
+    with app.app_context():
+        query_counter.clear()
+        # 2026-01-31 from usage_daily, February from usage_monthly, 2026-03-01 from usage_daily
+        assert usage_totals(ids, date(2026, 1, 31), date(2026, 3, 2)) == {ids[0]: 35, ids[1]: 100}
+        assert len(query_counter) == 2
+        assert usage_totals(ids, date(2026, 2, 1), date(2026, 2, 2)) == {ids[0]: 30, ids[1]: 0}
+        assert usage_totals([], date(2026, 1, 1), date(2027, 1, 1)) == {}
+        db.session.remove()
+
+
+def test_rebuild_rollups_command(app, client, auth_headers):
+    first, second = seed_usage(client, auth_headers)
+    with app.app_context():
+        db.session.query(UsageDaily).delete()
+        db.session.query(UsageMonthly).update({"calls": 0, "events": 0})
+        db.session.commit()
+
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=["usage", "rebuild-rollups", "--start", "2026-02-01", "--end", "2026-03-01"])
+    assert result.exit_code == 0, result.output
+    assert result.output.strip() == "usage_daily: 2 rows, usage_monthly: 2 rows"
+
+    # the days outside the window are still missing, the months inside it are whole again
+    assert usage(client, auth_headers, first, start="2026-01-01", end="2026-04-01")["usage"] == [{"period": "2026-02-01", "events": 2, "calls": 30}]
+    assert usage(client, auth_headers, second, start="2026-02-01", end="2026-03-01", granularity="month")["calls"] == 100
+
+    result = runner.invoke(args=["usage", "rebuild-rollups", "--start", "2026-01-01", "--end", "2026-04-01", "--subscription", first["id"]])
+    assert result.exit_code == 0, result.output
+    assert usage(client, auth_headers, first, start="2026-01-01", end="2026-04-01", granularity="month")["usage"] == [
+        {"period": "2026-01-01", "events": 1, "calls": 5},
+        {"period": "2026-02-01", "events": 2, "calls": 30},
+        {"period": "2026-03-01", "events": 1, "calls": 1},
+    ]
@@ -0,0 +1,125 @@
+# tests/resp_server.py
+# Local stand-in for a Redis server: speaks enough RESP for utils.redis_cache
+import fnmatch
+import socketserver
+import threading
+import time
+
+
+class RespStandIn(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), RespHandler)
+        self.data = {}
+        self.subscribers = {}
+        # error reply sent instead of running a command, by command name
+        self.failures = {}
+        self.lock = threading.Lock()
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.server_address
+        return f"redis://{host}:{port}/0"
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def subscriber_count(self, channel):
+        with self.lock:
+            return len(self.subscribers.get(channel, ()))
+
+    def lookup(self, key):
+        value, expires_at = self.data.get(key, (None, None))
+        if expires_at is not None and expires_at <= time.monotonic():
+            self.data.pop(key, None)
+            return None
+        return value
+
+
+def encode(value):
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, int):
+        return b":%d\r\n" % value
+    if isinstance(value, list):
+        return b"*%d\r\n" % len(value) + b"".join(encode(item) for item in value)
+    if isinstance(value, str):
+        value = value.encode()
+    return b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+class RespHandler(socketserver.StreamRequestHandler):
+
+    def read_command(self):
+        header = self.rfile.readline()
+        if not header:
+            return None
+        args = []
+        for _ in range(int(header[1:-2])):
+            length = int(self.rfile.readline()[1:-2])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def reply(self, data):
+        with self.write_lock:
+            self.wfile.write(data)
+
+    def handle(self):
+        server = self.server
+        self.write_lock = threading.Lock()
+        channels = []
+        try:
+            while True:
+                args = self.read_command()
+                if args is None:
+                    break
+                command, args = args[0].upper().decode(), args[1:]
+
+                with server.lock:
+                    if command in server.failures:
+                        self.reply(b"-%s\r\n" % server.failures[command].encode())
+                    elif command in ("PING", "SELECT", "AUTH"):
+                        self.reply(b"+OK\r\n")
+                    elif command == "GET":
+                        self.reply(encode(server.lookup(args[0])))
+                    elif command == "SET":
+                        expires_at = None
+                        options = [a.upper() for a in args[2:]]
+                        if b"PX" in options:
+                            expires_at = time.monotonic() + int(args[2 + options.index(b"PX") + 1]) / 1000
+                        elif b"EX" in options:
+                            expires_at = time.monotonic() + int(args[2 + options.index(b"EX") + 1])
+                        server.data[args[0]] = (args[1], expires_at)
+                        self.reply(b"+OK\r\n")
+                    elif command == "DEL":
+                        self.reply(encode(sum(server.data.pop(key, None) is not None for key in args)))
+                    elif command == "SCAN":
+                        pattern = args[args.index(b"MATCH") + 1].decode() if b"MATCH" in args else "*"
+                        keys = [key for key in server.data if fnmatch.fnmatch(key.decode(), pattern)]
+                        self.reply(encode(["0", keys]))
+                    elif command == "PUBLISH":
+                        receivers = list(server.subscribers.get(args[0], ()))
+                        for receiver in receivers:
+                            receiver.reply(encode([b"message", args[0], args[1]]))
+                        self.reply(encode(len(receivers)))
+                    elif command == "SUBSCRIBE":
+                        for channel in args:
+                            server.subscribers.setdefault(channel, []).append(self)
+                            channels.append(channel)
+                            self.reply(encode([b"subscribe", channel, len(channels)]))
+                    else:
+                        self.reply(b"-ERR unknown command '%s'\r\n" % command.encode())
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            with server.lock:
+                for channel in channels:
+                    server.subscribers[channel].remove(self)
@@ -0,0 +1,20 @@
+import uuid
+import pytest
+from datetime import datetime
+from utils.pagination import encode_cursor, decode_cursor, PaginationError
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2025, 1, 2, 3, 4, 5, 678901)
+    id = uuid.uuid4()
+    assert decode_cursor(encode_cursor(created_at, id)) == ("created_at", created_at.isoformat(), id)
+
+
+def test_cursor_keeps_sort_order():
+    id = uuid.uuid4()
+    assert decode_cursor(encode_cursor("a|b", id, ("api_name", True))) == ("-api_name", "a|b", id)
+
+
+def test_decode_invalid_cursor():
+    with pytest.raises(PaginationError):
+        decode_cursor("garbage")
@@ -0,0 +1,71 @@
+import json
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+import pytest
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+import utils.json_provider as json_provider
+from utils.json_provider import FastJSONProvider
+
+
+@pytest.fixture
+def flask_app():
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    return app
+
+
+def sample_rows(count):
+    start = datetime(2025, 1, 1, 12, 30, 15, 123456)
+    return [
+        {
+            "id": uuid.uuid4(),
+            "subscription_id": uuid.uuid4(),
+            "min_calls": i * 1000,
+            "max_calls": (i + 1) * 1000,
+            "base_price": Decimal("5000.00"),
+            "price_per_tier": Decimal("10.25"),
+            "is_archived": False,
+            "created_at": start + timedelta(seconds=i),
+            "start_date": None,
+        }
+        for i in range(count)
+    ]
+
+
+def test_native_types(flask_app):
+    id = uuid.UUID("12345678-1234-5678-1234-567812345678")
+    data = {"b": Decimal("10.50"), "a": id, "c": datetime(2025, 1, 2, 3, 4, 5, 6), 1: "int key"}
+
+    assert flask_app.json.dumps(data) == '{"1":"int key","a":"12345678-1234-5678-1234-567812345678","b":"10.50","c":"2025-01-02T03:04:05.000006"}'
+
+
+def test_response_writes_bytes_with_newline(flask_app):
+    with flask_app.app_context():
+        res = flask_app.json.response({"id": uuid.UUID(int=1)})
+    assert res.mimetype == "application/json"
+    assert res.get_data() == b'{"id":"00000000-0000-0000-0000-000000000001"}\n'
+
+
+def test_matches_default_provider(flask_app):
+    rows = [{**row, "created_at": row["created_at"].isoformat()} for row in sample_rows(50)]
+    body = {"success": True, "message": "OK", "data": {"rows": rows}, "errors": None, "meta": {"limit": 50, "next_cursor": None}}
+
+    with flask_app.app_context():
+        fast = flask_app.json.response(body).get_data()
+        default = DefaultJSONProvider(flask_app).response(body).get_data()
+    assert fast == default
+
+
+def test_stdlib_fallback_matches_orjson(flask_app, monkeypatch):
+    rows = sample_rows(20)
+    expected = flask_app.json.dumps(rows)
+    monkeypatch.setattr(json_provider, "orjson", None)
+    assert flask_app.json.dumps(rows) == expected
+    assert flask_app.json.loads(expected)[0]["base_price"] == "5000.00"
+
+
+def test_keyword_arguments_use_stdlib(flask_app):
+    assert json.loads(flask_app.json.dumps({"id": uuid.UUID(int=1)}, indent=2)) == {"id": "00000000-0000-0000-0000-000000000001"}
+
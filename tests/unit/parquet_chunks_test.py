@@ -0,0 +1,61 @@
+from types import SimpleNamespace
+import utils.export as export
+from utils.export import EXPORT_COLUMNS, parquet_chunks
+
+
+class StubWriter:
+    '''
+    Stands in for pyarrow.parquet.ParquetWriter: keeps the tables and writes a marker per row group
+    '''
+    tables = []
+
+    def __init__(self, sink, schema):
+        self.sink = sink
+        self.schema = schema
+
+    def __enter__(self):
+        self.sink.write(b"PAR1")
+        return self
+
+    def __exit__(self, *exc):
+        self.sink.write(b"PAR1")
+
+    def write_table(self, table):
+        self.tables.append(table)
+        self.sink.write(b"<row group>")
+
+
+def stub_pyarrow(monkeypatch):
+    monkeypatch.setattr(StubWriter, "tables", [])
+    monkeypatch.setattr(export, "pyarrow", SimpleNamespace(
+        string=lambda: "string", bool_=lambda: "bool", int32=lambda: "int32",
+        decimal128=lambda precision, scale: f"decimal({precision},{scale})", timestamp=lambda unit: f"timestamp[{unit}]",
+        schema=lambda fields: [SimpleNamespace(name=name, type=type) for name, type in fields],
+        array=lambda values, type: (type, list(values)),
+        Table=SimpleNamespace(from_arrays=lambda arrays, schema: {field.name: array for field, array in zip(schema, arrays)}),
+        parquet=SimpleNamespace(ParquetWriter=StubWriter),
+    ))
+
+
+def row(i):
+    return tuple(i if name == "min_calls" else f"{name}-{i}" for name in EXPORT_COLUMNS)
+
+
+def test_a_row_group_is_yielded_per_batch(monkeypatch):
+    stub_pyarrow(monkeypatch)
+    chunks = list(parquet_chunks(iter([[row(0), row(1)], [row(2)]])))
+
+    # the header goes out with the first row group, the footer on its own
+    assert chunks == [b"PAR1<row group>", b"<row group>", b"PAR1"]
+    first, second = StubWriter.tables
+    assert list(first) == list(EXPORT_COLUMNS)
+    assert first["min_calls"] == ("int32", [0, 1])
+    assert first["base_price"] == ("decimal(10,2)", ["base_price-0", "base_price-1"])
+    assert first["tier_is_archived"] == ("bool", ["tier_is_archived-0", "tier_is_archived-1"])
+    assert second["contract_id"] == ("string", ["contract_id-2"])
+
+
+def test_an_empty_export_is_header_and_footer(monkeypatch):
+    stub_pyarrow(monkeypatch)
+    assert b"".join(parquet_chunks(iter([]))) == b"PAR1PAR1"
+    assert StubWriter.tables == []
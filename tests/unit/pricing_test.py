@@ -0,0 +1,84 @@
+import random
+import uuid
+from decimal import Decimal
+from types import SimpleNamespace
+import pytest
+import utils.pricing as pricing
+from utils.pricing import TierLadder, LadderTable, PricingError, STRATEGIES
+
+
+def tier(min_calls, max_calls, base_price, price_per_tier):
+    return SimpleNamespace(min_calls=min_calls, max_calls=max_calls, base_price=base_price, price_per_tier=price_per_tier)
+
+
+# 0-1000 calls: 10.00 + 0.05/call, 1000-5000: 20.00 + 0.03/call, 5000+: 50.00 + 0.01/call
+LADDER = [tier(1000, 5000, Decimal("20.00"), Decimal("0.03")), tier(0, 1000, Decimal("10.00"), Decimal("0.05")), tier(5000, 10000, Decimal("50.00"), Decimal("0.01"))]
+
+
+@pytest.mark.parametrize("strategy, calls, expected", [
+    ("Pick", 0, "10.00"),
+    ("Pick", 999, "59.95"),
+    ("Pick", 1000, "50.00"),
+    ("Pick", 20000, "250.00"),
+    ("Flat", 4999, "20.00"),
+    ("Flat", 5000, "50.00"),
+    ("Fixed", 123456, "10.00"),
+    ("Fill", 500, "35.00"),
+    # 10 + 1000 * 0.05, then 20 + 500 * 0.03
+    ("Fill", 1500, "95.00"),
+    # both lower tiers full (60 + 140), then 50 + 15000 * 0.01 past the end of the last tier
+    ("Fill", 20000, "400.00"),
+])
+def test_strategies(strategy, calls, expected):
+    assert TierLadder(strategy, LADDER).price(calls) == Decimal(expected)
+
+
+def test_edge_cases():
+    assert TierLadder("Pick", []).price(100) == Decimal("0.00")
+    assert TierLadder("Fill", [tier(100, 200, None, Decimal("1.00"))]).price(50) == Decimal("0.00")
+    with pytest.raises(PricingError):
+        TierLadder("Cheapest", LADDER)
+    with pytest.raises(PricingError):
+        TierLadder("Pick", LADDER).price(-1)
+
+
+def random_table(rng, subscriptions=200):
+    ladders = {}
+    for i in range(subscriptions):
+        bounds = sorted(rng.sample(range(1, 100_000), rng.randint(0, 5)))
+        edges = [0] + bounds + [bounds[-1] * 2 if bounds else 1000]
+        tiers = [
+            tier(edges[j], edges[j + 1], Decimal(rng.randint(0, 100_000)) / 100, Decimal(rng.randint(0, 500)) / 100)
+            for j in range(len(edges) - 1)
+        ] if i % 50 else []
+        ladders[uuid.UUID(int=rng.getrandbits(128))] = TierLadder(STRATEGIES[i % 4], tiers)
+    return LadderTable(ladders)
+
+
+def random_usage(rng, table, records):
+    ids = list(table.ladders)
+    return [rng.choice(ids) for _ in range(records)], [rng.randint(0, 300_000) for _ in range(records)]
+
+
+def test_table_without_numpy_matches_ladders(monkeypatch):
+    monkeypatch.setattr(pricing, "np", None)
+    rng = random.Random(0)
+    table = random_table(rng)
+    ids, calls = random_usage(rng, table, 2_000)
+
+    assert table.price(ids, calls) == [table.ladders[id].price(c) for id, c in zip(ids, calls)]
+    with pytest.raises(PricingError):
+        table.price([uuid.uuid4()], [1])
+
+
+def test_vectorized_matches_ladders():
+    pytest.importorskip("numpy")
+    rng = random.Random(0)
+    table = random_table(rng)
+    ids, calls = random_usage(rng, table, 20_000)
+
+    assert table.price(ids, calls) == [table.ladders[id].price(c) for id, c in zip(ids, calls)]
+    assert list(table.price_cents([], [])) == []
+    with pytest.raises(PricingError):
+        table.price_cents(ids[:1], [-1])
+
@@ -0,0 +1,129 @@
+import time
+from utils.cache import LRUCache
+from utils.redis_cache import RedisBroadcaster, RedisCache, RespConnection
+from tests.resp_server import RespStandIn
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_get_set_delete(resp_server):
+    cache = RedisCache(RespConnection.from_url(resp_server.url), ttl=60)
+    assert cache.get("product:1") is None
+    cache.set("product:1", {"id": "1", "api_name": "Maps"})
+    assert cache.get("product:1") == {"id": "1", "api_name": "Maps"}
+    assert resp_server.lookup(b"acms:product:1") is not None
+
+    cache.delete("product:1")
+    assert cache.get("product:1") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+def test_entries_are_shared_between_connections(resp_server):
+    worker_a = RedisCache(RespConnection.from_url(resp_server.url), ttl=60)
+    worker_b = RedisCache(RespConnection.from_url(resp_server.url), ttl=60)
+    worker_a.set("client:1", {"company_name": "Acme"})
+    assert worker_b.get("client:1") == {"company_name": "Acme"}
+
+    worker_b.delete("client:1")
+    assert worker_a.get("client:1") is None
+
+
+def test_entries_expire_after_ttl(resp_server):
+    cache = RedisCache(RespConnection.from_url(resp_server.url), ttl=0.05)
+    cache.set("product:1", {"id": "1"})
+    time.sleep(0.1)
+    assert cache.get("product:1") is None
+
+
+def test_clear_only_removes_prefixed_keys(resp_server):
+    other = RespConnection.from_url(resp_server.url)
+    other.execute("SET", "unrelated", "1")
+    cache = RedisCache(RespConnection.from_url(resp_server.url), ttl=60)
+    cache.set("product:1", {"id": "1"})
+    cache.clear()
+
+    assert cache.get("product:1") is None
+    assert other.execute("GET", "unrelated") == b"1"
+
+
+def test_unreachable_server_is_a_miss():
+    server = RespStandIn()
+    url = server.url
+    server.server_close()
+
+    cache = RedisCache(RespConnection.from_url(url, timeout=0.2), ttl=60)
+    cache.set("product:1", {"id": "1"})
+    assert cache.get("product:1") is None
+    assert cache.stats()["errors"] == 2
+
+
+def test_error_reply_is_a_miss(resp_server):
+    cache = RedisCache(RespConnection.from_url(resp_server.url), ttl=60)
+    resp_server.failures = {
+        "SET": "OOM command not allowed when used memory > 'maxmemory'.",
+        "GET": "LOADING Redis is loading the dataset in memory",
+        "DEL": "ERR unavailable",
+    }
+    cache.set("product:1", {"id": "1"})
+    assert cache.get("product:1") is None
+    cache.delete("product:1")
+    assert cache.stats()["errors"] == 3
+
+    # the connection is still in step once the server recovers
+    resp_server.failures = {}
+    cache.set("product:1", {"id": "1"})
+    assert cache.get("product:1") == {"id": "1"}
+
+
+def test_invalidation_reaches_every_worker(resp_server):
+    workers = [LRUCache() for _ in range(3)]
+    broadcasters = [RedisBroadcaster(resp_server.url, worker.delete) for worker in workers]
+    try:
+        for broadcaster in broadcasters:
+            assert broadcaster.wait_until_subscribed(timeout=2)
+        for worker in workers:
+            worker.set("product:1", {"id": "1"})
+            worker.set("product:2", {"id": "2"})
+
+        broadcasters[0].publish("product:1")
+
+        assert wait_for(lambda: all(w.stats()["size"] == 1 for w in workers))
+        assert all(w.get("product:2") == {"id": "2"} for w in workers)
+    finally:
+        for broadcaster in broadcasters:
+            broadcaster.close()
+
+
+def test_idle_subscriber_keeps_receiving(resp_server, caplog):
+    worker = LRUCache()
+    broadcaster = RedisBroadcaster(resp_server.url, worker.delete)
+    publisher = RedisBroadcaster(resp_server.url, lambda key: None)
+    try:
+        assert broadcaster.wait_until_subscribed(timeout=2)
+        for key in ("product:1", "product:2"):
+            worker.set(key, {"id": key})
+            # idle for longer than the connection timeouts
+            time.sleep(0.7)
+            publisher.publish(key)
+            assert wait_for(lambda: worker.get(key) is None)
+        assert resp_server.subscriber_count(b"cache:invalidate") == 2
+        assert "disconnected" not in caplog.text
+    finally:
+        broadcaster.close()
+        publisher.close()
+
+
+def test_close_stops_the_subscriber(resp_server):
+    broadcaster = RedisBroadcaster(resp_server.url, lambda key: None)
+    assert broadcaster.wait_until_subscribed(timeout=2)
+    broadcaster.close()
+    broadcaster._thread.join(timeout=2)
+    assert not broadcaster._thread.is_alive()
@@ -0,0 +1,49 @@
+import random
+from datetime import datetime, timedelta
+from schemas.tier_index import TierIndex
+
+JAN = datetime(2026, 1, 1)
+JUL = datetime(2026, 7, 1)
+NEXT_JAN = datetime(2027, 1, 1)
+
+TIERS = [
+    (0, 1000, JAN, NEXT_JAN, "small"),
+    (1000, 5000, JAN, JUL, "medium H1"),
+    (1000, 5000, JUL, NEXT_JAN, "medium H2"),
+    (5000, 10000, JUL, NEXT_JAN, "large H2"),
+]
+
+
+def test_lookup_by_calls_and_date():
+    index = TierIndex(TIERS)
+
+    assert index.lookup(0, JAN) == "small"
+    assert index.lookup(999, JUL) == "small"
+    assert index.lookup(1000, JAN + timedelta(days=10)) == "medium H1"
+    assert index.lookup(1000, JUL) == "medium H2"
+    assert index.lookup(7000, JUL) == "large H2"
+
+
+def test_uncovered_lookups():
+    index = TierIndex(TIERS)
+
+    # no large tier in the first half, nothing past the last tier, nothing outside the dates
+    assert index.lookup(7000, JAN) is None
+    assert index.lookup(10000, JUL) is None
+    assert index.lookup(10, JAN - timedelta(seconds=1)) is None
+    assert index.lookup(10, NEXT_JAN) is None
+    assert TierIndex([]).lookup(10, JAN) is None
+
+
+def test_matches_a_scan():
+    days = [JAN + timedelta(days=30 * i) for i in range(13)]
+    tiers = []
+    for i in range(12):
+        edges = sorted(random.sample(range(1, 10_000), 4))
+        tiers += [(lo, hi, days[i], days[i + 1], (i, lo)) for lo, hi in zip(edges, edges[1:])]
+    index = TierIndex(tiers)
+
+    for _ in range(2_000):
+        calls, at = random.randint(0, 10_000), JAN + timedelta(hours=random.randint(-100, 9000))
+        expected = next((t[4] for t in tiers if t[0] <= calls < t[1] and t[2] <= at < t[3]), None)
+        assert index.lookup(calls, at) == expected
@@ -0,0 +1,135 @@
+from uuid import UUID
+from flask import request
+from sqlalchemy import insert, select, update
+from marshmallow import ValidationError
+from app import db
+
+# Largest array accepted by a POST /<collection>:batch request
+MAX_BATCH_SIZE = 1000
+
+
+class BatchError(ValueError):
+    '''
+    Raised when a batch request body is not a non-empty JSON array of at most MAX_BATCH_SIZE items
+    '''
+
+
+def batch_payload():
+    '''
+    The JSON array posted to a :batch endpoint
+    '''
+    data = request.get_json(silent=True)
+    if not isinstance(data, list) or not data:
+        raise BatchError("Request body must be a non-empty JSON array")
+    if len(data) > MAX_BATCH_SIZE:
+        raise BatchError(f"A batch holds at most {MAX_BATCH_SIZE} items")
+    return data
+
+
+def existing_ids(model, ids):
+    '''
+    The subset of ids that exist in model's table, found with one IN query
+    '''
+    ids = {id for id in ids if id is not None}
+    if not ids:
+        return set()
+    return {row.id for row in db.session.query(model.id).filter(model.id.in_(ids))}
+
+
+def parent_errors(items, key, exists, message):
+    '''
+    {index: {"error": message}} for every item whose parent id under key fails exists(id).
+    Items missing the key (a field error already reported for them) are skipped.
+    '''
+    errors = {}
+    for index, item in enumerate(items):
+        value = item.get(key)
+        if value is None:
+            continue
+        if isinstance(value, str):
+            try:
+                value = UUID(value)
+            except ValueError:
+                errors[index] = {"error": "Invalid UUID format"}
+                continue
+        if not exists(value):
+            errors[index] = {"error": message}
+    return errors
+
+
+def bulk_insert(model, rows, user_id):
+    '''
+    Insert validated rows with multi-row INSERT statements (batched by SQLAlchemy's insertmanyvalues)
+    without building ORM instances. Column defaults (id, timestamps, is_archived) are applied as usual.
+    Returns the new ids in the order of rows; the caller commits.
+    '''
+    user_id = UUID(user_id) if isinstance(user_id, str) else user_id
+    rows = [{**row, "created_by": user_id, "updated_by": user_id} for row in rows]
+    statement = insert(model).returning(model.id, sort_by_parameter_order=True)
+    return list(db.session.scalars(statement, rows))
+
+
+def wants_cascade():
+    '''
+    True when ?cascade=1 or ?cascade=true asks for an archive to include the rows below
+    '''
+    return request.args.get("cascade") in ("1", "true")
+
+
+def archive_ids(model):
+    '''
+    The JSON array of ids posted to an :archive endpoint, parsed to UUIDs and checked with one IN query.
+    Raises ValidationError with the invalid or unknown ids keyed by index.
+    '''
+    data = batch_payload()
+    ids, errors = [], {}
+    for index, value in enumerate(data):
+        try:
+            ids.append(UUID(value))
+        except (TypeError, ValueError, AttributeError):
+            errors[index] = ["Not a valid UUID."]
+    if not errors:
+        found = existing_ids(model, ids)
+        errors = {index: [f"{model.__name__} does not exist"] for index, id in enumerate(ids) if id not in found}
+    if errors:
+        raise ValidationError(errors)
+    return ids
+
+
+def archive(model, ids, user_id, cascade=()):
+    '''
+    Archive rows of model by id with set-based UPDATEs, without loading any ORM instance.
+    cascade lists the relationships to follow, e.g. (Contract.subscriptions, Subscription.tiers):
+    every child table is archived by one `UPDATE ... WHERE fk IN (subquery)` selecting the
+    rows above it. Rows already archived are left untouched.
+    Returns {tablename: rows archived}; the caller commits.
+    '''
+    user_id = UUID(user_id) if isinstance(user_id, str) else user_id
+    counts = {}
+
+    def archive_level(model, column, selection):
+        statement = (
+            update(model)
+            .where(column.in_(selection), model.is_archived == False)
+            .values(is_archived=True, updated_by=user_id)
+            .execution_options(synchronize_session=False)
+        )
+        table = model.__tablename__
+        counts[table] = counts.get(table, 0) + db.session.execute(statement).rowcount
+        for relationship in cascade:
+            if relationship.parent.class_ is model:
+                ((_, foreign_key),) = relationship.property.local_remote_pairs
+                parents = selection if column is model.id else select(model.id).where(column.in_(selection))
+                archive_level(relationship.mapper.class_, foreign_key, parents)
+
+    archive_level(model, model.id, list(ids))
+    return counts
+
+
+def dump_created(serializer, model, ids):
+    '''
+    Compiled-serializer dumps of the rows just inserted, in the order of ids
+    '''
+    rows = serializer.select(db.session.query(model)).filter(model.id.in_(ids)).all()
+    by_id = {data["id"]: data for data in serializer.dump(rows)}
+    return [by_id[str(id)] for id in ids]
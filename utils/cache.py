@@ -0,0 +1,163 @@
+import threading
+import time
+from collections import OrderedDict
+from utils.redis_cache import RedisBroadcaster, RedisCache, RespConnection
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_TTL_SECONDS = 300
+DEFAULT_REPORT_ENTRIES = 32
+
+
+class LRUCache:
+    '''
+    In-process cache backend: bounded, thread safe LRU whose entries expire after a TTL
+    '''
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL_SECONDS, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        '''
+        Cached value for key, or None on a miss
+        '''
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, expires_at = entry
+            if expires_at <= self.clock():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, self.clock() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def delete_prefix(self, prefix):
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "backend": "memory",
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+class Cache:
+    '''
+    Cache extension used by the app. init_app picks the backend from CACHE_BACKEND:
+    "memory" (per process LRU, the default) or "redis" (shared by every worker, at CACHE_REDIS_URL).
+    `local` always lives in the process, for values that cannot be shared such as built indexes.
+    `reports` holds report results apart from the per-resource entries so large reports cannot evict
+    them: a small LRU of its own with the memory backend, the shared server with the redis backend.
+    With CACHE_REDIS_URL set, deletes are broadcast so every worker drops its own copy
+    of the entry (memory backend and local entries).
+    '''
+    def __init__(self):
+        self.backend = LRUCache()
+        self.local = LRUCache()
+        self.reports = LRUCache(DEFAULT_REPORT_ENTRIES)
+        self.broadcaster = None
+
+    def init_app(self, app):
+        if self.broadcaster is not None:
+            self.broadcaster.close()
+            self.broadcaster = None
+
+        ttl = float(app.config.get("CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS))
+        backend = app.config.get("CACHE_BACKEND", "memory")
+        url = app.config.get("CACHE_REDIS_URL")
+
+        max_entries = int(app.config.get("CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES))
+        if backend == "memory":
+            self.backend = LRUCache(max_entries, ttl)
+            self.reports = LRUCache(int(app.config.get("CACHE_REPORT_MAX_ENTRIES", DEFAULT_REPORT_ENTRIES)), ttl)
+        elif backend == "redis":
+            if not url:
+                raise ValueError("CACHE_REDIS_URL is required for the redis cache backend")
+            self.backend = RedisCache(RespConnection.from_url(url), ttl, app.config.get("CACHE_KEY_PREFIX", "acms:"))
+            self.reports = self.backend
+        else:
+            raise ValueError(f"Unknown cache backend: {backend}")
+        self.local = LRUCache(max_entries, ttl)
+        if url:
+            self.broadcaster = RedisBroadcaster(url, self._forget)
+
+    def _forget(self, key):
+        '''
+        Apply a delete broadcast by another worker; a key ending in "*" is a prefix
+        '''
+        if key.endswith("*"):
+            self.local.delete_prefix(key[:-1])
+            return
+        self.local.delete(key)
+        if isinstance(self.backend, LRUCache):
+            self.backend.delete(key)
+
+    def get(self, key):
+        return self.backend.get(key)
+
+    def set(self, key, value):
+        self.backend.set(key, value)
+
+    def delete(self, key):
+        '''
+        Drop key here and, when broadcasting, in every other worker
+        '''
+        self.backend.delete(key)
+        self.local.delete(key)
+        if self.broadcaster is not None:
+            self.broadcaster.publish(key)
+
+    def delete_local_prefix(self, prefix):
+        '''
+        Drop every local entry under prefix here and, when broadcasting, in every other worker
+        '''
+        self.local.delete_prefix(prefix)
+        if self.broadcaster is not None:
+            self.broadcaster.publish(prefix + "*")
+
+    def clear(self):
+        self.backend.clear()
+        self.local.clear()
+        self.reports.clear()
+
+    def stats(self):
+        return self.backend.stats()
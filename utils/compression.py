@@ -0,0 +1,144 @@
+import os
+import zlib
+from flask import request, current_app
+
+try:
+    import brotli
+except ImportError:  # optional, only gzip and deflate are offered without it
+    brotli = None
+
+DEFAULT_MIN_SIZE = 1024
+DEFAULT_LEVEL = 6
+DEFAULT_BROTLI_QUALITY = 5
+COMPRESSIBLE_MIMETYPES = ("application/json", "application/x-ndjson", "text/html", "text/plain", "text/css", "text/csv", "application/javascript")
+
+# zlib window bits selecting the container of each encoding
+_WBITS = {"gzip": 31, "deflate": 15}
+
+
+def available_encodings():
+    '''
+    Content codings this server can produce, in order of preference
+    '''
+    return (("br",) if brotli is not None else ()) + ("gzip", "deflate")
+
+
+class _Compressor:
+    '''
+    Incremental compressor with the same interface for zlib based codings and brotli
+    '''
+    def __init__(self, encoding, level, brotli_quality):
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._brotli = None
+            self._zlib = zlib.compressobj(level, zlib.DEFLATED, _WBITS[encoding])
+
+    def compress(self, data):
+        if self._brotli is not None:
+            return self._brotli.process(data)
+        return self._zlib.compress(data)
+
+    def flush(self):
+        '''
+        Emit everything compressed so far without ending the stream
+        '''
+        if self._brotli is not None:
+            return self._brotli.flush()
+        return self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        if self._brotli is not None:
+            return self._brotli.finish()
+        return self._zlib.flush(zlib.Z_FINISH)
+
+
+class Compress:
+    '''
+    Negotiated response compression, registered with init_app like the other extensions.
+    Responses of a compressible type above COMPRESS_MIN_SIZE bytes are encoded with the
+    best coding the client accepts (br when the brotli package is installed, gzip, deflate)
+    at COMPRESS_LEVEL / COMPRESS_BROTLI_QUALITY. Streamed responses are compressed chunk by chunk.
+    JSON files under static/ are compressed once at startup and served from memory.
+    '''
+    def __init__(self):
+        self.precompressed = {}
+
+    def init_app(self, app):
+        app.config.setdefault("COMPRESS_MIN_SIZE", DEFAULT_MIN_SIZE)
+        app.config.setdefault("COMPRESS_LEVEL", DEFAULT_LEVEL)
+        app.config.setdefault("COMPRESS_BROTLI_QUALITY", DEFAULT_BROTLI_QUALITY)
+        self.precompressed = self.precompress_static(app)
+        app.after_request(self.after_request)
+
+    def precompress_static(self, app):
+        '''
+        {filename: {encoding: bytes}} for every .json file in the static folder
+        '''
+        files = {}
+        if not app.static_folder or not os.path.isdir(app.static_folder):
+            return files
+        for filename in sorted(os.listdir(app.static_folder)):
+            if not filename.endswith(".json"):
+                continue
+            with open(os.path.join(app.static_folder, filename), "rb") as f:
+                data = f.read()
+            files[filename] = {
+                encoding: self._compress(data, encoding, app.config) for encoding in available_encodings()
+            }
+        return files
+
+    def _compressor(self, encoding, config):
+        return _Compressor(encoding, config["COMPRESS_LEVEL"], config["COMPRESS_BROTLI_QUALITY"])
+
+    def _compress(self, data, encoding, config):
+        compressor = self._compressor(encoding, config)
+        return compressor.compress(data) + compressor.finish()
+
+    def _stream(self, chunks, compressor):
+        try:
+            for chunk in chunks:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode()
+                # flush per chunk so NDJSON lines reach the client as they are produced
+                yield compressor.compress(chunk) + compressor.flush()
+            yield compressor.finish()
+        finally:
+            if hasattr(chunks, "close"):
+                chunks.close()
+
+    def after_request(self, response):
+        if request.method == "HEAD" or response.status_code != 200 or "Content-Encoding" in response.headers:
+            return response
+        if response.mimetype not in COMPRESSIBLE_MIMETYPES:
+            return response
+
+        response.vary.add("Accept-Encoding")
+        encoding = request.accept_encodings.best_match(available_encodings())
+        if encoding is None:
+            return response
+        config = current_app.config
+
+        if request.endpoint == "static":
+            encoded = self.precompressed.get(request.view_args.get("filename"), {}).get(encoding)
+            if encoded is None:
+                return response
+            file = response.response
+            response.direct_passthrough = False
+            response.set_data(encoded)
+            file.close()
+            etag, weak = response.get_etag()
+            if etag:
+                # a different representation of the file needs its own strong validator
+                response.set_etag(f"{etag}-{encoding}", weak)
+        elif response.is_streamed:
+            response.response = self._stream(response.response, self._compressor(encoding, config))
+            response.headers.pop("Content-Length", None)
+        else:
+            data = response.get_data()
+            if len(data) < config["COMPRESS_MIN_SIZE"]:
+                return response
+            response.set_data(self._compress(data, encoding, config))
+
+        response.headers["Content-Encoding"] = encoding
+        return response
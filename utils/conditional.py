@@ -0,0 +1,74 @@
+import hashlib
+from datetime import timezone
+from flask import request
+from sqlalchemy import func, select
+from app import db
+from utils.response import wants_stream, STREAM_MIMETYPE
+
+
+class CacheValidators:
+    '''
+    Weak ETag and Last-Modified for a response, derived from AuditMixin.updated_at, and the request
+    headers the response varies on
+    '''
+    def __init__(self, etag, last_modified, vary=()):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.vary = vary
+
+    def not_modified(self):
+        '''
+        True when the request's If-None-Match / If-Modified-Since show the client already has this version
+        '''
+        if request.if_none_match:
+            return request.if_none_match.contains_weak(self.etag)
+        if request.if_modified_since and self.last_modified:
+            return self.last_modified.replace(microsecond=0) <= request.if_modified_since
+        return False
+
+    def apply(self, response):
+        response.set_etag(self.etag, weak=True)
+        if self.last_modified:
+            response.last_modified = self.last_modified
+        response.vary.update(self.vary)
+        return response
+
+
+def _as_utc(value):
+    if value is None:
+        return None
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def _dependent_columns(dependents):
+    return [select(func.max(dep.updated_at)).correlate(None).scalar_subquery() for dep in dependents]
+
+
+def _build(parts, timestamps, vary=()):
+    # the query string is part of the tag so ?fields=, ?cursor= etc. get their own versions
+    parts = [*parts, *timestamps, request.query_string.decode()]
+    etag = hashlib.sha1("|".join(str(p) for p in parts).encode()).hexdigest()
+    timestamps = [_as_utc(t) for t in timestamps if t is not None]
+    return CacheValidators(etag, max(timestamps) if timestamps else None, vary)
+
+
+def collection_validators(query, model, dependents=()):
+    '''
+    Validators for a collection: max(updated_at) and count of the rows the query matches,
+    plus max(updated_at) of every model nested in the response, in one aggregate query.
+    Collections are negotiated as JSON pages or an NDJSON stream, so the format is part of the tag
+    and the response varies on Accept.
+    '''
+    row = query.with_entities(func.max(model.updated_at), func.count(model.id), *_dependent_columns(dependents)).one()
+    mimetype = STREAM_MIMETYPE if wants_stream() else "application/json"
+    return _build([model.__name__, row[1], mimetype], [row[0], *row[2:]], vary=("Accept",))
+
+
+def resource_validators(model, id, dependents=()):
+    '''
+    Validators for a single row and the models nested in its response, or None if the row does not exist
+    '''
+    row = db.session.query(model.updated_at, *_dependent_columns(dependents)).filter(model.id == id).one_or_none()
+    if row is None:
+        return None
+    return _build([model.__name__, id], list(row))
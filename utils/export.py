@@ -0,0 +1,200 @@
+import csv
+import io
+from sqlalchemy import String, and_, cast, func, select, type_coerce
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from app import db
+from models import Client, Contract, Product, Subscription, SubscriptionTier
+from utils.usage import CSV_MIMETYPE
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # optional, only CSV exports are offered without it
+    pyarrow = None
+
+PARQUET_MIMETYPE = "application/vnd.apache.parquet"
+# Rows fetched from the server-side cursor, written and flushed at a time
+EXPORT_BATCH_SIZE = 5000
+
+# Columns of the contract export, one row per tier: a subscription without tiers or a contract without
+# subscriptions still gets one row, with the columns of the missing levels empty
+EXPORT_COLUMNS = {
+    "contract_id": Contract.id,
+    "contract_name": Contract.contract_name,
+    "contract_is_archived": Contract.is_archived,
+    "client_id": Client.id,
+    "client_company_name": Client.company_name,
+    "subscription_id": Subscription.id,
+    "pricing_type": Subscription.pricing_type,
+    "strategy": Subscription.strategy,
+    "subscription_is_archived": Subscription.is_archived,
+    "product_id": Product.id,
+    "product_api_name": Product.api_name,
+    "tier_id": SubscriptionTier.id,
+    "min_calls": SubscriptionTier.min_calls,
+    "max_calls": SubscriptionTier.max_calls,
+    "base_price": SubscriptionTier.base_price,
+    "price_per_tier": SubscriptionTier.price_per_tier,
+    "start_date": SubscriptionTier.start_date,
+    "end_date": SubscriptionTier.end_date,
+    "tier_is_archived": SubscriptionTier.is_archived,
+}
+
+
+class ExportError(ValueError):
+    '''
+    Raised for an export format that is unknown or not available on this server
+    '''
+
+
+def export_formats():
+    '''
+    Formats contracts can be exported in: csv, and parquet when pyarrow is installed
+    '''
+    return ("csv", "parquet") if pyarrow is not None else ("csv",)
+
+
+def _uuid_text(column):
+    '''
+    A UUID column as its canonical text, formatted by the database: turning every id into a uuid.UUID
+    and back into a string is most of the Python work of an export otherwise
+    '''
+    if db.session.get_bind().dialect.name == "postgresql":
+        return cast(column, String)
+    # SQLite stores the 32 hex digits
+    digits = type_coerce(column, String)
+    parts = [func.substr(digits, start, length, type_=String) for start, length in ((1, 8), (9, 4), (13, 4), (17, 4), (21, 12))]
+    return parts[0] + "-" + parts[1] + "-" + parts[2] + "-" + parts[3] + "-" + parts[4]
+
+
+def export_query(include_archived=False):
+    '''
+    Every contract joined with its client, subscriptions, their products and tiers, flattened to
+    EXPORT_COLUMNS and ordered by contract, subscription and tier id. The archived filters of the
+    lower levels sit in the outer joins, so a contract is exported even when nothing under it is live.
+    '''
+    columns = [
+        (_uuid_text(column) if isinstance(column.type, PG_UUID) else column).label(name)
+        for name, column in EXPORT_COLUMNS.items()
+    ]
+    subscription_join = Subscription.contract_id == Contract.id
+    product_join = Subscription.product_id == Product.id
+    tier_join = SubscriptionTier.subscription_id == Subscription.id
+    if not include_archived:
+        subscription_join = and_(subscription_join, Subscription.is_archived == False)
+        product_join = and_(product_join, Product.is_archived == False)
+        tier_join = and_(tier_join, SubscriptionTier.is_archived == False)
+
+    query = (
+        select(*columns)
+        .select_from(Contract)
+        .join(Client, Contract.client_id == Client.id)
+        .outerjoin(Subscription, subscription_join)
+        .outerjoin(Product, product_join)
+        .outerjoin(SubscriptionTier, tier_join)
+        .order_by(Contract.id, Subscription.id, SubscriptionTier.id)
+    )
+    if not include_archived:
+        query = query.where(Contract.is_archived == False)
+    return query
+
+
+def export_batches(include_archived=False, batch_size=EXPORT_BATCH_SIZE):
+    '''
+    Rows of the export as lists of batch_size tuples, read from a server-side cursor (a named cursor on
+    Postgres), so only one batch is held in memory however many contracts there are. The query runs on
+    the session's connection directly, the rows are plain tuples with no ORM loading step.
+    '''
+    result = db.session.connection().execute(
+        export_query(include_archived), execution_options={"stream_results": True, "yield_per": batch_size}
+    )
+    try:
+        yield from result.partitions()
+    finally:
+        result.close()
+
+
+def csv_chunks(batches):
+    '''
+    The export as CSV text: the header, then one chunk per batch of rows
+    '''
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(EXPORT_COLUMNS)
+    for batch in batches:
+        writer.writerows(batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+class _Drain:
+    '''
+    Write-only file that hands what was written to it to the caller, for streaming a Parquet file as it is built
+    '''
+    closed = False
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data, self.chunks = b"".join(self.chunks), []
+        return data
+
+
+def _parquet_schema():
+    string, flag, count = pyarrow.string(), pyarrow.bool_(), pyarrow.int32()
+    price, timestamp = pyarrow.decimal128(10, 2), pyarrow.timestamp("us")
+    types = {
+        "contract_is_archived": flag, "subscription_is_archived": flag, "tier_is_archived": flag,
+        "min_calls": count, "max_calls": count, "base_price": price, "price_per_tier": price,
+        "start_date": timestamp, "end_date": timestamp,
+    }
+    return pyarrow.schema([(name, types.get(name, string)) for name in EXPORT_COLUMNS])
+
+
+def parquet_chunks(batches):
+    '''
+    The export as a Parquet file, one row group per batch of rows, yielded as each row group is written
+    '''
+    if pyarrow is None:
+        raise ExportError("Parquet export needs pyarrow installed")
+    schema = _parquet_schema()
+    sink = _Drain()
+    with pyarrow.parquet.ParquetWriter(sink, schema) as writer:
+        for batch in batches:
+            writer.write_table(pyarrow.Table.from_arrays(
+                [pyarrow.array(column, type=field.type) for field, column in zip(schema, zip(*batch))], schema=schema
+            ))
+            yield sink.drain()
+    yield sink.drain()
+
+
+# Writer and content type of each export format
+EXPORT_WRITERS = {"csv": (csv_chunks, CSV_MIMETYPE), "parquet": (parquet_chunks, PARQUET_MIMETYPE)}
+
+
+def export_writer(format):
+    '''
+    (chunk writer, content type) of an export format, checked against what this server can produce
+    '''
+    if format not in export_formats():
+        raise ExportError(f"format must be one of {', '.join(export_formats())}")
+    return EXPORT_WRITERS[format]
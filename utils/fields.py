@@ -0,0 +1,48 @@
+from flask import request
+from sqlalchemy import inspect
+from sqlalchemy.orm import load_only
+
+# Always selected so rows can be identified and paginated
+REQUIRED_COLUMNS = ("id", "created_at")
+
+
+class FieldsError(ValueError):
+    '''
+    Raised when ?fields= names a field the schema does not have
+    '''
+
+
+def parse_fields(schema):
+    '''
+    Read the comma separated ?fields= list, checked against the schema's fields.
+    Returns None when the parameter is absent, meaning every field.
+    '''
+    raw = request.args.get("fields")
+    if not raw:
+        return None
+
+    fields = {f.strip() for f in raw.split(",") if f.strip()}
+    unknown = fields - set(schema.fields)
+    if unknown:
+        raise FieldsError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return fields
+
+
+def sparse_schema(schema, fields):
+    '''
+    Copy of schema that only dumps the requested fields
+    '''
+    if fields is None:
+        return schema
+    return schema.__class__(many=schema.many, only=fields)
+
+
+def load_only_options(model, fields):
+    '''
+    load_only option limiting the SELECT to the requested columns
+    '''
+    if fields is None:
+        return []
+    columns = {attr.key for attr in inspect(model).column_attrs}
+    keep = (fields & columns) | set(REQUIRED_COLUMNS)
+    return [load_only(*[getattr(model, key) for key in sorted(keep)])]
@@ -0,0 +1,108 @@
+from datetime import datetime, timezone
+from uuid import UUID
+from flask import request
+from sqlalchemy import Boolean, DateTime, Enum, func, select
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from utils.pagination import DEFAULT_SORT
+from app import db
+from models import Contract, Subscription, SubscriptionTier
+
+
+class FilterError(ValueError):
+    '''
+    Raised when a filter or sort query parameter cannot be used
+    '''
+
+
+def _coerce(model, key, value):
+    '''
+    Convert a query string value to the python type of model.<key>
+    '''
+    column_type = model.__table__.c[key].type
+    try:
+        if isinstance(column_type, PG_UUID):
+            return UUID(value)
+        if isinstance(column_type, Boolean):
+            if value.lower() not in ("true", "false", "1", "0"):
+                raise ValueError
+            return value.lower() in ("true", "1")
+        if isinstance(column_type, DateTime):
+            return datetime.fromisoformat(value)
+        if isinstance(column_type, Enum):
+            if value not in column_type.enums:
+                raise ValueError
+            return value
+        return column_type.python_type(value)
+    except ValueError:
+        raise FilterError(f"Invalid value for {key}: {value}")
+
+
+def apply_filters(query, model, filterable):
+    '''
+    Apply the whitelisted ?<column>=value equality filters and the
+    ?created_after= / ?created_before= range to a query
+    '''
+    for key in filterable:
+        if key in request.args:
+            query = query.filter(getattr(model, key) == _coerce(model, key, request.args[key]))
+
+    if "created_after" in request.args:
+        query = query.filter(model.created_at >= _coerce(model, "created_at", request.args["created_after"]))
+    if "created_before" in request.args:
+        query = query.filter(model.created_at < _coerce(model, "created_at", request.args["created_before"]))
+
+    return query
+
+
+def tier_active_at(at):
+    '''
+    Condition on SubscriptionTier: the tier is in effect at `at`, start_date <= at < end_date. On Postgres it is
+    written as tsrange(start_date, end_date) @> at so it is answered by the GiST index over the tiers' ranges,
+    elsewhere as the two comparisons the (start_date, end_date) index covers.
+    '''
+    if db.session.get_bind().dialect.name == "postgresql":
+        return func.tsrange(SubscriptionTier.start_date, SubscriptionTier.end_date).op("@>")(at)
+    return (SubscriptionTier.start_date <= at) & (SubscriptionTier.end_date > at)
+
+
+def apply_as_of(query, model):
+    '''
+    Apply ?as_of=<timestamp> to a tier, subscription or contract list: tiers in effect at that moment,
+    subscriptions with a live tier in effect, contracts with a live subscription that has one.
+    Timestamps with an offset are compared in UTC.
+    '''
+    if not request.args.get("as_of"):
+        return query
+    try:
+        at = datetime.fromisoformat(request.args["as_of"])
+    except ValueError:
+        raise FilterError(f"Invalid value for as_of: {request.args['as_of']}")
+    if at.tzinfo is not None:
+        at = at.astimezone(timezone.utc).replace(tzinfo=None)
+
+    if model is SubscriptionTier:
+        return query.filter(tier_active_at(at))
+
+    active = select(SubscriptionTier.subscription_id).where(SubscriptionTier.is_archived == False, tier_active_at(at))
+    if model is Subscription:
+        return query.filter(Subscription.id.in_(active))
+    if model is Contract:
+        return query.filter(Contract.id.in_(
+            select(Subscription.contract_id).where(Subscription.is_archived == False, Subscription.id.in_(active))
+        ))
+    raise FilterError(f"as_of is not supported for {model.__tablename__}")
+
+
+def parse_sort(sortable):
+    '''
+    Read ?sort=<column> (ascending) or ?sort=-<column> (descending), checked against the whitelist
+    '''
+    raw = request.args.get("sort")
+    if not raw:
+        return DEFAULT_SORT
+
+    descending = raw.startswith("-")
+    key = raw.lstrip("-")
+    if key not in sortable:
+        raise FilterError(f"Cannot sort by {key}")
+    return key, descending
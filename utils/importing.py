@@ -0,0 +1,305 @@
+import csv
+import io
+import json
+from datetime import datetime, timezone
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from uuid import UUID, uuid4
+from app import db
+from models import Client, Product, Subscription, SubscriptionTier
+from utils.bulk import existing_ids
+from utils.usage import READ_BUFFER_SIZE, to_utc
+
+try:
+    import orjson
+except ImportError:  # optional, the stdlib encoder is used without it
+    orjson = None
+
+# Rows parsed, checked, written and committed at a time
+IMPORT_CHUNK_SIZE = 5000
+# Rows per statement of the multi-row INSERT fallback, well under SQLite's limit of bound parameters
+INSERT_ROWS = 500
+
+_MISSING = "Missing data for required field."
+_CENT = Decimal("0.01")
+_MAX_INTEGER = 2 ** 31 - 1
+
+
+def _dumps(value):
+    if orjson is not None:
+        return orjson.dumps(value).decode()
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+class BulkImportError(ValueError):
+    '''
+    Raised for an unknown import entity or a CSV file without the columns it needs
+    '''
+
+
+def _text(max_length):
+    def parse(raw):
+        if len(raw) > max_length:
+            raise ValueError(f"Longer than maximum length {max_length}.")
+        return raw
+    return parse
+
+
+def _uuid(raw):
+    try:
+        return UUID(raw)
+    except ValueError:
+        raise ValueError("Not a valid UUID.")
+
+
+def _count(raw):
+    try:
+        value = int(raw)
+    except ValueError:
+        raise ValueError("Not a valid integer.")
+    if not 0 <= value <= _MAX_INTEGER:
+        raise ValueError(f"Must be greater than or equal to 0 and less than or equal to {_MAX_INTEGER}.")
+    return value
+
+
+def _money(raw):
+    try:
+        value = Decimal(raw)
+    except InvalidOperation:
+        raise ValueError("Not a valid number.")
+    if not value.is_finite() or value != value.quantize(_CENT) or abs(value) >= 10 ** 8:
+        raise ValueError("Not a valid amount: at most 8 digits and 2 decimal places.")
+    return value
+
+
+def _timestamp(raw):
+    try:
+        return to_utc(raw)
+    except ValueError:
+        raise ValueError("Not a valid datetime.")
+
+
+def _tier_errors(rows):
+    '''
+    {index: errors} of tiers whose call range or dates are inverted, or that overlap a live tier of their
+    subscription in calls and dates: one stored before or one earlier in the chunk. The live tiers of all
+    the chunk's subscriptions are read with one IN query.
+    '''
+    errors = {}
+    for index, row in rows.items():
+        if row["min_calls"] >= row["max_calls"]:
+            errors[index] = {"min_calls": ["min_calls must be < max_calls"]}
+        elif row["start_date"] >= row["end_date"]:
+            errors[index] = {"start_date": ["start_date must be before end_date."]}
+
+    ids = {row["subscription_id"] for index, row in rows.items() if index not in errors}
+    siblings = {}
+    if ids:
+        for tier in db.session.query(
+            SubscriptionTier.subscription_id, SubscriptionTier.min_calls, SubscriptionTier.max_calls,
+            SubscriptionTier.start_date, SubscriptionTier.end_date,
+        ).filter(SubscriptionTier.subscription_id.in_(ids), SubscriptionTier.is_archived == False):
+            siblings.setdefault(tier.subscription_id, []).append(tuple(tier)[1:])
+
+    for index, row in rows.items():
+        if index in errors:
+            continue
+        tier = (row["min_calls"], row["max_calls"], row["start_date"], row["end_date"])
+        live = siblings.setdefault(row["subscription_id"], [])
+        if any(
+            other[0] < tier[1] and tier[0] < other[1] and other[2] < tier[3] and tier[2] < other[3] for other in live
+        ):
+            errors[index] = {"error": ["Tier overlaps another live tier of the subscription in calls and dates"]}
+        else:
+            live.append(tier)
+    return errors
+
+
+class ImportSpec:
+    '''
+    How rows of one entity are imported: the parser of every column, the columns that must be unique,
+    the parent each id column refers to and a check over the whole chunk
+    '''
+    def __init__(self, model, fields, unique=(), parents=None, check=None):
+        self.model = model
+        self.fields = fields
+        self.unique = unique
+        self.parents = parents or {}
+        self.check = check
+
+
+# Entities accepted by the bulk import, by the name used in the endpoint and command
+IMPORTS = {
+    "clients": ImportSpec(
+        Client,
+        {"company_name": _text(60), "email": _text(254), "phone_number": _text(20), "address": _text(200)},
+        unique=("company_name", "email"),
+    ),
+    "products": ImportSpec(
+        Product,
+        {"api_name": _text(50), "description": _text(1000)},
+        unique=("api_name",),
+    ),
+    "tiers": ImportSpec(
+        SubscriptionTier,
+        {
+            "subscription_id": _uuid, "min_calls": _count, "max_calls": _count, "base_price": _money,
+            "price_per_tier": _money, "start_date": _timestamp, "end_date": _timestamp,
+        },
+        parents={"subscription_id": Subscription},
+        check=_tier_errors,
+    ),
+}
+
+
+def import_spec(entity):
+    if entity not in IMPORTS:
+        raise BulkImportError(f"entity must be one of {', '.join(IMPORTS)}")
+    return IMPORTS[entity]
+
+
+def read_rows(spec, stream):
+    '''
+    (line number, record) for every row of a CSV file with a header line, read through a buffer
+    '''
+    reader = csv.DictReader(io.TextIOWrapper(io.BufferedReader(stream, READ_BUFFER_SIZE), encoding="utf-8-sig", newline=""))
+    missing = set(spec.fields) - set(reader.fieldnames or ())
+    if missing:
+        raise BulkImportError(f"CSV header is missing {', '.join(sorted(missing))}")
+    for record in reader:
+        yield reader.line_num, record
+
+
+def _parse(spec, records):
+    '''
+    Parse a chunk column by column, each distinct value of a column once, and check the parents and
+    unique columns with one IN query each. Returns ({index: row}, {index: errors}).
+    '''
+    errors = {}
+    columns = {}
+    for name, parse in spec.fields.items():
+        parsed, values = {}, []
+        for index, record in enumerate(records):
+            raw = (record.get(name) or "").strip()
+            if raw not in parsed:
+                try:
+                    parsed[raw] = (parse(raw), None) if raw else (None, _MISSING)
+                except ValueError as error:
+                    parsed[raw] = (None, str(error))
+            value, error = parsed[raw]
+            if error:
+                errors.setdefault(index, {})[name] = [error]
+            values.append(value)
+        columns[name] = values
+    rows = {
+        index: dict(zip(columns, values))
+        for index, values in enumerate(zip(*columns.values())) if index not in errors
+    }
+
+    for name, model in spec.parents.items():
+        found = existing_ids(model, {row[name] for row in rows.values()})
+        for index in [index for index, row in rows.items() if row[name] not in found]:
+            errors[index] = {name: [f"{model.__name__} does not exist"]}
+            del rows[index]
+
+    if spec.check and rows:
+        for index, error in spec.check(rows).items():
+            errors[index] = error
+            del rows[index]
+
+    taken = {}
+    for name in spec.unique:
+        column = getattr(spec.model, name)
+        values = {row[name] for row in rows.values()}
+        taken[name] = {value for (value,) in db.session.query(column).filter(column.in_(values))} if values else set()
+    if taken:
+        for index, row in list(rows.items()):
+            duplicates = {name: [f"{spec.model.__name__} with this {name} already exists."] for name in spec.unique if row[name] in taken[name]}
+            if duplicates:
+                errors[index] = duplicates
+                del rows[index]
+            else:
+                for name in spec.unique:
+                    taken[name].add(row[name])
+    return rows, errors
+
+
+def _insert_rows(table, rows):
+    '''
+    Multi-row INSERTs of INSERT_ROWS rows through the driver. The statement text is built once per row count
+    instead of compiling an INSERT ... VALUES with a bound parameter per value for every statement, and
+    values are converted by the columns' bind processors.
+    '''
+    connection = db.session.connection()
+    dialect = connection.dialect
+    columns = list(rows[0])
+    processors = [table.c[column].type.bind_processor(dialect) for column in columns]
+    marker = "?" if dialect.paramstyle == "qmark" else "%s"
+    group = f"({', '.join([marker] * len(columns))})"
+    names = ", ".join(dialect.identifier_preparer.quote(column) for column in columns)
+
+    def statement(count):
+        return f"INSERT INTO {dialect.identifier_preparer.format_table(table)} ({names}) VALUES {', '.join([group] * count)}"
+
+    full = statement(INSERT_ROWS)
+    for start in range(0, len(rows), INSERT_ROWS):
+        part = rows[start:start + INSERT_ROWS]
+        params = tuple(
+            process(row[column]) if process else row[column]
+            for row in part for column, process in zip(columns, processors)
+        )
+        connection.exec_driver_sql(full if len(part) == INSERT_ROWS else statement(len(part)), params)
+
+
+def _write(spec, rows):
+    '''
+    Append full rows to the entity's table: COPY FROM STDIN through psycopg2 on Postgres, multi-row
+    INSERTs of INSERT_ROWS rows elsewhere. Runs in the session's transaction.
+    '''
+    table = spec.model.__table__
+    if db.session.get_bind().dialect.name == "postgresql":
+        columns = list(rows[0])
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator="\n").writerows([row[column] for column in columns] for row in rows)
+        buffer.seek(0)
+        cursor = db.session.connection().connection.cursor()
+        try:
+            cursor.copy_expert(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+        finally:
+            cursor.close()
+    else:
+        _insert_rows(table, rows)
+
+
+def import_rows(spec, records, user_id, rejected=None, chunk_size=IMPORT_CHUNK_SIZE):
+    '''
+    Import (line number, record) pairs chunk by chunk: each chunk is parsed and checked as a whole, its
+    valid rows are written and committed. Rows failing a check are left out and, when a rejected text
+    file is given, written to it as CSV with their line number and errors. A file imported again is not
+    loaded twice, its rows are rejected as already existing or overlapping the second time.
+    Returns {"rows": read, "imported": written, "rejected": left out}.
+    '''
+    user_id = UUID(user_id) if isinstance(user_id, str) else user_id
+    if rejected is not None:
+        writer = csv.DictWriter(rejected, ["line", *spec.fields, "errors"], extrasaction="ignore", lineterminator="\n")
+        writer.writeheader()
+    counts = {"rows": 0, "imported": 0, "rejected": 0}
+    while chunk := list(islice(records, chunk_size)):
+        lines, batch = zip(*chunk)
+        rows, errors = _parse(spec, batch)
+
+        if rows:
+            now = datetime.now(timezone.utc)
+            _write(spec, [
+                {**row, "id": uuid4(), "is_archived": False, "created_at": now, "updated_at": now, "created_by": user_id, "updated_by": user_id}
+                for row in rows.values()
+            ])
+        db.session.commit()
+
+        if rejected is not None:
+            for index in sorted(errors):
+                writer.writerow({**batch[index], "line": lines[index], "errors": _dumps(errors[index])})
+        counts["rows"] += len(chunk)
+        counts["imported"] += len(rows)
+        counts["rejected"] += len(errors)
+    return counts
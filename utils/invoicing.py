@@ -0,0 +1,197 @@
+import multiprocessing
+import os
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, time, timezone
+from itertools import repeat
+from flask import Flask
+from sqlalchemy import func, insert
+from sqlalchemy.exc import IntegrityError
+from app import db
+from models import Contract, Subscription, InvoiceRun, InvoiceChunk, InvoiceChunkContract, Invoice, InvoiceLine
+from utils.pricing import load_ladders, from_cents
+from utils.usage import usage_totals
+
+# Contracts billed per chunk unless a run asks for another size
+DEFAULT_CHUNK_SIZE = 500
+MAX_CHUNK_SIZE = 10_000
+
+# Flask app of a pool worker process, created by _start_worker
+_worker_app = None
+# Pool workers are spawned, not forked: the web process runs request threads and the cache
+# invalidation subscriber, and forking a process with threads can deadlock the children
+_POOL_CONTEXT = multiprocessing.get_context("spawn")
+
+
+class InvoiceError(ValueError):
+    '''
+    Raised for an invalid billing period or chunk size, or an unknown run or chunk
+    '''
+
+
+def start_run(period_start, period_end, user_id=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    '''
+    Create a run billing [period_start, period_end) for the live contracts, cut into chunks of
+    chunk_size contracts by id. Each chunk stores its contract ids, so it bills the same contracts
+    whichever process picks it up and however often the run is resumed, even when contracts are
+    created or archived in between. The caller commits.
+    '''
+    if period_start >= period_end:
+        raise InvoiceError("period_end must be after period_start")
+    if not 1 <= chunk_size <= MAX_CHUNK_SIZE:
+        raise InvoiceError(f"chunk_size must be between 1 and {MAX_CHUNK_SIZE}")
+    user_id = uuid.UUID(user_id) if isinstance(user_id, str) else user_id
+
+    run = InvoiceRun(period_start=period_start, period_end=period_end, chunk_size=chunk_size, created_by=user_id)
+    db.session.add(run)
+    db.session.flush()
+
+    ids = [id for (id,) in db.session.query(Contract.id).filter(Contract.is_archived == False).order_by(Contract.id)]
+    chunks = [
+        {"run_id": run.id, "number": number, "first_contract_id": ids[i], "last_contract_id": ids[min(i + chunk_size, len(ids)) - 1]}
+        for number, i in enumerate(range(0, len(ids), chunk_size))
+    ]
+    if chunks:
+        db.session.execute(insert(InvoiceChunk), chunks)
+        db.session.execute(insert(InvoiceChunkContract), [
+            {"run_id": run.id, "number": i // chunk_size, "contract_id": id} for i, id in enumerate(ids)
+        ])
+    return run
+
+
+def bill_chunk(run_id, number):
+    '''
+    Price the live subscriptions, created before the run started, of the contracts a chunk was given on
+    their usage in the run's period, with the tiers in effect when the period starts, and write one invoice
+    per contract plus one line per subscription with multi-row INSERTs. The invoices and the chunk's completion are committed together.
+    Returns the number of invoices written: 0 for a chunk already billed.
+    '''
+    chunk = db.session.get(InvoiceChunk, (run_id, number))
+    if chunk is None:
+        raise InvoiceError(f"Invoice run {run_id} has no chunk {number}")
+    if chunk.completed_at is not None:
+        return 0
+    run = chunk.run
+
+    contracts = dict(db.session.query(Contract.id, Contract.client_id).join(
+        InvoiceChunkContract, InvoiceChunkContract.contract_id == Contract.id,
+    ).filter(InvoiceChunkContract.run_id == chunk.run_id, InvoiceChunkContract.number == chunk.number))
+    subscriptions = db.session.query(Subscription.id, Subscription.contract_id).filter(
+        Subscription.contract_id.in_(contracts), Subscription.is_archived == False, Subscription.created_at <= run.created_at,
+    ).order_by(Subscription.id).all() if contracts else []
+
+    ids = [subscription.id for subscription in subscriptions]
+    calls = usage_totals(ids, run.period_start, run.period_end)
+    cents = load_ladders(ids, at=datetime.combine(run.period_start, time.min)).price_cents(ids, [calls[id] for id in ids])
+
+    invoices = {
+        contract_id: {
+            "id": uuid.uuid4(), "run_id": run.id, "contract_id": contract_id, "client_id": client_id,
+            "period_start": run.period_start, "period_end": run.period_end, "calls": 0, "amount": 0,
+        }
+        for contract_id, client_id in contracts.items()
+    }
+    lines = []
+    for subscription, charge in zip(subscriptions, cents):
+        invoice = invoices[subscription.contract_id]
+        invoice["calls"] += calls[subscription.id]
+        invoice["amount"] += int(charge)
+        lines.append({"invoice_id": invoice["id"], "subscription_id": subscription.id, "calls": calls[subscription.id], "amount": from_cents(charge)})
+    for invoice in invoices.values():
+        invoice["amount"] = from_cents(invoice["amount"])
+
+    try:
+        if invoices:
+            db.session.execute(insert(Invoice), list(invoices.values()))
+        if lines:
+            db.session.execute(insert(InvoiceLine), lines)
+        chunk.invoices = len(invoices)
+        chunk.completed_at = datetime.now(timezone.utc)
+        db.session.commit()
+    except IntegrityError:
+        # billed meanwhile by another process running the same chunk
+        db.session.rollback()
+        return 0
+    return len(invoices)
+
+
+def _start_worker(database_url):
+    '''
+    A bare app for billing chunks: the database only, without the cache, its invalidation subscriber,
+    compression or blueprints create_app sets up for serving requests
+    '''
+    global _worker_app
+    _worker_app = Flask(__name__)
+    _worker_app.config["SQLALCHEMY_DATABASE_URI"] = database_url
+    _worker_app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    db.init_app(_worker_app)
+
+
+def _bill_in_worker(run_id, number):
+    with _worker_app.app_context():
+        try:
+            return bill_chunk(run_id, number)
+        finally:
+            db.session.remove()
+
+
+def run_invoices(run_id, workers=None):
+    '''
+    Bill the pending chunks of a run in a pool of `workers` spawned processes (one per core by default), each
+    with its own app and database connection; workers=0 bills them in this process instead. Chunks billed before
+    are skipped, so an interrupted run is resumed by calling this again. Returns the invoices written.
+    '''
+    run = db.session.get(InvoiceRun, run_id)
+    if run is None:
+        raise InvoiceError(f"Invoice run {run_id} does not exist")
+    pending = [number for (number,) in db.session.query(InvoiceChunk.number).filter(
+        InvoiceChunk.run_id == run.id, InvoiceChunk.completed_at == None,
+    ).order_by(InvoiceChunk.number)]
+    db.session.commit()
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers == 0 or not pending:
+        written = sum(bill_chunk(run.id, number) for number in pending)
+    else:
+        database_url = db.engine.url.render_as_string(hide_password=False)
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(pending)), mp_context=_POOL_CONTEXT, initializer=_start_worker, initargs=(database_url,),
+        ) as pool:
+            written = sum(pool.map(_bill_in_worker, repeat(run.id), pending))
+
+    remaining = db.session.query(func.count()).select_from(InvoiceChunk).filter(
+        InvoiceChunk.run_id == run.id, InvoiceChunk.completed_at == None,
+    ).scalar()
+    if not remaining and run.completed_at is None:
+        run.completed_at = datetime.now(timezone.utc)
+    db.session.commit()
+    return written
+
+
+def run_in_background(app, run_id, workers=None):
+    '''
+    run_invoices on a daemon thread of the web process, for endpoints that start or resume a run.
+    A run left unfinished when the web process stops is picked up by resuming it.
+    '''
+    def target():
+        with app.app_context():
+            try:
+                run_invoices(run_id, workers)
+            finally:
+                db.session.remove()
+
+    thread = threading.Thread(target=target, name=f"invoice-run-{run_id}", daemon=True)
+    thread.start()
+    return thread
+
+
+def run_progress(run):
+    '''
+    Chunks in total and billed, and invoices written so far, from one aggregate query
+    '''
+    chunks, completed, invoices = db.session.query(
+        func.count(), func.count(InvoiceChunk.completed_at), func.coalesce(func.sum(InvoiceChunk.invoices), 0),
+    ).filter(InvoiceChunk.run_id == run.id).one()
+    return {"chunks": chunks, "completed_chunks": completed, "invoices": invoices}
@@ -0,0 +1,109 @@
+import base64
+from datetime import datetime
+from uuid import UUID
+from flask import request
+from sqlalchemy import and_, or_
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+# (column, descending) used when no ?sort= is given
+DEFAULT_SORT = ("created_at", False)
+
+
+class PaginationError(ValueError):
+    '''
+    Raised when the limit or cursor query parameters cannot be used
+    '''
+
+
+def _sort_spec(sort):
+    key, descending = sort
+    return f"-{key}" if descending else key
+
+
+def encode_cursor(value, id, sort=DEFAULT_SORT):
+    '''
+    Build an opaque cursor from the (sort value, id) key of the last row on a page
+    '''
+    value = value.isoformat() if isinstance(value, datetime) else value
+    raw = f"{_sort_spec(sort)}|{value}|{id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    '''
+    Split a cursor produced by encode_cursor into its sort spec, raw sort value and id
+    '''
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        spec, rest = base64.urlsafe_b64decode(padded.encode()).decode().split("|", 1)
+        value, id = rest.rsplit("|", 1)
+        return spec, value, UUID(id)
+    except Exception:
+        raise PaginationError("Invalid cursor")
+
+
+def _cursor_value(model, key, value):
+    python_type = model.__table__.c[key].type.python_type
+    try:
+        return datetime.fromisoformat(value) if python_type is datetime else python_type(value)
+    except Exception:
+        raise PaginationError("Invalid cursor")
+
+
+def get_limit():
+    '''
+    Read the page size from ?limit=, capped at MAX_LIMIT
+    '''
+    limit = request.args.get("limit", DEFAULT_LIMIT)
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        raise PaginationError("limit must be an integer")
+    if limit < 1:
+        raise PaginationError("limit must be at least 1")
+    return min(limit, MAX_LIMIT)
+
+
+def keyset_filter(query, model, cursor, sort=DEFAULT_SORT):
+    '''
+    Order a query by (sort column, id) and, if a cursor is given, seek past it
+    '''
+    key, descending = sort
+    column = getattr(model, key)
+
+    if descending:
+        query = query.order_by(column.desc(), model.id.desc())
+    else:
+        query = query.order_by(column, model.id)
+
+    if cursor:
+        spec, value, id = decode_cursor(cursor)
+        if spec != _sort_spec(sort):
+            raise PaginationError("Cursor does not match the sort order")
+        value = _cursor_value(model, key, value)
+        if descending:
+            query = query.filter(or_(column < value, and_(column == value, model.id < id)))
+        else:
+            query = query.filter(or_(column > value, and_(column == value, model.id > id)))
+    return query
+
+
+def paginate(query, model, sort=DEFAULT_SORT):
+    '''
+    Fetch one page of a query using keyset pagination on (sort column, id).
+    Returns the rows of the page and the meta block for the response envelope.
+    '''
+    limit = get_limit()
+    query = keyset_filter(query, model, request.args.get("cursor"), sort)
+
+    rows = query.limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, sort[0]), last.id, sort)
+
+    return rows, {"limit": limit, "next_cursor": next_cursor}
@@ -0,0 +1,207 @@
+from bisect import bisect_right
+from decimal import Decimal, ROUND_HALF_UP
+from app import db
+from models import Subscription, SubscriptionTier
+
+try:
+    import numpy as np
+except ImportError:  # optional, LadderTable prices record by record without it
+    np = None
+
+STRATEGIES = ("Pick", "Fill", "Flat", "Fixed")
+
+# Bound standing in for "no tier" in LadderTable's padded arrays
+_UNREACHED = 2 ** 62
+_CENT = Decimal("0.01")
+
+
+class PricingError(ValueError):
+    '''
+    Raised for an unknown strategy, a negative call count or a subscription without a loaded ladder
+    '''
+
+
+def to_cents(price):
+    '''
+    Integer cents of a Numeric(10, 2) price; None (a nullable price column) counts as 0
+    '''
+    if price is None:
+        return 0
+    return int(Decimal(str(price)).quantize(_CENT, rounding=ROUND_HALF_UP) * 100)
+
+
+def from_cents(cents):
+    return Decimal(int(cents)).scaleb(-2)
+
+
+class TierLadder:
+    '''
+    The tiers of one subscription, ordered by min_calls, priced under the subscription's strategy.
+    A tier covers call counts min_calls <= calls < max_calls; counts below the first tier use
+    the first tier and counts past the last one use the last tier.
+
+    Pick:  every call at the rate of the tier the count falls in, plus that tier's base_price
+    Fill:  calls fill the tiers in order, each tier reached adds its base_price and its calls at its rate
+    Flat:  the base_price of the tier the count falls in
+    Fixed: the base_price of the first tier, whatever the usage
+
+    Prices are added up in integer cents so every strategy is exact. A ladder without tiers charges 0.
+    '''
+    __slots__ = ("strategy", "mins", "ends", "base", "rate", "filled")
+
+    def __init__(self, strategy, tiers):
+        if strategy not in STRATEGIES:
+            raise PricingError(f"Unknown pricing strategy: {strategy}")
+        tiers = sorted(tiers, key=lambda tier: tier.min_calls)
+        self.strategy = strategy
+        self.mins = [tier.min_calls for tier in tiers]
+        # the last tier is open ended, so overflow is billed at its rate
+        self.ends = [tier.max_calls for tier in tiers[:-1]] + [None] * bool(tiers)
+        self.base = [to_cents(tier.base_price) for tier in tiers]
+        self.rate = [to_cents(tier.price_per_tier) for tier in tiers]
+        # cents charged under Fill for completely filling every tier before tier i
+        self.filled = [0]
+        for i in range(len(tiers) - 1):
+            self.filled.append(self.filled[-1] + self.base[i] + max(self.ends[i] - self.mins[i], 0) * self.rate[i])
+
+    def tier_index(self, calls):
+        '''
+        Position of the tier a call count falls in
+        '''
+        return max(bisect_right(self.mins, calls) - 1, 0)
+
+    def price_cents(self, calls):
+        if calls < 0:
+            raise PricingError("calls must not be negative")
+        if not self.mins:
+            return 0
+        if self.strategy == "Fixed":
+            return self.base[0]
+        i = self.tier_index(calls)
+        if self.strategy == "Flat":
+            return self.base[i]
+        if self.strategy == "Pick":
+            return self.base[i] + calls * self.rate[i]
+        end = self.ends[i]
+        used = max((calls if end is None else min(calls, end)) - self.mins[i], 0)
+        return self.filled[i] + self.base[i] + used * self.rate[i]
+
+    def price(self, calls):
+        '''
+        Charge for calls, as a Decimal with two places
+        '''
+        return from_cents(self.price_cents(calls))
+
+
+class LadderTable:
+    '''
+    Tier ladders of many subscriptions laid out as (ladder, tier) arrays, for pricing
+    (subscription, calls) pairs in bulk. With NumPy installed the tier of every record is found
+    by comparing its count against its ladder's row of min_calls, and the charges are computed
+    as array arithmetic; without it each record goes through its TierLadder. Both give the same cents.
+    '''
+    _CODES = {strategy: code for code, strategy in enumerate(STRATEGIES)}
+
+    def __init__(self, ladders):
+        self.ladders = dict(ladders)
+        self.index = {id: i for i, id in enumerate(self.ladders)}
+        self._arrays = None
+
+    def positions(self, subscription_ids):
+        '''
+        Ladder position of every subscription id
+        '''
+        try:
+            return list(map(self.index.__getitem__, subscription_ids))
+        except KeyError as e:
+            raise PricingError(f"No tiers loaded for subscription {e.args[0]}")
+
+    def _build(self):
+        ladders = list(self.ladders.values())
+        width = max([len(ladder.mins) for ladder in ladders] + [1])
+
+        def table(column, pad):
+            return np.array([row + [pad] * (width - len(row)) for row in column], dtype=np.int64).reshape(-1, width)
+
+        # missing tiers get a min_calls no count reaches, the last tier an end no count reaches
+        self._arrays = {
+            "mins": table([ladder.mins for ladder in ladders], _UNREACHED),
+            "ends": table([[_UNREACHED if end is None else end for end in ladder.ends] for ladder in ladders], 0),
+            "base": table([ladder.base for ladder in ladders], 0),
+            "rate": table([ladder.rate for ladder in ladders], 0),
+            "filled": table([ladder.filled[:len(ladder.mins)] for ladder in ladders], 0),
+            "counts": np.array([len(ladder.mins) for ladder in ladders], dtype=np.int64),
+            "codes": np.array([self._CODES[ladder.strategy] for ladder in ladders], dtype=np.int8),
+        }
+        return self._arrays
+
+    def _price_each(self, positions, calls):
+        ladders = list(self.ladders.values())
+        return [ladders[p].price_cents(c) for p, c in zip(positions, calls)]
+
+    def price_cents(self, subscription_ids, calls):
+        '''
+        Charges in cents for parallel sequences of subscription ids and call counts:
+        an int64 array with NumPy, a list of ints otherwise
+        '''
+        positions = self.positions(subscription_ids)
+        if len(positions) != len(calls):
+            raise PricingError("subscription_ids and calls differ in length")
+        if np is None:
+            return self._price_each(positions, calls)
+
+        a = self._arrays or self._build()
+        ladder = np.asarray(positions, dtype=np.int64)
+        calls = np.asarray(calls, dtype=np.int64)
+        if len(calls) == 0:
+            return np.zeros(0, dtype=np.int64)
+        if calls.min() < 0:
+            raise PricingError("calls must not be negative")
+        if int(calls.max()) * int(a["rate"].max()) + int(a["filled"].max()) + int(a["base"].max()) >= 2 ** 63:
+            # charges that could overflow int64 are left to Python integers
+            return self._price_each(positions, calls.tolist())
+
+        # tier = number of tiers starting at or below the count, less one (the first tier for lower counts)
+        tier = np.maximum((a["mins"][ladder] <= calls[:, None]).sum(axis=1) - 1, 0)
+        code = a["codes"][ladder]
+        tier[code == self._CODES["Fixed"]] = 0
+        cell = (ladder, tier)
+        base = a["base"][cell]
+        rate = a["rate"][cell]
+
+        # calls billed at the tier's rate: all of them for Pick, the tier's share for Fill, none otherwise
+        used = np.where(code == self._CODES["Pick"], calls, 0)
+        fill = code == self._CODES["Fill"]
+        share = np.maximum(np.minimum(calls, a["ends"][cell]) - a["mins"][cell], 0)
+        used[fill] = share[fill]
+        charges = np.where(fill, a["filled"][cell], 0) + base + used * rate
+        # ladders without tiers charge nothing
+        return np.where(a["counts"][ladder] > 0, charges, 0)
+
+    def price(self, subscription_ids, calls):
+        '''
+        Charges as Decimals with two places, in the order of the records
+        '''
+        return [from_cents(cents) for cents in self.price_cents(subscription_ids, calls)]
+
+
+def load_ladders(subscription_ids, at=None):
+    '''
+    LadderTable for the given subscriptions with two queries (subscriptions, then tiers).
+    Only live tiers are used; with `at`, only the tiers whose start_date <= at < end_date.
+    '''
+    ids = set(subscription_ids)
+    if not ids:
+        return LadderTable({})
+    strategies = dict(db.session.query(Subscription.id, Subscription.strategy).filter(Subscription.id.in_(ids)))
+    query = db.session.query(
+        SubscriptionTier.subscription_id, SubscriptionTier.min_calls, SubscriptionTier.max_calls,
+        SubscriptionTier.base_price, SubscriptionTier.price_per_tier,
+    ).filter(SubscriptionTier.subscription_id.in_(strategies), SubscriptionTier.is_archived == False)
+    if at is not None:
+        query = query.filter(SubscriptionTier.start_date <= at, SubscriptionTier.end_date > at)
+
+    tiers = {id: [] for id in strategies}
+    for row in query:
+        tiers[row.subscription_id].append(row)
+    return LadderTable({id: TierLadder(strategies[id], tiers[id]) for id in strategies})
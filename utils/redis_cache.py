@@ -0,0 +1,241 @@
+import json
+import logging
+import socket
+import threading
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHANNEL = "cache:invalidate"
+
+
+class RespError(Exception):
+    '''
+    Error reply sent by the server
+    '''
+
+
+class RespConnection:
+    '''
+    Minimal client for the Redis serialization protocol (RESP2), enough for the cache:
+    GET / SET EX / DEL / SCAN / PUBLISH / SUBSCRIBE. Works against Redis or any server speaking the protocol.
+    '''
+    def __init__(self, host="localhost", port=6379, db=0, password=None, timeout=2.0, blocking=False):
+        self.host = host
+        self.port = port
+        self.db = db
+        self.password = password
+        self.timeout = timeout
+        # a blocking connection only times out while connecting, its reads wait for the server
+        self.blocking = blocking
+        self._sock = None
+        self._file = None
+
+    @classmethod
+    def from_url(cls, url, **kwargs):
+        parsed = urlparse(url)
+        db = int(parsed.path.lstrip("/") or 0)
+        return cls(parsed.hostname or "localhost", parsed.port or 6379, db, parsed.password, **kwargs)
+
+    def connect(self):
+        self._sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._file = self._sock.makefile("rb")
+        if self.password:
+            self.execute("AUTH", self.password)
+        if self.db:
+            self.execute("SELECT", self.db)
+        if self.blocking:
+            self._sock.settimeout(None)
+
+    def close(self):
+        for closable in (self._file, self._sock):
+            if closable is not None:
+                try:
+                    closable.close()
+                except OSError:
+                    pass
+        self._sock = self._file = None
+
+    def shutdown(self):
+        '''
+        Wake a thread blocked reading this connection, which then sees it closed
+        '''
+        if self._sock is not None:
+            try:
+                self._sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def send(self, *args):
+        if self._sock is None:
+            self.connect()
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        self._sock.sendall(b"".join(parts))
+
+    def read_reply(self):
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("Connection closed by server")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b"+":
+            return payload.decode()
+        if kind == b"-":
+            raise RespError(payload.decode())
+        if kind == b":":
+            return int(payload)
+        if kind == b"$":
+            length = int(payload)
+            if length == -1:
+                return None
+            data = self._file.read(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            length = int(payload)
+            if length == -1:
+                return None
+            return [self.read_reply() for _ in range(length)]
+        raise RespError(f"Unknown reply type {kind!r}")
+
+    def execute(self, *args):
+        self.send(*args)
+        return self.read_reply()
+
+
+class RedisCache:
+    '''
+    Cache backend shared by every worker process, stored on a Redis-protocol server.
+    Values are JSON encoded and expire server side after the TTL. Connection errors and
+    error replies (OOM, LOADING, WRONGTYPE...) are logged and treated as misses so the
+    database stays the source of truth.
+    '''
+    def __init__(self, connection, ttl, prefix="acms:"):
+        self.connection = connection
+        self.ttl = ttl
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _execute(self, *args):
+        with self._lock:
+            try:
+                return self.connection.execute(*args)
+            except (OSError, ConnectionError) as e:
+                # drop the broken socket, the next command reconnects
+                self.connection.close()
+                self.errors += 1
+                logger.warning("Cache server unavailable: %s", e)
+                return None
+            except RespError as e:
+                # the reply was read in full, the connection stays usable
+                self.errors += 1
+                logger.warning("Cache server error: %s", e)
+                return None
+
+    def get(self, key):
+        raw = self._execute("GET", self.prefix + key)
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(raw)
+
+    def set(self, key, value):
+        ttl_ms = max(int(self.ttl * 1000), 1)
+        self._execute("SET", self.prefix + key, json.dumps(value, default=str), "PX", ttl_ms)
+
+    def delete(self, key):
+        self._execute("DEL", self.prefix + key)
+
+    def clear(self):
+        cursor = "0"
+        while True:
+            reply = self._execute("SCAN", cursor, "MATCH", self.prefix + "*", "COUNT", 1000)
+            if reply is None:
+                break
+            cursor, keys = reply[0].decode(), reply[1]
+            if keys:
+                self._execute("DEL", *keys)
+            if cursor == "0":
+                break
+        self.hits = self.misses = self.errors = 0
+
+    def stats(self):
+        return {
+            "backend": "redis",
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+        }
+
+
+class RedisBroadcaster:
+    '''
+    Publishes invalidated keys on a pub/sub channel and applies keys published by
+    other workers to this process' cache, from a background subscriber thread.
+    '''
+    def __init__(self, url, on_message, channel=DEFAULT_CHANNEL, reconnect_delay=1.0):
+        self.url = url
+        self.channel = channel
+        self.on_message = on_message
+        self.reconnect_delay = reconnect_delay
+        self._publisher = RespConnection.from_url(url)
+        self._publish_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._subscribed = threading.Event()
+        self._subscriber = None
+        self._subscriber_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._listen, name="cache-invalidation", daemon=True)
+        self._thread.start()
+
+    def publish(self, key):
+        with self._publish_lock:
+            try:
+                self._publisher.execute("PUBLISH", self.channel, key)
+            except (OSError, ConnectionError) as e:
+                self._publisher.close()
+                logger.warning("Could not broadcast cache invalidation: %s", e)
+            except RespError as e:
+                logger.warning("Could not broadcast cache invalidation: %s", e)
+
+    def wait_until_subscribed(self, timeout=None):
+        return self._subscribed.wait(timeout)
+
+    def close(self):
+        with self._subscriber_lock:
+            self._stopped.set()
+            if self._subscriber is not None:
+                self._subscriber.shutdown()
+        self._publisher.close()
+
+    def _listen(self):
+        # the subscriber blocks until a message arrives: an idle channel is not a disconnect,
+        # close() wakes it by shutting the socket down
+        while not self._stopped.is_set():
+            connection = RespConnection.from_url(self.url, blocking=True)
+            try:
+                connection.execute("SUBSCRIBE", self.channel)
+                with self._subscriber_lock:
+                    if self._stopped.is_set():
+                        break
+                    self._subscriber = connection
+                self._subscribed.set()
+                while True:
+                    message = connection.read_reply()
+                    if isinstance(message, list) and message[0] == b"message":
+                        self.on_message(message[2].decode())
+            except (OSError, ConnectionError, RespError) as e:
+                self._subscribed.clear()
+                if self._stopped.is_set():
+                    break
+                logger.warning("Cache invalidation subscriber disconnected: %s", e)
+                self._stopped.wait(self.reconnect_delay)
+            finally:
+                with self._subscriber_lock:
+                    self._subscriber = None
+                connection.close()
@@ -0,0 +1,113 @@
+import hashlib
+from datetime import date, datetime, time
+from decimal import Decimal
+from flask import request
+from sqlalchemy import func, select
+from app import db, cache
+from models import Client, Product, Contract, Subscription, SubscriptionTier
+
+_CENT = Decimal("0.01")
+
+
+class ReportError(ValueError):
+    '''
+    Raised for report parameters that cannot be used
+    '''
+
+
+# ?group_by= of the revenue report: the columns each group is keyed and labelled by
+REVENUE_GROUPS = {
+    "client": (Client.id, Client.company_name),
+    "product": (Product.id, Product.api_name),
+    "pricing_type": (Subscription.pricing_type, Subscription.pricing_type),
+}
+
+# Models a report reads, in join order from the tiers up
+_REPORT_MODELS = (SubscriptionTier, Subscription, Contract, Client, Product)
+
+
+def report_params():
+    '''
+    group_by, the [start, end) window as naive datetimes (None for an open end) and include_archived,
+    from ?group_by=client|product|pricing_type&start=YYYY-MM-DD&end=YYYY-MM-DD&include_archived=true
+    '''
+    group_by = request.args.get("group_by", "client")
+    if group_by not in REVENUE_GROUPS:
+        raise ReportError(f"group_by must be one of {', '.join(REVENUE_GROUPS)}")
+    try:
+        start, end = (
+            datetime.combine(date.fromisoformat(request.args[name]), time.min) if request.args.get(name) else None
+            for name in ("start", "end")
+        )
+    except ValueError:
+        raise ReportError("start and end must be dates (YYYY-MM-DD)")
+    if start and end and start >= end:
+        raise ReportError("end must be after start")
+    return group_by, start, end, request.args.get("include_archived") in ("1", "true")
+
+
+def data_version():
+    '''
+    Digest of max(updated_at) of every table a report reads, from one query over their updated_at
+    indexes. Writes, archives included, move updated_at, so a new version means cached reports are stale.
+    '''
+    row = db.session.query(*[select(func.max(model.updated_at)).scalar_subquery() for model in _REPORT_MODELS]).one()
+    return hashlib.sha1("|".join(str(value) for value in row).encode()).hexdigest()
+
+
+def revenue_query(group_by, start=None, end=None, include_archived=False):
+    '''
+    Contract value per group as one aggregate query over the tiers in effect during the window.
+    base_revenue adds up base_price; usage_revenue prices every tier fully used,
+    (max_calls - min_calls) * price_per_tier. Tiers are summed per subscription first, so the
+    joins up to contract, client and product see one row per subscription rather than per tier.
+    '''
+    tiers = select(
+        SubscriptionTier.subscription_id,
+        func.count().label("tiers"),
+        func.sum(SubscriptionTier.base_price).label("base"),
+        func.sum((SubscriptionTier.max_calls - SubscriptionTier.min_calls) * SubscriptionTier.price_per_tier).label("usage"),
+    ).group_by(SubscriptionTier.subscription_id)
+    if start is not None:
+        tiers = tiers.where(SubscriptionTier.end_date > start)
+    if end is not None:
+        tiers = tiers.where(SubscriptionTier.start_date < end)
+    if not include_archived:
+        tiers = tiers.where(SubscriptionTier.is_archived == False)
+    tiers = tiers.subquery()
+
+    key, label = REVENUE_GROUPS[group_by]
+    base = func.coalesce(func.sum(tiers.c.base), 0)
+    usage = func.coalesce(func.sum(tiers.c.usage), 0)
+    query = (
+        select(key.label("key"), label.label("name"), func.sum(tiers.c.tiers).label("tiers"), base.label("base"), usage.label("usage"))
+        .select_from(tiers)
+        .join(Subscription, tiers.c.subscription_id == Subscription.id)
+        .join(Contract, Subscription.contract_id == Contract.id)
+        .join(Client, Contract.client_id == Client.id)
+        .join(Product, Subscription.product_id == Product.id)
+        .group_by(key, label)
+        .order_by((base + usage).desc(), key)
+    )
+    if not include_archived:
+        query = query.where(*[model.is_archived == False for model in _REPORT_MODELS[1:]])
+    return query
+
+
+def revenue_report(group_by, start=None, end=None, include_archived=False):
+    '''
+    Rows of the revenue report, cached under the parameters and the data_version(), so a repeated
+    report costs one indexed query until one of the tables it reads is written to
+    '''
+    key = f"report:revenue:{group_by}:{start and start.date()}:{end and end.date()}:{int(include_archived)}:{data_version()}"
+    rows = cache.reports.get(key)
+    if rows is None:
+        rows = []
+        for row in db.session.execute(revenue_query(group_by, start, end, include_archived)):
+            base, usage = Decimal(str(row.base)).quantize(_CENT), Decimal(str(row.usage)).quantize(_CENT)
+            rows.append({
+                "key": str(row.key), "name": row.name, "tiers": row.tiers,
+                "base_revenue": str(base), "usage_revenue": str(usage), "contract_value": str(base + usage),
+            })
+        cache.reports.set(key, rows)
+    return rows
@@ -1,4 +1,9 @@
-from flask import jsonify, make_response
+from itertools import islice
+from flask import jsonify, make_response, request, current_app, Response, stream_with_context
+from utils.pagination import keyset_filter, DEFAULT_SORT
+
+STREAM_MIMETYPE = "application/x-ndjson"
+STREAM_BATCH_SIZE = 1000
 
 def _envelope(success, message=None, data=None, errors=None, meta=None, status=200):
     body = {"success": success, "message": message or "", "data": data, "errors": errors, "meta": meta}
@@ -16,5 +21,31 @@ def bad_request(message="Bad request", errors=None):
 def not_found(message="Not found"): 
     return _envelope(False, message, None, None, None, 404)
 
-def server_error(message="Server error"): 
-    return _envelope(False, message, None, None, None, 500)
\ No newline at end of file
+def server_error(message="Server error", errors=None): 
+    return _envelope(False, message, None, errors, None, 500)
+
+def wants_stream():
+    '''
+    True when the client asked for NDJSON, via ?stream=1 or an Accept header preferring application/x-ndjson
+    '''
+    if request.args.get("stream") in ("1", "true"):
+        return True
+    return request.accept_mimetypes.best_match(["application/json", STREAM_MIMETYPE]) == STREAM_MIMETYPE
+
+def stream(query, model, serializer, sort=DEFAULT_SORT, batch_size=STREAM_BATCH_SIZE):
+    '''
+    Stream every row of a query as one JSON document per line, in (sort column, id) order.
+    Rows are fetched and serialized batch_size at a time, so memory use does not grow with the result.
+    serializer is anything whose dump() takes a list of rows: a compiled serializer or a many=True schema.
+    '''
+    query = keyset_filter(query, model, request.args.get("cursor"), sort)
+
+    def generate():
+        rows = iter(query.yield_per(batch_size))
+        while batch := list(islice(rows, batch_size)):
+            yield "".join(current_app.json.dumps(item) + "\n" for item in serializer.dump(batch))
+
+    return Response(stream_with_context(generate()), mimetype=STREAM_MIMETYPE)
+
+def not_modified(validators):
+    return validators.apply(make_response("", 304))
@@ -0,0 +1,342 @@
+import csv
+import io
+import json
+from datetime import date, datetime, timezone
+from itertools import islice
+from uuid import UUID
+from marshmallow import ValidationError
+from sqlalchemy import Date, cast, delete, func, insert, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+from app import db
+from models import Subscription, UsageBatch, UsageEvent, UsageDaily, UsageMonthly
+from utils.bulk import existing_ids
+from utils.response import STREAM_MIMETYPE
+
+try:
+    import orjson
+except ImportError:  # optional, the stdlib decoder is used without it
+    orjson = None
+
+CSV_MIMETYPE = "text/csv"
+# Body formats accepted for a usage batch
+USAGE_MIMETYPES = (STREAM_MIMETYPE, CSV_MIMETYPE)
+# Columns of a usage event; calls may be left out and counts as one call
+USAGE_FIELDS = ("subscription_id", "timestamp", "calls")
+# Events validated and written per round trip, so a batch of any size is ingested in bounded memory
+USAGE_CHUNK_SIZE = 10_000
+
+# Bytes read from the request body at a time
+READ_BUFFER_SIZE = 1 << 16
+
+_EVENT_COLUMNS = ("batch_id", "subscription_id", "occurred_at", "calls")
+_COPY_EVENTS = "COPY usage_event (batch_id, subscription_id, occurred_at, calls) FROM STDIN WITH (FORMAT csv)"
+_loads = orjson.loads if orjson is not None else json.loads
+
+
+class UsageError(ValueError):
+    '''
+    Raised for a usage batch body that cannot be read: an unsupported content type or a CSV header without the required columns
+    '''
+
+
+def ndjson_records(lines):
+    '''
+    (line number, record) for every non-blank line of an NDJSON body; a line that is not JSON gives None
+    '''
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            yield number, _loads(line)
+        except ValueError:  # the JSONDecodeError of orjson or json, or bytes that are not UTF-8
+            yield number, None
+
+
+def csv_records(lines):
+    '''
+    (line number, record) for every row of a CSV body with a header line
+    '''
+    reader = csv.DictReader(line.decode("utf-8") if isinstance(line, bytes) else line for line in lines)
+    missing = {"subscription_id", "timestamp"} - set(reader.fieldnames or ())
+    if missing:
+        raise UsageError(f"CSV header is missing {', '.join(sorted(missing))}")
+    for record in reader:
+        yield reader.line_num, record
+
+
+def read_records(mimetype, stream):
+    '''
+    Records of a request body stream; lines are read through a buffer, as the WSGI input is unbuffered
+    '''
+    lines = io.BufferedReader(stream, READ_BUFFER_SIZE)
+    if mimetype == STREAM_MIMETYPE:
+        return ndjson_records(lines)
+    if mimetype == CSV_MIMETYPE:
+        return csv_records(lines)
+    raise UsageError(f"Usage batches are sent as {' or '.join(USAGE_MIMETYPES)}")
+
+
+def to_utc(timestamp):
+    '''
+    Naive UTC datetime of an ISO-8601 timestamp; timestamps without an offset are taken as UTC
+    '''
+    at = datetime.fromisoformat(timestamp)
+    if at.tzinfo is not None:
+        at = at.astimezone(timezone.utc).replace(tzinfo=None)
+    return at
+
+
+class EventParser:
+    '''
+    Turns records into (subscription_id, occurred_at, calls) rows. Batches repeat few subscriptions,
+    so parsed ids are kept and each distinct id string is parsed once.
+    '''
+    def __init__(self):
+        self.ids = {}
+
+    def parse(self, record):
+        '''
+        The row of a record, or the field errors that keep it out
+        '''
+        if not isinstance(record, dict):
+            return None, {"_schema": ["Event must be a JSON object"]}
+        errors = {}
+        value = record.get("subscription_id")
+        id = self.ids.get(value) if isinstance(value, str) else None
+        if id is None:
+            try:
+                id = self.ids[value] = UUID(value)
+            except (TypeError, ValueError, AttributeError):
+                errors["subscription_id"] = ["Not a valid UUID."]
+        try:
+            at = to_utc(record.get("timestamp"))
+        except (TypeError, ValueError):
+            errors["timestamp"] = ["Not a valid datetime."]
+        calls = record.get("calls")
+        if calls is None or calls == "":
+            calls = 1
+        elif isinstance(calls, bool) or isinstance(calls, float):
+            errors["calls"] = ["Not a valid integer."]
+        else:
+            try:
+                calls = int(calls)
+                if calls < 0:
+                    errors["calls"] = ["Must be greater than or equal to 0."]
+            except (TypeError, ValueError):
+                errors["calls"] = ["Not a valid integer."]
+        if errors:
+            return None, errors
+        return (id, at, calls), None
+
+
+def _insert_events(batch_id, rows):
+    '''
+    executemany of one precompiled INSERT. Parameters are converted to what the driver stores once per
+    distinct subscription id and timestamp, instead of through the bind processors of every row.
+    '''
+    connection = db.session.connection()
+    dialect = connection.dialect
+    table = UsageEvent.__table__
+    statement = insert(table).compile(dialect=dialect, column_keys=_EVENT_COLUMNS)
+    to_uuid = table.c.subscription_id.type.bind_processor(dialect) or (lambda id: id)
+    to_datetime = table.c.occurred_at.type.bind_processor(dialect) or (lambda at: at)
+    batch = to_uuid(batch_id)
+    ids, times = {}, {}
+
+    def params(id, at, calls):
+        if id not in ids:
+            ids[id] = to_uuid(id)
+        if at not in times:
+            times[at] = to_datetime(at)
+        values = {"batch_id": batch, "subscription_id": ids[id], "occurred_at": times[at], "calls": calls}
+        return tuple(values[key] for key in statement.positiontup)
+
+    connection.exec_driver_sql(str(statement), [params(*row) for row in rows])
+
+
+def write_events(batch_id, rows):
+    '''
+    Append (subscription_id, occurred_at, calls) rows of a batch: COPY FROM STDIN through psycopg2 on
+    Postgres, executemany of one INSERT elsewhere. Runs in the session's transaction; the caller commits.
+    '''
+    if db.session.get_bind().dialect.name == "postgresql":
+        buffer = io.StringIO()
+        buffer.writelines(f"{batch_id},{id},{at.isoformat()},{calls}\n" for id, at, calls in rows)
+        buffer.seek(0)
+        cursor = db.session.connection().connection.cursor()
+        try:
+            cursor.copy_expert(_COPY_EVENTS, buffer)
+        finally:
+            cursor.close()
+    else:
+        _insert_events(batch_id, rows)
+
+
+def ingest(batch_id, user_id, records, chunk_size=USAGE_CHUNK_SIZE):
+    '''
+    Store a usage batch and its events, chunk by chunk, and add them to the daily and monthly rollups. The batch row is written first, so a concurrent
+    ingestion of the same batch id fails on its primary key. Subscriptions are checked with one IN query
+    per chunk for the ids not seen before. Raises ValidationError with the errors of the first chunk holding
+    invalid events, keyed by line number; the caller rolls back then, and commits otherwise.
+    '''
+    user_id = UUID(user_id) if isinstance(user_id, str) else user_id
+    batch = UsageBatch(id=batch_id, events=0, calls=0, created_by=user_id)
+    db.session.add(batch)
+    db.session.flush()
+
+    parser = EventParser()
+    rollup = Rollup()
+    known = set()
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            rollup.save()
+            return batch
+        rows, lines, errors = [], [], {}
+        for number, record in chunk:
+            row, error = parser.parse(record)
+            if error:
+                errors[number] = error
+            else:
+                rows.append(row)
+                lines.append(number)
+
+        unseen = {row[0] for row in rows} - known
+        if unseen:
+            known |= existing_ids(Subscription, unseen)
+        for number, row in zip(lines, rows):
+            if row[0] not in known:
+                errors[number] = {"subscription_id": ["Subscription does not exist"]}
+        if errors:
+            raise ValidationError(dict(sorted(errors.items())))
+
+        write_events(batch_id, rows)
+        rollup.add(rows)
+        batch.events += len(rows)
+        batch.calls += sum(row[2] for row in rows)
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def next_month(day):
+    return date(day.year + day.month // 12, day.month % 12 + 1, 1)
+
+
+def _month_of(column):
+    '''
+    SQL for the first day of the month of a date column
+    '''
+    if db.session.get_bind().dialect.name == "postgresql":
+        return cast(func.date_trunc("month", column), Date)
+    return func.date(column, "start of month")
+
+
+def _upsert(model, key, totals):
+    '''
+    Add {(subscription_id, period): [events, calls]} to the rollup rows of model with one
+    INSERT ... ON CONFLICT DO UPDATE executed for every row; rows not there yet are created
+    '''
+    if not totals:
+        return
+    table = model.__table__
+    dialect = postgresql if db.session.get_bind().dialect.name == "postgresql" else sqlite
+    statement = dialect.insert(table)
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.subscription_id, table.c[key]],
+        set_={"events": table.c.events + statement.excluded.events, "calls": table.c.calls + statement.excluded.calls},
+    )
+    db.session.execute(statement, [
+        {"subscription_id": id, key: period, "events": events, "calls": calls} for (id, period), (events, calls) in totals.items()
+    ])
+
+
+class Rollup:
+    '''
+    Usage of one ingested batch per (subscription, day) and (subscription, month). Saving adds it to
+    usage_daily and usage_monthly in the batch's transaction, so the rollups always match the events.
+    '''
+    def __init__(self):
+        self.daily = {}
+        self.monthly = {}
+
+    def add(self, rows):
+        daily = self.daily
+        for id, at, calls in rows:
+            totals = daily.get((id, at.date()))
+            if totals is None:
+                daily[(id, at.date())] = [1, calls]
+            else:
+                totals[0] += 1
+                totals[1] += calls
+
+    def save(self):
+        for (id, day), (events, calls) in self.daily.items():
+            totals = self.monthly.setdefault((id, month_start(day)), [0, 0])
+            totals[0] += events
+            totals[1] += calls
+        _upsert(UsageDaily, "day", self.daily)
+        _upsert(UsageMonthly, "month", self.monthly)
+
+
+def rebuild_rollups(start, end, subscription_ids=None):
+    '''
+    Recompute the daily rollups of the days in [start, end) from usage_event, then the monthly rollups of
+    the months those days fall in from usage_daily, optionally for some subscriptions only. Each level is
+    one DELETE and one INSERT ... SELECT ... GROUP BY. Returns {tablename: rows written}; the caller commits.
+    '''
+    events, daily, monthly = UsageEvent.__table__, UsageDaily.__table__, UsageMonthly.__table__
+    ids = list(subscription_ids) if subscription_ids is not None else None
+
+    def scoped(statement, table):
+        return statement if ids is None else statement.where(table.c.subscription_id.in_(ids))
+
+    day = func.date(events.c.occurred_at)
+    db.session.execute(scoped(delete(daily).where(daily.c.day >= start, daily.c.day < end), daily))
+    days = scoped(
+        select(events.c.subscription_id, day, func.count(), func.sum(events.c.calls))
+        .where(events.c.occurred_at >= datetime.combine(start, datetime.min.time()), events.c.occurred_at < datetime.combine(end, datetime.min.time())),
+        events,
+    ).group_by(events.c.subscription_id, day)
+    counts = {"usage_daily": db.session.execute(insert(daily).from_select(["subscription_id", "day", "events", "calls"], days)).rowcount}
+
+    first, last = month_start(start), (next_month(month_start(end)) if end.day > 1 else end)
+    month = _month_of(daily.c.day)
+    db.session.execute(scoped(delete(monthly).where(monthly.c.month >= first, monthly.c.month < last), monthly))
+    months = scoped(
+        select(daily.c.subscription_id, month, func.sum(daily.c.events), func.sum(daily.c.calls))
+        .where(daily.c.day >= first, daily.c.day < last),
+        daily,
+    ).group_by(daily.c.subscription_id, month)
+    counts["usage_monthly"] = db.session.execute(insert(monthly).from_select(["subscription_id", "month", "events", "calls"], months)).rowcount
+    return counts
+
+
+def usage_totals(subscription_ids, start, end):
+    '''
+    {subscription_id: calls} over the days in [start, end), read from the rollups: the whole months of the
+    window from usage_monthly and the days before and after them from usage_daily, in two queries
+    '''
+    ids = set(subscription_ids)
+    totals = dict.fromkeys(ids, 0)
+    if not ids or start >= end:
+        return totals
+    first = start if start.day == 1 else next_month(start)
+    last = month_start(end)
+    days = [(start, end)]
+    if first < last:
+        days = [(start, first), (last, end)]
+        query = db.session.query(UsageMonthly.subscription_id, func.sum(UsageMonthly.calls)).filter(
+            UsageMonthly.subscription_id.in_(ids), UsageMonthly.month >= first, UsageMonthly.month < last,
+        ).group_by(UsageMonthly.subscription_id)
+        for id, calls in query:
+            totals[id] += calls
+    days = [(low, high) for low, high in days if low < high]
+    if days:
+        query = db.session.query(UsageDaily.subscription_id, func.sum(UsageDaily.calls)).filter(
+            UsageDaily.subscription_id.in_(ids), or_(*[(UsageDaily.day >= low) & (UsageDaily.day < high) for low, high in days]),
+        ).group_by(UsageDaily.subscription_id)
+        for id, calls in query:
+            totals[id] += calls
+    return totals